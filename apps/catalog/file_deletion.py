@@ -0,0 +1,99 @@
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class FileDeletionQueue:
+    """
+    Background queue that removes stored files once the transaction that
+    orphaned them has committed.
+
+    Paths are only handed to the queue from ``transaction.on_commit``, so a
+    rolled back transaction never loses its files. A daemon worker thread
+    drains the queue in batches, keeping disk I/O off the request thread.
+    """
+
+    def __init__(self, batch_size=None):
+        self._batch_size = batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    @property
+    def batch_size(self):
+        if self._batch_size is not None:
+            return self._batch_size
+        return getattr(settings, "FILE_DELETION_BATCH_SIZE", 100)
+
+    def schedule(self, storage, name, using=None):
+        """
+        Queue ``name`` for deletion from ``storage`` after the current
+        transaction commits. Outside a transaction this happens immediately.
+        """
+        if not name:
+            return
+        transaction.on_commit(lambda: self.enqueue(storage, name), using=using)
+
+    def schedule_file(self, field_file, using=None):
+        """Queue the file behind a model ``FieldFile`` for deletion."""
+        if field_file:
+            self.schedule(field_file.storage, field_file.name, using=using)
+
+    def enqueue(self, storage, name):
+        """Hand a file to the background worker for deletion."""
+        self._ensure_worker()
+        self._queue.put((storage, name))
+
+    def flush(self):
+        """Block until every file queued so far has been processed."""
+        self._queue.join()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so a worker started in a preloaded
+        # parent process has to be replaced in each child.
+        pid = os.getpid()
+        if self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == pid and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run, name="file-deletion-queue", daemon=True
+            )
+            self._worker_pid = pid
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._delete_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _delete_batch(self, batch):
+        deleted = 0
+        for storage, name in batch:
+            try:
+                storage.delete(name)
+                deleted += 1
+            except Exception:
+                # Any storage's errors: one bad file must not stop the queue
+                logger.exception("Error deleting file '%s'", name)
+        logger.debug("Deleted %d of %d queued files.", deleted, len(batch))
+
+
+file_deletion_queue = FileDeletionQueue()
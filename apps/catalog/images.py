@@ -0,0 +1,43 @@
+"""
+Product image processing.
+
+Pillow is imported on first use rather than with this module, so workers
+that never handle an upload do not pay for loading it. The time taken is
+recorded in ``core.metrics.IMAGE_PROCESSING``.
+"""
+
+from io import BytesIO
+
+from core.metrics import IMAGE_PROCESSING
+
+
+def image_format(file):
+    """Check ``file`` is a readable image and return its format, e.g. "PNG"."""
+    from PIL import Image
+
+    with IMAGE_PROCESSING.time(operation="verify"):
+        image = Image.open(file)
+        image.verify()
+    return image.format
+
+
+def compress_image(file, max_width, max_height, quality=85):
+    """
+    Return ``file`` re-encoded as optimized JPEG bytes, resized to fit
+    within ``max_width`` x ``max_height`` while keeping its aspect ratio.
+    """
+    from PIL import Image
+
+    with IMAGE_PROCESSING.time(operation="compress"):
+        image = Image.open(file)
+
+        # JPEG has no alpha channel or palette
+        if image.mode in ("RGBA", "P"):
+            image = image.convert("RGB")
+
+        if image.size[0] > max_width or image.size[1] > max_height:
+            image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+
+        with BytesIO() as output:
+            image.save(output, format="JPEG", quality=quality, optimize=True)
+            return output.getvalue()
@@ -1,12 +1,88 @@
+import io
+import itertools
+import math
+import random
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.management.base import BaseCommand
 
-from apps.catalog.models import Category, Product
+from apps.catalog.models import Category, Product, product_image_path
+from core.seeding import insert_rows, seeded_uuid
+
+DEPARTMENTS = {
+    "Electronics": ["Headphones", "Speaker", "Charger", "Monitor", "Keyboard"],
+    "Books": ["Novel", "Cookbook", "Atlas", "Biography", "Guide"],
+    "Clothing": ["T-Shirt", "Jacket", "Sneakers", "Scarf", "Jeans"],
+    "Home & Kitchen": ["Kettle", "Blender", "Skillet", "Lamp", "Towel Set"],
+    "Sports": ["Yoga Mat", "Dumbbell", "Water Bottle", "Racket", "Helmet"],
+    "Toys": ["Puzzle", "Building Set", "Plush Bear", "Kite", "Board Game"],
+    "Beauty": ["Face Cream", "Shampoo", "Lip Balm", "Perfume", "Hair Dryer"],
+    "Garden": ["Hose", "Planter", "Pruner", "Seed Kit", "Bird Feeder"],
+}
+ADJECTIVES = [
+    "Classic",
+    "Premium",
+    "Compact",
+    "Wireless",
+    "Organic",
+    "Deluxe",
+    "Portable",
+    "Smart",
+    "Vintage",
+    "Ultra",
+]
+IMAGE_COLORS = ["#c0392b", "#2980b9", "#27ae60", "#f39c12", "#8e44ad", "#7f8c8d"]
 
 
 class Command(BaseCommand):
-    help = "Seed the database with sample categories, and products"
+    help = (
+        "Seed the database with sample categories, and products. With "
+        "--categories or --products, generate that many instead, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--categories",
+            type=int,
+            default=0,
+            help="Number of categories to generate (default: 10 with --products).",
+        )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=0,
+            help="Number of products to generate.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed; the same seed generates the same rows (default: 0).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Rows written per transaction (default: 10000).",
+        )
+        parser.add_argument(
+            "--images",
+            type=float,
+            default=0.0,
+            help="Fraction of products given a generated image (default: 0).",
+        )
 
-    def handle(self, *args, **kwargs):
+    def handle(self, *args, **options):
+        if options["categories"] or options["products"]:
+            self.generate(**options)
+        else:
+            self.seed_samples()
+
+    def seed_samples(self):
         # Seed categories
         categories = [
             {"name": "Electronics", "description": "Electronic items"},
@@ -48,3 +124,133 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("Sample products seeded."))
 
         self.stdout.write(self.style.SUCCESS("Sample data seeded."))
+
+    def generate(self, categories, products, seed, batch_size, images, **options):
+        rng = random.Random(seed)
+        started = time.perf_counter()
+        categories = categories or 10
+
+        departments = {category_name(i): department_name(i) for i in range(categories)}
+        # Existing categories are skipped, after drawing their ids all the
+        # same so that a rerun generates the products it did before
+        created = insert_rows(
+            Category,
+            (
+                {
+                    "id": seeded_uuid(rng),
+                    "name": name,
+                    "description": f"Generated {name.lower()} category",
+                }
+                for name in departments
+            ),
+            batch_size,
+        )
+        self.stdout.write(self.style.SUCCESS(f"{created} categories seeded."))
+
+        if products:
+            # Sorted first, as the database returns rows in no set order
+            rows = sorted(
+                Category.objects.filter(name__in=departments).values_list("name", "id")
+            )
+            rng.shuffle(rows)
+            generator = ProductGenerator(
+                rng,
+                [(pk, departments[name]) for name, pk in rows],
+                generated_images() if images else [],
+                images,
+            )
+
+            def report(total):
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{total}/{products} products written.")
+
+            created = insert_rows(
+                Product,
+                (generator.row() for _ in range(products)),
+                batch_size,
+                progress=report,
+                committed=generator.save_images,
+            )
+            self.stdout.write(self.style.SUCCESS(f"{created} products seeded."))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated data seeded in {elapsed:.1f}s.")
+        )
+
+
+def department_name(index):
+    return list(DEPARTMENTS)[index % len(DEPARTMENTS)]
+
+
+def category_name(index):
+    """Department names, numbered once each has been used."""
+    round_ = index // len(DEPARTMENTS)
+    return (
+        f"{department_name(index)} {round_ + 1}" if round_ else department_name(index)
+    )
+
+
+class ProductGenerator:
+    """
+    Product rows with realistic distributions: a few categories hold most
+    products (Zipf), most prices are low (log-normal, ending in .99) and
+    about one product in twelve is sold out.
+    """
+
+    def __init__(self, rng, categories, image_files, image_ratio):
+        self.rng = rng
+        self.categories = categories
+        self.image_files = image_files
+        self.image_ratio = image_ratio
+        self.pending_images = {}
+        self.cum_weights = list(
+            itertools.accumulate(1 / rank for rank in range(1, len(categories) + 1))
+        )
+
+    def row(self):
+        rng = self.rng
+        category_id, department = rng.choices(
+            self.categories, cum_weights=self.cum_weights
+        )[0]
+        noun = rng.choice(DEPARTMENTS[department])
+        adjective = rng.choice(ADJECTIVES)
+        model = f"{rng.choice('ABCDEFGHKMPRSTX')}{rng.randint(100, 999)}"
+        price = min(math.floor(rng.lognormvariate(3.2, 1.1)), 9999)
+        sold_out = rng.random() < 0.08
+        row = {
+            "id": seeded_uuid(rng),
+            "name": f"{adjective} {noun} {model}",
+            "description": f"{adjective} {noun.lower()} from our {department} range.",
+            "price": Decimal(f"{price}.99"),
+            "stock_quantity": (
+                0 if sold_out else min(int(rng.lognormvariate(3, 1)), 5000)
+            ),
+            "category_id": category_id,
+        }
+        if self.image_files and rng.random() < self.image_ratio:
+            # Each product owns its file, which is deleted along with it
+            row["image"] = product_image_path(
+                SimpleNamespace(id=row["id"]), "image.jpg"
+            )
+            self.pending_images[row["image"]] = rng.choice(self.image_files)
+        return row
+
+    def save_images(self, rows):
+        """Write the image files of committed rows, which refer to them by name."""
+        for row in rows:
+            content = self.pending_images.pop(row.get("image"), None)
+            if content is not None and not default_storage.exists(row["image"]):
+                default_storage.save(row["image"], ContentFile(content))
+
+
+def generated_images():
+    """Return small JPEGs in a few colours, encoded once and reused."""
+    from PIL import Image
+
+    encoded = []
+    for color in IMAGE_COLORS:
+        buffer = io.BytesIO()
+        Image.new("RGB", (400, 400), color).save(buffer, "JPEG", quality=85)
+        encoded.append(buffer.getvalue())
+    return encoded
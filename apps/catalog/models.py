@@ -52,10 +52,3 @@ class Product(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.category.name} - ${self.price} - Stock: {self.stock_quantity}"
-
-    def delete(self, *args, **kwargs):
-        """Override delete method to remove associated image file."""
-        if self.image:
-            if os.path.isfile(self.image.path):
-                os.remove(self.image.path)
-        super().delete(*args, **kwargs)
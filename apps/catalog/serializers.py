@@ -1,12 +1,14 @@
-import os
-
-from PIL import Image
+from django.db import transaction
 from rest_framework import serializers
 
+from core.timing import TimedSerializerMixin
+
+from .file_deletion import file_deletion_queue
+from .images import image_format
 from .models import Category, Product
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Category model.
     Handles serialization and deserialization of Category instances.
@@ -23,7 +25,7 @@ class CategorySerializer(serializers.ModelSerializer):
         }
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Product model.
     Handles serialization and deserialization of Product instances.
@@ -82,22 +84,27 @@ class ProductSerializer(serializers.ModelSerializer):
         if value.size > self.MAX_IMAGE_SIZE:
             raise serializers.ValidationError(self.MAX_IMAGE_ERROR_MSG)
         try:
-            img = Image.open(value)
-            img.verify()
+            format = image_format(value)
         except Exception:
             raise serializers.ValidationError(self.INVALID_IMAGE_ERROR_MSG)
-        if img.format not in self.IMAGE_FORMATS:
+        if format not in self.IMAGE_FORMATS:
             raise serializers.ValidationError(self.UNSUPPORTED_FORMAT_ERROR_MSG)
         return value
 
     def update(self, instance, validated_data):
-        """Override update to handle image replacement."""
+        """
+        Override update to handle image replacement.
+        The replaced file is queued for deletion once the update commits.
+        """
+        old_image = None
         # Only delete old image if a new image is being provided and it's different
         if "image" in validated_data and validated_data.get("image") and instance.image:
-            new_image = validated_data["image"]
-            # Only delete if we're actually replacing with a different image
-            if new_image != instance.image:
-                old_image_path = instance.image.path
-                if os.path.isfile(old_image_path):
-                    os.remove(old_image_path)
-        return super().update(instance, validated_data)
+            if validated_data["image"] != instance.image:
+                old_image = instance.image
+
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            # Never queue the file the instance now points at
+            if old_image and old_image.name != instance.image.name:
+                file_deletion_queue.schedule_file(old_image)
+        return instance
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .file_deletion import file_deletion_queue
+from .models import Product
+
+
+@receiver(post_delete, sender=Product)
+def delete_product_image(sender, instance, using, **kwargs):
+    """
+    Queue the image of a deleted product for removal once the delete commits.
+    Also covers queryset deletes, which never call ``Product.delete()``.
+    """
+    file_deletion_queue.schedule_file(instance.image, using=using)
@@ -0,0 +1,148 @@
+import json
+import uuid
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from rest_framework import status
+
+from apps.catalog.models import Category
+from apps.catalog.views import (
+    AsyncCategoryDetailView,
+    AsyncCategoryListView,
+    AsyncProductDetailView,
+    AsyncProductListView,
+)
+from apps.users.services import issue_token_pair
+from tests.constants import URLs
+
+
+def call_async_view(
+    view_class, path, params=None, method="get", headers=None, **kwargs
+):
+    """Run an async catalog view on a request built for ``path``."""
+    request = getattr(RequestFactory(), method)(path, params or {}, headers=headers)
+    return async_to_sync(view_class.as_view())(request, **kwargs)
+
+
+@pytest.mark.django_db
+class TestAsyncCatalogViews:
+    """Test the async list/retrieve views answer exactly like the DRF views."""
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {},
+            {"page": 2},
+            {"page": "last", "page_size": 7},
+            {"ordering": "-price"},
+            {"search": "product 1"},
+        ],
+    )
+    def test_product_list_matches_drf(self, api_client, create_products, params):
+        """Test pagination, ordering and search give the DRF response."""
+        create_products(25)
+        url = URLs.PRODUCT_LIST.value
+
+        expected = api_client.get(url, params)
+        response = call_async_view(AsyncProductListView, url, params)
+
+        assert response.status_code == expected.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == expected.json()
+
+    @pytest.mark.parametrize(
+        "params", [{"page": 9}, {"category__id": "not-a-uuid"}], ids=["page", "filter"]
+    )
+    def test_product_list_errors_match_drf(self, api_client, create_products, params):
+        """Test invalid pages and filters fail like the DRF view."""
+        create_products(3)
+        url = URLs.PRODUCT_LIST.value
+
+        expected = api_client.get(url, params)
+        response = call_async_view(AsyncProductListView, url, params)
+
+        assert response.status_code == expected.status_code
+        assert json.loads(response.content) == expected.json()
+
+    def test_product_detail_matches_drf(self, api_client, default_product):
+        """Test retrieving a product gives the DRF response."""
+        url = URLs.PRODUCT_DETAIL.value.format(product_id=default_product.id)
+
+        expected = api_client.get(url)
+        response = call_async_view(AsyncProductDetailView, url, pk=default_product.id)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == expected.json()
+
+    def test_missing_product_is_not_found(self, api_client):
+        """Test an unknown id gives the DRF 404 body."""
+        product_id = uuid.uuid4()
+        url = URLs.PRODUCT_DETAIL.value.format(product_id=product_id)
+
+        expected = api_client.get(url)
+        response = call_async_view(AsyncProductDetailView, url, pk=product_id)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert json.loads(response.content) == expected.json()
+
+    def test_category_list_and_detail_match_drf(self, api_client, create_categories):
+        """Test the unpaginated category list and category detail."""
+        category = create_categories(3)[0]
+        list_url = URLs.CATEGORY_LIST.value
+        detail_url = URLs.CATEGORY_DETAIL.value.format(category_id=category.id)
+
+        listed = call_async_view(AsyncCategoryListView, list_url)
+        detail = call_async_view(AsyncCategoryDetailView, detail_url, pk=category.id)
+
+        assert json.loads(listed.content) == api_client.get(list_url).json()
+        assert json.loads(detail.content) == api_client.get(detail_url).json()
+
+    def test_writes_fall_back_to_drf(self):
+        """Test non-GET methods are handled by the DRF viewset and its permissions."""
+        response = call_async_view(
+            AsyncCategoryListView, URLs.CATEGORY_LIST.value, method="post"
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert not Category.objects.exists()
+
+    def test_invalid_token_is_rejected_like_drf(self, api_client):
+        """Test a bad bearer token gets the DRF 401, not a public read."""
+        url = URLs.PRODUCT_LIST.value
+        headers = {"Authorization": "Bearer not-a-token"}
+
+        expected = api_client.get(url, headers=headers)
+        response = call_async_view(AsyncProductListView, url, headers=headers)
+
+        assert response.status_code == expected.status_code
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response["WWW-Authenticate"] == expected["WWW-Authenticate"]
+        assert json.loads(response.content) == expected.json()
+
+    def test_valid_token_reads(self, admin_user, create_products):
+        """Test an authenticated read is answered by the async view."""
+        create_products(2)
+        access = issue_token_pair(admin_user)["access"]
+
+        response = call_async_view(
+            AsyncProductListView,
+            URLs.PRODUCT_LIST.value,
+            headers={"Authorization": f"Bearer {access}"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content)["count"] == 2
+
+    def test_content_negotiation(self, create_products):
+        """Test the browsable API is served and unknown formats are refused."""
+        create_products(1)
+        url = URLs.PRODUCT_LIST.value
+
+        browsable = call_async_view(
+            AsyncProductListView, url, headers={"Accept": "text/html"}
+        )
+        unknown = call_async_view(AsyncProductListView, url, {"format": "xml"})
+
+        assert browsable.status_code == status.HTTP_200_OK
+        assert browsable["Content-Type"].startswith("text/html")
+        assert unknown.status_code == status.HTTP_404_NOT_FOUND
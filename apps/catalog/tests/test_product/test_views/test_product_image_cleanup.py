@@ -0,0 +1,162 @@
+import os
+
+import pytest
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from rest_framework import status
+
+from apps.catalog.file_deletion import FileDeletionQueue, file_deletion_queue
+from apps.catalog.models import Product
+from tests.constants import Formats, URLs, get_test_product_data
+
+
+@pytest.fixture
+def product_with_image(product_factory, default_category, test_image):
+    """Returns a factory creating products that have an image file on disk."""
+
+    def create_product(index=0, color="red"):
+        product_data = get_test_product_data(index, category=default_category)
+        product_data["image"] = test_image(color=color)
+        return product_factory(**product_data)
+
+    return create_product
+
+
+@pytest.mark.django_db
+class TestProductImageCleanup:
+    """Test that orphaned product images are removed after commit."""
+
+    def test_delete_product_removes_image_after_commit(
+        self,
+        admin_authenticated_client,
+        product_with_image,
+        temp_media_root,
+        django_capture_on_commit_callbacks,
+    ):
+        """Test deleting a product queues its image and removes it on commit."""
+        product = product_with_image()
+        image_path = product.image.path
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            response = admin_authenticated_client.delete(
+                URLs.PRODUCT_DETAIL.value.format(product_id=product.id)
+            )
+            # Nothing is removed until the transaction commits
+            assert os.path.exists(image_path)
+        file_deletion_queue.flush()
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert len(callbacks) == 1
+        assert not os.path.exists(image_path)
+
+    def test_rolled_back_delete_keeps_image(
+        self, product_with_image, temp_media_root, django_capture_on_commit_callbacks
+    ):
+        """Test the image survives when the delete is rolled back."""
+        product = product_with_image()
+        product_id, image_path = product.id, product.image.path
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    product.delete()
+                    raise RuntimeError("rollback")
+        file_deletion_queue.flush()
+
+        assert callbacks == []
+        assert Product.objects.filter(id=product_id).exists()
+        assert os.path.exists(image_path)
+
+    def test_queryset_delete_removes_images(
+        self, product_with_image, temp_media_root, django_capture_on_commit_callbacks
+    ):
+        """Test bulk queryset deletes do not leak image files."""
+        products = [product_with_image(i) for i in range(3)]
+        image_paths = [product.image.path for product in products]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Product.objects.filter(id__in=[p.id for p in products]).delete()
+        file_deletion_queue.flush()
+
+        assert not Product.objects.exists()
+        assert not any(os.path.exists(path) for path in image_paths)
+
+    def test_replace_image_removes_old_file(
+        self,
+        admin_authenticated_client,
+        product_with_image,
+        test_image,
+        temp_media_root,
+        django_capture_on_commit_callbacks,
+    ):
+        """Test replacing an image removes the previous file but keeps the new one."""
+        product = product_with_image(color="blue")
+        original_image_path = product.image.path
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_authenticated_client.patch(
+                URLs.PRODUCT_DETAIL.value.format(product_id=product.id),
+                {"image": test_image(color="green")},
+                format=Formats.MULTIPART.value,
+            )
+        file_deletion_queue.flush()
+
+        assert response.status_code == status.HTTP_200_OK
+        product.refresh_from_db()
+        assert not os.path.exists(original_image_path)
+        assert os.path.exists(product.image.path)
+
+    def test_remove_image_endpoint_removes_file(
+        self,
+        admin_authenticated_client,
+        product_with_image,
+        temp_media_root,
+        django_capture_on_commit_callbacks,
+    ):
+        """Test the delete_image action removes the file after commit."""
+        product = product_with_image()
+        image_path = product.image.path
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_authenticated_client.delete(
+                URLs.PRODUCT_REMOVE_IMAGE.value.format(product_id=product.id)
+            )
+        file_deletion_queue.flush()
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        product.refresh_from_db()
+        assert not product.image
+        assert not os.path.exists(image_path)
+
+
+class FailingStorage:
+    """Raises a storage error that is not an OSError for one file."""
+
+    def __init__(self, failing_name):
+        self.failing_name = failing_name
+
+    def delete(self, name):
+        if name == self.failing_name:
+            raise SuspiciousFileOperation(f"Detected path traversal: {name}")
+        default_storage.delete(name)
+
+
+def test_storage_errors_do_not_stop_the_queue(temp_media_root, caplog):
+    """Test a file the storage fails on is logged and later files still go."""
+    names = [
+        default_storage.save(f"products/{i}.txt", ContentFile(b"x")) for i in range(3)
+    ]
+    storage = FailingStorage("../outside.txt")
+    deletion_queue = FileDeletionQueue(batch_size=2)
+
+    deletion_queue.enqueue(storage, names[0])
+    deletion_queue.enqueue(storage, "../outside.txt")
+    deletion_queue.enqueue(storage, names[1])
+    deletion_queue.flush()
+    deletion_queue.enqueue(storage, names[2])
+    deletion_queue.flush()
+
+    assert not any(default_storage.exists(name) for name in names)
+    assert "Error deleting file '../outside.txt'" in caplog.text
@@ -6,6 +6,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 from rest_framework import status
 
+from apps.catalog.file_deletion import file_deletion_queue
 from apps.catalog.models import Product
 from tests.constants import Formats, URLs, get_test_product_data
 
@@ -436,6 +437,7 @@ class TestProductImageDeletion:
         default_category,
         test_image,
         temp_media_root,
+        django_capture_on_commit_callbacks,
     ):
         """Test that image files are deleted when product is deleted."""
         # Create product with image
@@ -447,10 +449,12 @@ class TestProductImageDeletion:
         image_path = product.image.path
         assert os.path.exists(image_path)  # Verify image file exists
 
-        # Delete product
-        response = admin_authenticated_client.delete(
-            URLs.PRODUCT_DETAIL.value.format(product_id=product.id)
-        )
+        # Delete product; the file is removed once the delete commits
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_authenticated_client.delete(
+                URLs.PRODUCT_DETAIL.value.format(product_id=product.id)
+            )
+        file_deletion_queue.flush()
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
 
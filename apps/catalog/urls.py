@@ -1,6 +1,15 @@
+from django.conf import settings
+from django.urls import path
 from rest_framework_nested import routers
 
-from .views import CategoryViewSet, ProductViewSet
+from .views import (
+    AsyncCategoryDetailView,
+    AsyncCategoryListView,
+    AsyncProductDetailView,
+    AsyncProductListView,
+    CategoryViewSet,
+    ProductViewSet,
+)
 
 router = routers.DefaultRouter()
 router.register(r"categories", CategoryViewSet, basename="category")
@@ -8,3 +17,14 @@ router.register(r"products", ProductViewSet, basename="product")
 app_name = "catalog"
 
 urlpatterns = router.urls
+
+if settings.ASYNC_CATALOG:
+    # Matched before the router, so list/retrieve run natively async. The
+    # uuid converter leaves extra actions such as bulk-upload to the router.
+    urlpatterns = [
+        path("categories/", AsyncCategoryListView.as_view()),
+        path("categories/<uuid:pk>/", AsyncCategoryDetailView.as_view()),
+        path("products/", AsyncProductListView.as_view()),
+        path("products/<uuid:pk>/", AsyncProductDetailView.as_view()),
+        *router.urls,
+    ]
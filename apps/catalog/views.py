@@ -1,18 +1,26 @@
 import logging
-from io import BytesIO
+import time
 
+from asgiref.sync import sync_to_async
 from django.core.files.base import ContentFile
-from django.http import HttpResponse
+from django.core.paginator import InvalidPage
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
-from PIL import Image
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from core.metrics import observe_bulk_upload
+from core.openapi import swagger_schema
+
+from .file_deletion import file_deletion_queue
+from .images import compress_image
 from .models import Category, Product
 from .paginations import ProductPagination
 from .permissions import IsAdminOrReadOnly
@@ -46,14 +54,14 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         super().perform_create(serializer)
-        logger.info(f"Category created: {serializer.data.get('name')}")
+        logger.info("Category created: %s", serializer.data.get("name"))
 
     def perform_update(self, serializer):
         super().perform_update(serializer)
-        logger.info(f"Category updated: {serializer.data.get('name')}")
+        logger.info("Category updated: %s", serializer.data.get("name"))
 
     def perform_destroy(self, instance):
-        logger.info(f"Category deleted: {instance.name}")
+        logger.info("Category deleted: %s", instance.name)
         super().perform_destroy(instance)
 
     @action(
@@ -63,67 +71,77 @@ class CategoryViewSet(viewsets.ModelViewSet):
         parser_classes=[MultiPartParser],
         permission_classes=[IsAdminUser],
     )
-    @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                name="file",
-                in_=openapi.IN_FORM,
-                type=openapi.TYPE_FILE,
-                required=True,
-                description="CSV file with 'name' and 'description' columns for bulk category creation.",
-            )
-        ],
-        responses={
-            200: openapi.Response(
-                "All categories created successfully.",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "status": openapi.Schema(type=openapi.TYPE_STRING),
-                        "success_count": openapi.Schema(type=openapi.TYPE_INTEGER),
-                        "error_count": openapi.Schema(type=openapi.TYPE_INTEGER),
-                        "errors": openapi.Schema(
-                            type=openapi.TYPE_ARRAY,
-                            items=openapi.Schema(
-                                type=openapi.TYPE_OBJECT,
-                                properties={
-                                    "row_number": openapi.Schema(
-                                        type=openapi.TYPE_INTEGER
-                                    ),
-                                    "data": openapi.Schema(type=openapi.TYPE_OBJECT),
-                                    "errors": openapi.Schema(type=openapi.TYPE_OBJECT),
-                                },
+    @swagger_schema(
+        lambda openapi: {
+            "manual_parameters": [
+                openapi.Parameter(
+                    name="file",
+                    in_=openapi.IN_FORM,
+                    type=openapi.TYPE_FILE,
+                    required=True,
+                    description="CSV file with 'name' and 'description' columns for bulk category creation.",
+                )
+            ],
+            "responses": {
+                200: openapi.Response(
+                    "All categories created successfully.",
+                    schema=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "status": openapi.Schema(type=openapi.TYPE_STRING),
+                            "success_count": openapi.Schema(type=openapi.TYPE_INTEGER),
+                            "error_count": openapi.Schema(type=openapi.TYPE_INTEGER),
+                            "errors": openapi.Schema(
+                                type=openapi.TYPE_ARRAY,
+                                items=openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    properties={
+                                        "row_number": openapi.Schema(
+                                            type=openapi.TYPE_INTEGER
+                                        ),
+                                        "data": openapi.Schema(
+                                            type=openapi.TYPE_OBJECT
+                                        ),
+                                        "errors": openapi.Schema(
+                                            type=openapi.TYPE_OBJECT
+                                        ),
+                                    },
+                                ),
                             ),
-                        ),
-                    },
+                        },
+                    ),
                 ),
-            ),
-            207: openapi.Response(
-                "Partial success: some categories created, some failed.",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "status": openapi.Schema(type=openapi.TYPE_STRING),
-                        "success_count": openapi.Schema(type=openapi.TYPE_INTEGER),
-                        "error_count": openapi.Schema(type=openapi.TYPE_INTEGER),
-                        "errors": openapi.Schema(
-                            type=openapi.TYPE_ARRAY,
-                            items=openapi.Schema(
-                                type=openapi.TYPE_OBJECT,
-                                properties={
-                                    "row_number": openapi.Schema(
-                                        type=openapi.TYPE_INTEGER
-                                    ),
-                                    "data": openapi.Schema(type=openapi.TYPE_OBJECT),
-                                    "errors": openapi.Schema(type=openapi.TYPE_OBJECT),
-                                },
+                207: openapi.Response(
+                    "Partial success: some categories created, some failed.",
+                    schema=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "status": openapi.Schema(type=openapi.TYPE_STRING),
+                            "success_count": openapi.Schema(type=openapi.TYPE_INTEGER),
+                            "error_count": openapi.Schema(type=openapi.TYPE_INTEGER),
+                            "errors": openapi.Schema(
+                                type=openapi.TYPE_ARRAY,
+                                items=openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    properties={
+                                        "row_number": openapi.Schema(
+                                            type=openapi.TYPE_INTEGER
+                                        ),
+                                        "data": openapi.Schema(
+                                            type=openapi.TYPE_OBJECT
+                                        ),
+                                        "errors": openapi.Schema(
+                                            type=openapi.TYPE_OBJECT
+                                        ),
+                                    },
+                                ),
                             ),
-                        ),
-                    },
+                        },
+                    ),
                 ),
-            ),
-            400: "Bad Request (e.g., no file uploaded or all rows failed).",
-        },
+                400: "Bad Request (e.g., no file uploaded or all rows failed).",
+            },
+        }
     )
     def bulk_upload(self, request):
         """
@@ -138,13 +156,23 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
         file_obj = request.data["file"]
         logger.info(
-            f"Starting bulk category upload by user '{request.user}' from file '{file_obj.name}'."
+            "Starting bulk category upload by user '%s' from file '%s'.",
+            request.user,
+            file_obj.name,
         )
 
+        started = time.perf_counter()
         result = process_category_csv(file_obj)
+        observe_bulk_upload(
+            "categories",
+            result["success_count"] + result["error_count"],
+            time.perf_counter() - started,
+        )
 
         logger.info(
-            f"Bulk category upload finished. Success: {result['success_count']}, Errors: {result['error_count']}."
+            "Bulk category upload finished. Success: %d, Errors: %d.",
+            result["success_count"],
+            result["error_count"],
         )
 
         if result["error_count"] > 0 and result["success_count"] == 0:
@@ -161,44 +189,48 @@ class CategoryViewSet(viewsets.ModelViewSet):
         url_path="download-errors",
         permission_classes=[IsAdminUser],
     )
-    @swagger_auto_schema(
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                "errors": openapi.Schema(
-                    type=openapi.TYPE_ARRAY,
-                    items=openapi.Schema(
-                        type=openapi.TYPE_OBJECT,
-                        properties={
-                            "data": openapi.Schema(
-                                type=openapi.TYPE_OBJECT,
-                                properties={
-                                    "name": openapi.Schema(type=openapi.TYPE_STRING),
-                                    "description": openapi.Schema(
-                                        type=openapi.TYPE_STRING
-                                    ),
-                                },
-                            ),
-                            "errors": openapi.Schema(type=openapi.TYPE_OBJECT),
-                        },
-                    ),
-                    description="The list of error objects from the bulk upload response.",
-                )
-            },
-            required=["errors"],
-        ),
-        responses={
-            200: openapi.Response(
-                "CSV file containing the rows that failed to upload.",
-                headers={
-                    "Content-Disposition": {
-                        "description": 'attachment; filename="failed_categories.csv"',
-                        "type": "string",
-                    }
+    @swagger_schema(
+        lambda openapi: {
+            "request_body": openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "errors": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                "data": openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    properties={
+                                        "name": openapi.Schema(
+                                            type=openapi.TYPE_STRING
+                                        ),
+                                        "description": openapi.Schema(
+                                            type=openapi.TYPE_STRING
+                                        ),
+                                    },
+                                ),
+                                "errors": openapi.Schema(type=openapi.TYPE_OBJECT),
+                            },
+                        ),
+                        description="The list of error objects from the bulk upload response.",
+                    )
                 },
+                required=["errors"],
             ),
-            400: "Bad Request (e.g., missing 'errors' field).",
-        },
+            "responses": {
+                200: openapi.Response(
+                    "CSV file containing the rows that failed to upload.",
+                    headers={
+                        "Content-Disposition": {
+                            "description": 'attachment; filename="failed_categories.csv"',
+                            "type": "string",
+                        }
+                    },
+                ),
+                400: "Bad Request (e.g., missing 'errors' field).",
+            },
+        }
     )
     def download_errors(self, request):
         """
@@ -249,19 +281,19 @@ class ProductViewSet(viewsets.ModelViewSet):
         instance = serializer.save()
         if instance.image:
             self._compress_image(instance)
-        logger.info(f"Product created: {serializer.data.get('name')}")
+        logger.info("Product created: %s", serializer.data.get("name"))
 
     def perform_update(self, serializer):
         """Handle image compression after product update."""
         instance = serializer.save()
         if instance.image:
             self._compress_image(instance)
-        logger.info(f"Product updated: {serializer.data.get('name')}")
+        logger.info("Product updated: %s", serializer.data.get("name"))
 
     def perform_destroy(self, instance):
-        """Delete associated image file when product is deleted."""
+        """Delete the product; its image file is removed after the delete commits."""
         instance.delete()
-        logger.info(f"Product deleted: {instance.name}")
+        logger.info("Product deleted: %s", instance.name)
 
     def _compress_image(self, instance):
         """
@@ -271,39 +303,27 @@ class ProductViewSet(viewsets.ModelViewSet):
         if not instance.image:
             return
         try:
-            image = Image.open(instance.image.path)
-
-            # Convert to RGB if necessary
-            if image.mode in ("RGBA", "P"):
-                image = image.convert("RGB")
-
-            # Resize image maintaining aspect ratio
-            if (
-                image.size[0] > self.IMAGE_MAX_WIDTH
-                or image.size[1] > self.IMAGE_MAX_HEIGHT
-            ):
-                image.thumbnail(
-                    (self.IMAGE_MAX_WIDTH, self.IMAGE_MAX_HEIGHT),
-                    Image.Resampling.LANCZOS,
-                )
-
-            # Save the compressed image to a BytesIO buffer
-            output = BytesIO()
-            image.save(output, format="JPEG", quality=85, optimize=True)
-            output.seek(0)
+            compressed = compress_image(
+                instance.image.path, self.IMAGE_MAX_WIDTH, self.IMAGE_MAX_HEIGHT
+            )
 
             # Replace the image field with the new compressed image
+            original_image = instance.image.name
             instance.image.save(
-                instance.image.name, ContentFile(output.getvalue()), save=False
+                instance.image.name, ContentFile(compressed), save=False
             )
             instance.save(update_fields=["image"])
 
-            # Close the BytesIO buffer
-            output.close()
+            # The storage never overwrites, so the uncompressed upload is left behind
+            if instance.image.name != original_image:
+                file_deletion_queue.schedule(instance.image.storage, original_image)
 
         except Exception as e:
             logger.error(
-                f"Error compressing image for product {instance.name}, Id: {instance.id}: {str(e)}"
+                "Error compressing image for product %s, Id: %s: %s",
+                instance.name,
+                instance.id,
+                e,
             )
 
     @action(detail=True, methods=["delete"], permission_classes=[IsAdminOrReadOnly])
@@ -314,33 +334,165 @@ class ProductViewSet(viewsets.ModelViewSet):
             return Response(
                 {"detail": "No image to delete."}, status=status.HTTP_400_BAD_REQUEST
             )
-        product.image.delete(save=True)
-        logger.info(f"Image deleted for product: {product.name}")
+        with transaction.atomic():
+            file_deletion_queue.schedule_file(product.image)
+            product.image = None
+            product.save(update_fields=["image"])
+        logger.info("Image deleted for product: %s", product.name)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                "category__id",
-                openapi.IN_QUERY,
-                description="Filter products by category ID (exact match) (UUID).",
-                type=openapi.TYPE_STRING,
-            ),
-            openapi.Parameter(
-                "ordering",
-                openapi.IN_QUERY,
-                description="Order products by field. Options: price, name, created_at (prefix with '-' for descending, e.g., -price).",
-                type=openapi.TYPE_STRING,
-                enum=["price", "name", "created_at", "-price", "-name", "-created_at"],
-            ),
-            openapi.Parameter(
-                "search",
-                openapi.IN_QUERY,
-                description="Search products by name (case-insensitive partial match).",
-                type=openapi.TYPE_STRING,
-            ),
-        ],
+    @swagger_schema(
+        lambda openapi: {
+            "manual_parameters": [
+                openapi.Parameter(
+                    "category__id",
+                    openapi.IN_QUERY,
+                    description="Filter products by category ID (exact match) (UUID).",
+                    type=openapi.TYPE_STRING,
+                ),
+                openapi.Parameter(
+                    "ordering",
+                    openapi.IN_QUERY,
+                    description="Order products by field. Options: price, name, created_at (prefix with '-' for descending, e.g., -price).",
+                    type=openapi.TYPE_STRING,
+                    enum=[
+                        "price",
+                        "name",
+                        "created_at",
+                        "-price",
+                        "-name",
+                        "-created_at",
+                    ],
+                ),
+                openapi.Parameter(
+                    "search",
+                    openapi.IN_QUERY,
+                    description="Search products by name (case-insensitive partial match).",
+                    type=openapi.TYPE_STRING,
+                ),
+            ],
+        }
     )
     def list(self, request, *args, **kwargs):
         logger.info("Product list viewed.")
         return super().list(request, *args, **kwargs)
+
+
+class AsyncCatalogView(View):
+    """
+    Native async ``list``/``retrieve`` for a catalog viewset, used when
+    ``ASYNC_CATALOG`` is enabled under ASGI.
+
+    GET and HEAD are answered with the async ORM, reusing the viewset's
+    authentication, content negotiation, permissions, queryset, filter
+    backends, pagination and serializer so responses match the DRF views.
+    Other methods, and requests for the browsable API, are handed to the
+    DRF viewset in a thread.
+    """
+
+    viewset = None
+    action = None
+    fallback_actions = None
+    fallback = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        fallback = sync_to_async(cls.viewset.as_view(cls.fallback_actions))
+        # Writes are handed to the DRF view, which does its own CSRF handling
+        return csrf_exempt(super().as_view(fallback=fallback, **initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await self.fallback(request, *args, **kwargs)
+        # What APIView.dispatch() does, with the handler awaited
+        view = self.viewset(
+            action_map={"get": self.action, "head": self.action},
+            args=args,
+            kwargs=kwargs,
+        )
+        view.headers = view.default_response_headers
+        drf_request = view.request = view.initialize_request(request, *args, **kwargs)
+        try:
+            if "HTTP_AUTHORIZATION" in request.META:
+                # Authenticating may load the user row. Thread-sensitive, so it
+                # uses the request's connection, which Django closes at the end
+                await sync_to_async(view.initial)(drf_request, *args, **kwargs)
+            else:
+                view.initial(drf_request, *args, **kwargs)
+            if drf_request.accepted_renderer.format != "json":
+                return await self.fallback(request, *args, **kwargs)
+            queryset = view.filter_queryset(view.get_queryset())
+            response = await self.get(drf_request, view, queryset, **kwargs)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        response = view.finalize_response(drf_request, response, *args, **kwargs)
+        return response.render()
+
+
+class AsyncCatalogListView(AsyncCatalogView):
+    action = "list"
+    fallback_actions = {"get": "list", "post": "create"}
+
+    async def get(self, request, view, queryset):
+        paginator = view.paginator
+        if paginator is None:
+            items = [obj async for obj in queryset]
+            return Response(view.get_serializer(items, many=True).data)
+
+        # PageNumberPagination.paginate_queryset() with the count awaited
+        page_size = paginator.get_page_size(request)
+        django_paginator = paginator.django_paginator_class(queryset, page_size)
+        django_paginator.count = await queryset.acount()
+        page_number = paginator.get_page_number(request, django_paginator)
+        try:
+            paginator.page = django_paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                paginator.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            ) from exc
+        paginator.request = request
+        items = [obj async for obj in paginator.page.object_list]
+        return paginator.get_paginated_response(
+            view.get_serializer(items, many=True).data
+        )
+
+
+class AsyncCatalogDetailView(AsyncCatalogView):
+    action = "retrieve"
+    fallback_actions = {
+        "get": "retrieve",
+        "put": "update",
+        "patch": "partial_update",
+        "delete": "destroy",
+    }
+
+    async def get(self, request, view, queryset, pk):
+        try:
+            instance = await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist as exc:
+            raise Http404(
+                f"No {queryset.model._meta.object_name} matches the given query."
+            ) from exc
+        return Response(view.get_serializer(instance).data)
+
+
+class AsyncCategoryListView(AsyncCatalogListView):
+    viewset = CategoryViewSet
+
+
+class AsyncCategoryDetailView(AsyncCatalogDetailView):
+    viewset = CategoryViewSet
+
+
+class AsyncProductListView(AsyncCatalogListView):
+    viewset = ProductViewSet
+
+    async def get(self, request, view, queryset):
+        logger.info("Product list viewed.")
+        return await super().get(request, view, queryset)
+
+
+class AsyncProductDetailView(AsyncCatalogDetailView):
+    viewset = ProductViewSet
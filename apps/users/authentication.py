@@ -0,0 +1,144 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import USER_CLAIMS
+
+
+class UserCache:
+    """
+    Small per-process cache of user rows with a short time-to-live.
+    Disabled when the TTL is 0.
+    """
+
+    def __init__(self, ttl=None, max_size=None):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, "JWT_USER_CACHE_TTL", 0)
+
+    @property
+    def max_size(self):
+        if self._max_size is not None:
+            return self._max_size
+        return getattr(settings, "JWT_USER_CACHE_MAX_SIZE", 1024)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+        # Each request gets its own copy so mutations never leak between them
+        return copy.copy(user)
+
+    def set(self, key, user):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class ClaimsUser:
+    """
+    Stateless user built from the claims of a validated access token.
+
+    ``id``, ``email``, ``username``, ``is_staff`` and ``is_active`` are read
+    from the token. Any other attribute loads the full user row on first
+    access, going through the short-TTL ``user_cache``.
+    """
+
+    is_anonymous = False
+    is_authenticated = True
+
+    def __init__(self, user_model, validated_token):
+        self._user_model = user_model
+        self._user = None
+        self.pk = self.id = user_model._meta.pk.to_python(
+            validated_token[api_settings.USER_ID_CLAIM]
+        )
+        for claim in USER_CLAIMS:
+            setattr(self, claim, validated_token[claim])
+
+    def __str__(self):
+        return f"{self.username}, {self.email}"
+
+    def __eq__(self, other):
+        return getattr(other, "pk", None) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __getattr__(self, attr):
+        # Only reached for attributes that are not backed by a claim
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.get_user(), attr)
+
+    def get_user(self):
+        """Return the full user instance, loading it on first use."""
+        if self._user is None:
+            user = user_cache.get(self.pk)
+            if user is None:
+                try:
+                    user = self._user_model.objects.get(pk=self.pk)
+                except self._user_model.DoesNotExist as e:
+                    raise AuthenticationFailed(
+                        _("User not found"), code="user_not_found"
+                    ) from e
+                user_cache.set(self.pk, user)
+            self._user = user
+        return self._user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the user claims signed into the access
+    token instead of loading the user on every request. Claims can be up to
+    ``ACCESS_TOKEN_LIFETIME`` old.
+
+    Tokens issued without the claims, and ``CHECK_REVOKE_TOKEN`` which needs
+    the stored password hash, fall back to the database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or not all(
+            claim in validated_token
+            for claim in (api_settings.USER_ID_CLAIM, *USER_CLAIMS)
+        ):
+            return super().get_user(validated_token)
+
+        user = ClaimsUser(self.user_model, validated_token)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,127 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+    Answers "definitely absent" or "possibly present".
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.num_bits = max(
+            int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8
+        )
+        self.num_hashes = max(
+            int(round(self.num_bits / self.capacity * math.log(2))), 1
+        )
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions derived from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    @property
+    def is_full(self):
+        return self.count > self.capacity
+
+
+class BlacklistFilter:
+    """
+    Per-worker Bloom filter of blacklisted token JTIs.
+
+    Tokens the filter has not seen are accepted without a query; possible
+    matches are confirmed against ``BlacklistedToken``. The filter is loaded
+    in full once, then kept current by tokens blacklisted in this process
+    and by pulling rows added by other workers at most every
+    ``TOKEN_BLACKLIST_SYNC_INTERVAL`` seconds, which bounds how long another
+    worker's logout takes to apply here.
+    """
+
+    MIN_CAPACITY = 10_000
+
+    def __init__(self):
+        self._bloom = None
+        self._last_id = 0
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def sync_interval(self):
+        return getattr(settings, "TOKEN_BLACKLIST_SYNC_INTERVAL", 2)
+
+    @property
+    def error_rate(self):
+        return getattr(settings, "TOKEN_BLACKLIST_FILTER_ERROR_RATE", 0.001)
+
+    def load(self):
+        """Rebuild the filter from every row in the blacklist table."""
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        count = BlacklistedToken.objects.count()
+        self._bloom = BloomFilter(max(count * 2, self.MIN_CAPACITY), self.error_rate)
+        self._last_id = 0
+        self._pull(BlacklistedToken.objects.all())
+
+    def _pull(self, queryset):
+        rows = queryset.order_by("id").values_list("id", "token__jti")
+        for row_id, jti in rows.iterator(chunk_size=5000):
+            self._bloom.add(jti)
+            self._last_id = max(self._last_id, row_id)
+        self._synced_at = time.monotonic()
+
+    def sync(self, force=False):
+        """
+        Add rows blacklisted since the last sync, loading the filter if needed.
+        Returns the current Bloom filter.
+        """
+        with self._lock:
+            if self._bloom is None or self._bloom.is_full:
+                self._load()
+            elif force or time.monotonic() - self._synced_at >= self.sync_interval:
+                self._pull(BlacklistedToken.objects.filter(id__gt=self._last_id))
+            return self._bloom
+
+    def add(self, jti):
+        """Record a token blacklisted by this process."""
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._last_id = 0
+            self._synced_at = 0.0
+
+    def is_blacklisted(self, jti):
+        if jti not in self.sync():
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+blacklist_filter = BlacklistFilter()
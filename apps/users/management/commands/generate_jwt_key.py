@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.users.signing import ASYMMETRIC_ALGORITHMS
+
+
+class Command(BaseCommand):
+    help = "Create or retire the asymmetric keys used to sign JWTs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--algorithm",
+            choices=ASYMMETRIC_ALGORITHMS,
+            default=(
+                settings.JWT_ALGORITHM
+                if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS
+                else "RS256"
+            ),
+            help="Signing algorithm of the new key (default: JWT_ALGORITHM or RS256).",
+        )
+        parser.add_argument(
+            "--kid",
+            default=None,
+            help="Key id of the new key (default: current UTC time, YYYYMMDDHHMMSS).",
+        )
+        parser.add_argument(
+            "--key-size",
+            type=int,
+            default=2048,
+            help="RSA modulus size in bits (default: 2048).",
+        )
+        parser.add_argument(
+            "--retire",
+            metavar="KID",
+            default=None,
+            help="Replace the private key KID by its public key, so it only verifies.",
+        )
+
+    def handle(self, *args, **options):
+        keys_dir = Path(settings.JWT_KEYS_DIR)
+        keys_dir.mkdir(parents=True, exist_ok=True)
+
+        if options["retire"]:
+            self.retire(keys_dir, options["retire"])
+            return
+
+        kid = options["kid"] or timezone.now().strftime("%Y%m%d%H%M%S")
+        path = keys_dir / f"{kid}.pem"
+        if path.exists():
+            raise CommandError(f"Key '{kid}' already exists in {keys_dir}.")
+
+        if options["algorithm"] == "EdDSA":
+            private_key = ed25519.Ed25519PrivateKey.generate()
+        else:
+            private_key = rsa.generate_private_key(
+                public_exponent=65537, key_size=options["key_size"]
+            )
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        # Created owner-readable only, never briefly world-readable
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {options['algorithm']} key '{kid}' at {path}. "
+                "Restart the workers to publish it; it signs new tokens after "
+                f"{settings.JWT_KEY_ACTIVATION_SECONDS}s."
+            )
+        )
+
+    def retire(self, keys_dir, kid):
+        path = keys_dir / f"{kid}.pem"
+        if not path.exists():
+            raise CommandError(f"No private key '{kid}' in {keys_dir}.")
+        private_key = serialization.load_pem_private_key(
+            path.read_bytes(), password=None
+        )
+        (keys_dir / f"{kid}.pub.pem").write_bytes(
+            private_key.public_key().public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+        )
+        path.unlink()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Retired key '{kid}'; it now only verifies existing tokens."
+            )
+        )
@@ -0,0 +1,99 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from apps.users.services import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired JWT outstanding and blacklisted tokens in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Outstanding tokens deleted per transaction (default: 1000).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches (default: 0).",
+        )
+        parser.add_argument(
+            "--lock-timeout",
+            type=int,
+            default=None,
+            help="PostgreSQL lock_timeout in ms for each batch.",
+        )
+        parser.add_argument(
+            "--continuous",
+            action="store_true",
+            help="Keep running, pruning every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=3600,
+            help="Seconds between runs in continuous mode (default: 3600).",
+        )
+        parser.add_argument(
+            "--low-priority",
+            action="store_true",
+            help="Lower the CPU priority of this process and pause between batches.",
+        )
+        parser.add_argument(
+            "--vacuum",
+            action="store_true",
+            help="Run VACUUM (ANALYZE) on the token tables after each run (PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
+        pause = options["pause"]
+        if options["low_priority"]:
+            os.nice(10)
+            pause = pause or 0.5
+
+        while True:
+            result = prune_expired_tokens(
+                batch_size=options["batch_size"],
+                pause=pause,
+                lock_timeout=options["lock_timeout"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Reclaimed {result['outstanding']} outstanding and "
+                    f"{result['blacklisted']} blacklisted tokens in "
+                    f"{result['batches']} batches, {result['retries']} retried "
+                    f"({result['seconds']}s)."
+                )
+            )
+            if options["vacuum"] and result["outstanding"]:
+                self.vacuum()
+
+            if not options["continuous"]:
+                break
+            # Do not hold a connection the server may drop while sleeping
+            close_old_connections()
+            time.sleep(options["interval"])
+
+    def vacuum(self):
+        """Let PostgreSQL reuse the space and refresh planner statistics."""
+        if connection.vendor != "postgresql":
+            self.stdout.write(
+                self.style.WARNING("VACUUM is only supported on PostgreSQL. Skipping.")
+            )
+            return
+        with connection.cursor() as cursor:
+            for model in (BlacklistedToken, OutstandingToken):
+                cursor.execute(
+                    f"VACUUM (ANALYZE) {connection.ops.quote_name(model._meta.db_table)}"
+                )
+        self.stdout.write(self.style.SUCCESS("Token tables vacuumed."))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:09
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+import apps.users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0002_alter_user_id"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="user",
+            managers=[
+                ("objects", apps.users.models.CaseInsensitiveUserManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="users_user_email_lower_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+JOINED_INDEX = models.Index(
+    fields=["date_joined", "id"], name="users_user_joined_id_idx"
+)
+
+# Django runs istartswith as UPPER(col::text) LIKE UPPER('term%'), which can
+# only use an index on the same expression built with text_pattern_ops.
+POSTGRES_INDEXES = [
+    (
+        "users_user_joined_id_idx",
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "users_user_joined_id_idx" '
+        'ON "users_user" ("date_joined", "id")',
+    ),
+    (
+        "users_user_email_prefix_idx",
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "users_user_email_prefix_idx" '
+        'ON "users_user" (UPPER("email"::text) text_pattern_ops)',
+    ),
+    (
+        "users_user_username_prefix_idx",
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "users_user_username_prefix_idx" '
+        'ON "users_user" (UPPER("username"::text) text_pattern_ops)',
+    ),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.add_index(apps.get_model("users", "User"), JOINED_INDEX)
+        return
+    # Built concurrently so large user tables stay writable meanwhile
+    for _, sql in POSTGRES_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.remove_index(apps.get_model("users", "User"), JOINED_INDEX)
+        return
+    for name, _ in POSTGRES_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("users", "0003_user_email_lower_index"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="user", index=JOINED_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:54
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicates(apps, schema_editor):
+    # Fail with the offending emails rather than the constraint's IntegrityError
+    User = apps.get_model("users", "User")
+    duplicates = list(
+        User.objects.using(schema_editor.connection.alias)
+        .annotate(email_lower=Lower("email"))
+        .values("email_lower")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values_list("email_lower", flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot make user emails unique regardless of case, these emails "
+            "belong to more than one account: "
+            + ", ".join(sorted(duplicates))
+            + ". Merge or rename those accounts, then run the migration again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0004_user_directory_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="users_user_email_lower_uniq",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="user",
+            name="users_user_email_lower_idx",
+        ),
+    ]
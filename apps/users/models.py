@@ -1,7 +1,22 @@
 from uuid import uuid4
 
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.db.models.functions import Lower
+
+
+class CaseInsensitiveUserManager(UserManager):
+    """User manager storing and matching emails case-insensitively."""
+
+    @classmethod
+    def normalize_email(cls, email):
+        return super().normalize_email(email).lower()
+
+    def get_by_natural_key(self, username):
+        # Filtering on LOWER(email) lets the database use the unique index on it
+        return self.annotate(email_lower=Lower(self.model.USERNAME_FIELD)).get(
+            email_lower=username.lower()
+        )
 
 
 class User(AbstractUser):
@@ -11,5 +26,15 @@ class User(AbstractUser):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
 
+    objects = CaseInsensitiveUserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["date_joined", "id"], name="users_user_joined_id_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(Lower("email"), name="users_user_email_lower_uniq"),
+        ]
+
     def __str__(self):
         return f"{self.username}, {self.email}"
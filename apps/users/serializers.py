@@ -1,9 +1,24 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 
+from core.timing import TimedSerializerMixin
+
+from .blacklist import blacklist_filter
 from .models import User
+from .tokens import USER_CLAIMS, UserRefreshToken, UserUntypedToken
+from .write_buffer import record_login
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for User model.
     Handles serialization and deserialization of User instances.
@@ -25,8 +40,21 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "last_login", "date_joined")
         extra_kwargs = {
             "password": {"write_only": True},
+            "email": {
+                "validators": [
+                    UniqueValidator(
+                        queryset=User.objects.all(),
+                        message=_("user with this email already exists."),
+                        lookup="iexact",
+                    )
+                ]
+            },
         }
 
+    def validate_email(self, value):
+        """Store emails lowercased, as the unique constraint compares them."""
+        return User.objects.normalize_email(value)
+
     def create(self, validated_data):
         """Create and return a new User instance using Django's create_user method."""
         password = validated_data.pop("password", None)
@@ -59,3 +87,123 @@ class UserSerializer(serializers.ModelSerializer):
             instance.set_password(password)
 
         return super().update(instance, user_data)
+
+
+class AdminUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Read-only view of an account in the admin user directory."""
+
+    class Meta:
+        model = User
+        fields = [
+            "id",
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            "is_staff",
+            "is_active",
+            "date_joined",
+            "last_login",
+        ]
+        read_only_fields = fields
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    """
+    Validates one row of a bulk user import.
+    Uniqueness of email and username is checked for the whole batch at once
+    by the import service, so the per-row unique validators are dropped.
+    """
+
+    class Meta:
+        model = User
+        fields = ["email", "username", "password", "first_name", "last_name"]
+        extra_kwargs = {
+            "password": {"write_only": True},
+        }
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for field in fields.values():
+            field.validators = [
+                validator
+                for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Login serializer issuing tokens that carry the user claims read by
+    ``ClaimsJWTAuthentication``.
+    """
+
+    token_class = UserRefreshToken
+
+    def validate(self, attrs):
+        # TokenObtainPairSerializer.validate minus its direct last_login write
+        data = super(TokenObtainPairSerializer, self).validate(attrs)
+        refresh = self.get_token(self.user)
+        data["refresh"] = str(refresh)
+        data["access"] = str(refresh.access_token)
+        record_login(self.user)
+        return data
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer checking the blacklist through the Bloom filter.
+    The new access token gets its user claims from the current user row,
+    not from the refresh token, so they are never older than the access
+    token lifetime.
+    """
+
+    token_class = UserRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+
+        access = refresh.access_token
+        for claim in USER_CLAIMS:
+            access[claim] = getattr(user, claim)
+        data = {"access": str(access)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class UserTokenVerifySerializer(TokenVerifySerializer):
+    """
+    Verify serializer checking the signature with the configured key ring
+    and the blacklist through the Bloom filter.
+    """
+
+    def validate(self, attrs):
+        token = UserUntypedToken(attrs["token"])
+
+        if (
+            api_settings.BLACKLIST_AFTER_ROTATION
+            and "rest_framework_simplejwt.token_blacklist" in settings.INSTALLED_APPS
+        ):
+            jti = token.get(api_settings.JTI_CLAIM)
+            if jti and blacklist_filter.is_blacklisted(jti):
+                raise serializers.ValidationError(_("Token is blacklisted"))
+
+        return {}
@@ -0,0 +1,386 @@
+import asyncio
+import atexit
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from .models import User
+from .serializers import UserImportSerializer, UserTokenObtainPairSerializer
+from .write_buffer import record_login
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def password_executor():
+    """
+    Return the bounded thread pool used for password hashing.
+    Both PBKDF2 and Argon2 release the GIL, so the pool scales with cores.
+    """
+    global _executor, _executor_pid
+    # Pools do not survive fork(), so each worker builds its own
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.LOGIN_HASH_WORKERS,
+                    thread_name_prefix="password-hasher",
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+async def run_in_hasher_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor(), func, *args)
+
+
+async def aauthenticate(email, password):
+    """
+    Async counterpart of ``authenticate()`` for the email/password login.
+
+    The user lookup runs through Django's sync-to-async thread, while the
+    password hash runs in the bounded hasher pool so that a login burst
+    never blocks the event loop or the shared sync thread. Outdated hashes
+    are upgraded to the preferred hasher on success.
+    """
+    try:
+        user = await sync_to_async(User.objects.get_by_natural_key)(email)
+    except User.DoesNotExist:
+        # Hash anyway to keep the response time of unknown emails the same
+        await run_in_hasher_pool(make_password, password)
+        return None
+
+    is_correct, must_update = await run_in_hasher_pool(
+        verify_password, password, user.password
+    )
+    if not is_correct or not user.is_active:
+        return None
+    if must_update:
+        user.password = await run_in_hasher_pool(make_password, password)
+        await user.asave(update_fields=["password"])
+    return user
+
+
+def issue_token_pair(user):
+    """Issue the refresh/access pair returned by the login endpoints."""
+    refresh = UserTokenObtainPairSerializer.get_token(user)
+    record_login(user)
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+def prune_expired_tokens(batch_size=1000, pause=0.0, lock_timeout=None, retries=5):
+    """
+    Delete expired outstanding tokens, and their blacklist entries, in
+    batches of ``batch_size`` rows.
+
+    Each batch runs in its own short transaction so that locks are held
+    briefly, with ``pause`` seconds between batches to leave headroom for
+    live traffic. On PostgreSQL, ``lock_timeout`` (ms) makes a batch give up
+    instead of queueing behind a conflicting lock; the batch is then retried
+    after a growing delay, up to ``retries`` times in a row.
+
+    Returns a dict with the number of rows reclaimed per table, the number
+    of batches and retries, and the elapsed time in seconds.
+    """
+    started = time.perf_counter()
+    cutoff = timezone.now()
+    result = {"outstanding": 0, "blacklisted": 0, "batches": 0, "retries": 0}
+    blacklisted_label = BlacklistedToken._meta.label
+    failures = 0
+
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        try:
+            with transaction.atomic():
+                if lock_timeout and connection.vendor == "postgresql":
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            "SELECT set_config('lock_timeout', %s, true)",
+                            [f"{lock_timeout}ms"],
+                        )
+                _, deleted = OutstandingToken.objects.filter(id__in=ids).delete()
+        except OperationalError as e:
+            failures += 1
+            if failures > retries:
+                raise
+            logger.warning(
+                "Token prune batch failed (%s), retry %d of %d.", e, failures, retries
+            )
+            result["retries"] += 1
+            time.sleep(max(pause, 0.1) * 2**failures)
+            continue
+        failures = 0
+        result["outstanding"] += deleted.get(OutstandingToken._meta.label, 0)
+        result["blacklisted"] += deleted.get(blacklisted_label, 0)
+        result["batches"] += 1
+        if pause:
+            time.sleep(pause)
+
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+IMPORT_REQUIRED_COLUMNS = {"email", "username", "password"}
+
+
+def _import_error(row_number, data, errors):
+    # Never echo passwords back in the per-row report
+    data = {key: value for key, value in data.items() if key != "password"}
+    return {"row_number": row_number, "data": data, "errors": errors}
+
+
+def _read_import_rows(file_obj):
+    """
+    Parse an uploaded CSV or JSON file into ``(row_number, row)`` pairs.
+    JSON files hold a list of objects; CSV rows are numbered from 2 since
+    row 1 is the header.
+    """
+    text = file_obj.read().decode("utf-8")
+    if file_obj.name.lower().endswith(".json"):
+        rows = json.loads(text)
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise ValueError("Expected a JSON list of user objects.")
+        columns = set().union(*rows) if rows else set()
+        return columns, list(enumerate(rows, start=1))
+
+    reader = csv.DictReader(io.StringIO(text))
+    return set(reader.fieldnames or []), list(enumerate(reader, start=2))
+
+
+_process_pool = None
+_process_pool_key = None
+
+
+def import_hasher_pool():
+    """
+    Return the process pool hashing imported passwords, started on first use.
+    Its processes come from a fork server (or are spawned where there is
+    none) rather than forking this worker with its connections and threads.
+    """
+    global _process_pool, _process_pool_key
+    key = (os.getpid(), settings.USER_IMPORT_HASH_WORKERS)
+    if _process_pool_key != key:
+        with _executor_lock:
+            if _process_pool_key != key:
+                # A pool inherited over a fork belongs to the parent
+                if _process_pool is not None and _process_pool_key[0] == key[0]:
+                    _process_pool.shutdown(wait=False)
+                methods = multiprocessing.get_all_start_methods()
+                method = "forkserver" if "forkserver" in methods else "spawn"
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=settings.USER_IMPORT_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context(method),
+                    # Unlike forks, the processes start without the app registry;
+                    # this module cannot be imported before it is set up
+                    initializer=django.setup,
+                )
+                _process_pool_key = key
+    return _process_pool
+
+
+def _shutdown_import_hasher_pool():
+    if _process_pool is not None and _process_pool_key[0] == os.getpid():
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_import_hasher_pool)
+
+
+def hash_passwords(passwords):
+    """
+    Hash ``passwords`` with the default hasher, spreading the work across
+    ``USER_IMPORT_HASH_WORKERS`` processes. Small batches, or a single
+    worker, are hashed in this process.
+    """
+    workers = min(settings.USER_IMPORT_HASH_WORKERS, len(passwords))
+    if workers <= 1:
+        return [make_password(password) for password in passwords]
+    chunksize = max(len(passwords) // (workers * 4), 1)
+    return list(import_hasher_pool().map(make_password, passwords, chunksize=chunksize))
+
+
+def _find_taken(valid_rows, batch_size):
+    """Return the lowercased emails and the usernames already in use."""
+    emails = [data["email"].lower() for _, data, _ in valid_rows]
+    usernames = [data["username"] for _, data, _ in valid_rows]
+    taken_emails, taken_usernames = set(), set()
+    for start in range(0, len(valid_rows), batch_size):
+        taken_emails.update(
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=emails[start : start + batch_size])
+            .values_list("email_lower", flat=True)
+        )
+        taken_usernames.update(
+            User.objects.filter(
+                username__in=usernames[start : start + batch_size]
+            ).values_list("username", flat=True)
+        )
+    return taken_emails, taken_usernames
+
+
+def _create_users(pending, batch_size):
+    """
+    Insert ``(row_number, row, user)`` entries with ``bulk_create``.
+    A batch hitting a concurrent insert is retried row by row so that only
+    the conflicting rows are reported. Returns ``(created, errors)``.
+    """
+    created, errors = 0, []
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start : start + batch_size]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, _, user in batch])
+            created += len(batch)
+            continue
+        except IntegrityError:
+            logger.warning(
+                "User import batch at row %d conflicted, retrying per row.", batch[0][0]
+            )
+        for row_number, row, user in batch:
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                created += 1
+            except IntegrityError:
+                errors.append(
+                    _import_error(
+                        row_number,
+                        row,
+                        {
+                            "non_field_errors": [
+                                "A user with this email or username already exists."
+                            ]
+                        },
+                    )
+                )
+    return created, errors
+
+
+def process_user_import(file_obj):
+    """
+    Bulk-create users from a CSV or JSON file.
+
+    Rows are validated field by field, then email and username uniqueness is
+    checked against the database in batches of ``USER_IMPORT_BATCH_SIZE``
+    and within the file itself. Passwords are hashed across a process pool
+    and the users are written with ``bulk_create``.
+
+    Args:
+        file_obj: An uploaded file with 'email', 'username' and 'password'
+            columns, and optionally 'first_name' and 'last_name'.
+
+    Returns:
+        A dictionary containing the results of the operation, including
+        success count, error count, and a list of detailed errors.
+    """
+    try:
+        columns, rows = _read_import_rows(file_obj)
+    except (UnicodeDecodeError, csv.Error, ValueError) as e:
+        logger.error("User import failed: %s", e)
+        return {
+            "status": "Error",
+            "success_count": 0,
+            "error_count": 1,
+            "errors": [_import_error(1, {}, {"file": f"Invalid file format: {e}"})],
+        }
+
+    if not IMPORT_REQUIRED_COLUMNS.issubset(columns):
+        missing = sorted(IMPORT_REQUIRED_COLUMNS - columns)
+        return {
+            "status": "Error",
+            "success_count": 0,
+            "error_count": 1,
+            "errors": [
+                _import_error(
+                    None,
+                    {},
+                    {"headers": f"Missing required columns: {', '.join(missing)}"},
+                )
+            ],
+        }
+
+    errors = []
+    valid_rows = []
+    for row_number, row in rows:
+        serializer = UserImportSerializer(data=row)
+        if serializer.is_valid():
+            valid_rows.append((row_number, serializer.validated_data, row))
+        else:
+            errors.append(_import_error(row_number, row, serializer.errors))
+
+    batch_size = settings.USER_IMPORT_BATCH_SIZE
+    taken_emails, taken_usernames = _find_taken(valid_rows, batch_size)
+    unique_rows = []
+    for row_number, data, row in valid_rows:
+        row_errors = {}
+        if data["email"].lower() in taken_emails:
+            row_errors["email"] = ["A user with this email already exists."]
+        if data["username"] in taken_usernames:
+            row_errors["username"] = ["A user with that username already exists."]
+        if row_errors:
+            errors.append(_import_error(row_number, row, row_errors))
+            continue
+        # Later rows with the same email or username count as duplicates
+        taken_emails.add(data["email"].lower())
+        taken_usernames.add(data["username"])
+        unique_rows.append((row_number, data, row))
+
+    hashed = hash_passwords([data["password"] for _, data, _ in unique_rows])
+    pending = [
+        (
+            row_number,
+            row,
+            User(
+                email=User.objects.normalize_email(data["email"]),
+                username=User.normalize_username(data["username"]),
+                first_name=data.get("first_name", ""),
+                last_name=data.get("last_name", ""),
+                password=password,
+                is_active=True,
+            ),
+        )
+        for (row_number, data, row), password in zip(unique_rows, hashed)
+    ]
+    success_count, create_errors = _create_users(pending, batch_size)
+    errors.extend(create_errors)
+    errors.sort(key=lambda error: error["row_number"] or 0)
+
+    error_count = len(errors)
+    status = "Import completed successfully."
+    if error_count > 0:
+        status = f"Import completed with {error_count} errors."
+
+    return {
+        "status": status,
+        "success_count": success_count,
+        "error_count": error_count,
+        "errors": errors,
+    }
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+import jwt
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import get_default_algorithms
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "EdDSA")
+
+
+class JWTKeyRing:
+    """
+    Signing keys loaded from ``JWT_KEYS_DIR``.
+
+    Every ``<kid>.pem`` private key can verify tokens. New ones are signed
+    by the key named by ``JWT_ACTIVE_KEY_ID`` or else by the last kid in
+    sort order whose file is at least ``activation_delay`` seconds old, so
+    that services caching the JWKS have seen a key before tokens use it.
+    A retired key whose private part has been destroyed can stay as a
+    ``<kid>.pub.pem`` public key until the tokens it signed have expired.
+    """
+
+    def __init__(self, algorithm, keys_dir, active_kid=None, activation_delay=0):
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self.public_keys = {}
+        self._private_keys = {}
+        self._activates_at = {}
+
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            data = path.read_bytes()
+            if path.name.endswith(".pub.pem"):
+                kid = path.name[: -len(".pub.pem")]
+                self.public_keys[kid] = self._algorithm.prepare_key(data)
+            else:
+                kid = path.stem
+                self._private_keys[kid] = self._algorithm.prepare_key(data)
+                self.public_keys[kid] = self._private_keys[kid].public_key()
+                self._activates_at[kid] = path.stat().st_mtime + activation_delay
+
+        if not self._private_keys:
+            raise ImproperlyConfigured(
+                f"No {algorithm} private key found in JWT_KEYS_DIR '{keys_dir}'."
+            )
+        if active_kid and active_kid not in self._private_keys:
+            raise ImproperlyConfigured(
+                f"JWT_ACTIVE_KEY_ID '{active_kid}' has no private key."
+            )
+
+    @property
+    def signing_kid(self):
+        if self.active_kid:
+            return self.active_kid
+        now = time.time()
+        active = [kid for kid, at in self._activates_at.items() if at <= now]
+        # Until a key has been published long enough, the oldest one signs
+        return max(active) if active else min(self._private_keys)
+
+    @property
+    def signing_key(self):
+        return self._private_keys[self.signing_kid]
+
+    @property
+    def _algorithm(self):
+        return get_default_algorithms()[self.algorithm]
+
+    def jwks(self):
+        """Return the public keys as a JSON Web Key Set."""
+        keys = []
+        for kid, key in self.public_keys.items():
+            jwk = self._algorithm.to_jwk(key, as_dict=True)
+            jwk.update({"kid": kid, "alg": self.algorithm, "use": "sig"})
+            keys.append(jwk)
+        return {"keys": keys}
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    Token backend signing with the active key of a ``JWTKeyRing`` and
+    verifying with whichever of its public keys the token's ``kid`` names.
+    """
+
+    def __init__(self, key_ring, **kwargs):
+        super().__init__(key_ring.algorithm, **kwargs)
+        self.key_ring = key_ring
+
+    @property
+    def prepared_signing_key(self):
+        return self.key_ring.signing_key
+
+    def get_verifying_key(self, token):
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError as e:
+            raise TokenBackendError(_("Token is invalid")) from e
+        if kid not in self.key_ring.public_keys:
+            raise TokenBackendError(_("Token is invalid"))
+        return self.key_ring.public_keys[kid]
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+        # Read once: the signing key can change between two reads
+        kid = self.key_ring.signing_kid
+        return jwt.encode(
+            jwt_payload,
+            self.key_ring._private_keys[kid],
+            algorithm=self.algorithm,
+            headers={"kid": kid},
+            json_encoder=self.json_encoder,
+        )
+
+
+_backend = None
+_jwks = None
+_lock = threading.Lock()
+
+
+def get_token_backend():
+    """
+    Return the token backend for ``JWT_ALGORITHM``, built on first use.
+    HMAC algorithms sign with ``SIMPLE_JWT["SIGNING_KEY"]``, asymmetric
+    ones with the key ring in ``JWT_KEYS_DIR``.
+    """
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = _build_backend()
+    return _backend
+
+
+def _build_backend():
+    algorithm = settings.JWT_ALGORITHM
+    kwargs = {
+        "audience": api_settings.AUDIENCE,
+        "issuer": api_settings.ISSUER,
+        "leeway": api_settings.LEEWAY,
+        "json_encoder": api_settings.JSON_ENCODER,
+    }
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        return TokenBackend(algorithm, api_settings.SIGNING_KEY, **kwargs)
+    key_ring = JWTKeyRing(
+        algorithm,
+        settings.JWT_KEYS_DIR,
+        settings.JWT_ACTIVE_KEY_ID or None,
+        settings.JWT_KEY_ACTIVATION_SECONDS,
+    )
+    return KeyRingTokenBackend(key_ring, **kwargs)
+
+
+def get_jwks():
+    """
+    Return the serialized JWKS and its ETag. Shared secrets are never
+    published, so HMAC algorithms give an empty key set.
+    """
+    global _jwks
+    if _jwks is None:
+        backend = get_token_backend()
+        key_set = (
+            backend.key_ring.jwks()
+            if isinstance(backend, KeyRingTokenBackend)
+            else {"keys": []}
+        )
+        body = json.dumps(key_set, sort_keys=True).encode()
+        _jwks = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+    return _jwks
+
+
+def reset():
+    """Forget the loaded keys, e.g. after they were rotated on disk."""
+    global _backend, _jwks
+    with _lock:
+        _backend = _jwks = None
+
+
+@receiver(setting_changed)
+def reset_on_setting_changed(setting, **kwargs):
+    if setting.startswith("JWT_") or setting == "SIMPLE_JWT":
+        reset()
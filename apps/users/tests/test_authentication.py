@@ -0,0 +1,107 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.users.authentication import ClaimsUser, user_cache
+from apps.users.tokens import UserRefreshToken
+from tests.constants import UserTestData
+
+
+@pytest.fixture
+def bearer_client(api_client):
+    """Returns a function authenticating the API client with a real access token."""
+
+    def authenticate(token):
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return api_client
+
+    return authenticate
+
+
+@pytest.mark.django_db
+def test_login_tokens_carry_user_claims(api_client, default_user):
+    """Test the access token issued on login embeds the user claims."""
+    response = api_client.post(
+        reverse("login"),
+        {"email": default_user.email, "password": UserTestData.DEFAULT_PASSWORD.value},
+        format="json",
+    )
+
+    access = AccessToken(response.data["access"])
+    assert access["email"] == default_user.email
+    assert access["username"] == default_user.username
+    assert access["is_staff"] is False
+    assert access["is_active"] is True
+
+
+@pytest.mark.django_db
+def test_authentication_does_not_load_user(
+    bearer_client, default_user, django_assert_num_queries
+):
+    """Test an authenticated request only runs the view's own query."""
+    client = bearer_client(UserRefreshToken.for_user(default_user).access_token)
+
+    with django_assert_num_queries(1):
+        response = client.get(reverse("users:user-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data[0]["email"] == default_user.email
+
+
+@pytest.mark.django_db
+def test_claims_user_loads_full_user_lazily(default_user, django_assert_num_queries):
+    """Test attributes outside the claims load the user row once."""
+    token = UserRefreshToken.for_user(default_user).access_token
+    user = ClaimsUser(type(default_user), token)
+
+    with django_assert_num_queries(0):
+        assert user.id == default_user.id
+        assert user.email == default_user.email
+        assert user.is_staff is False
+    with django_assert_num_queries(1):
+        assert user.date_joined == default_user.date_joined
+        assert user.last_name == default_user.last_name
+
+
+@pytest.mark.django_db
+@override_settings(JWT_USER_CACHE_TTL=60)
+def test_claims_user_cache_reuses_loaded_user(default_user, django_assert_num_queries):
+    """Test the short-TTL cache serves the user row to later requests."""
+    user_cache.clear()
+    token = UserRefreshToken.for_user(default_user).access_token
+    ClaimsUser(type(default_user), token).get_user()
+
+    with django_assert_num_queries(0):
+        assert ClaimsUser(type(default_user), token).date_joined is not None
+
+    # Saving the user evicts it from the cache
+    default_user.save()
+    with django_assert_num_queries(1):
+        ClaimsUser(type(default_user), token).get_user()
+    user_cache.clear()
+
+
+@pytest.mark.django_db
+def test_inactive_claim_is_rejected(bearer_client, default_user):
+    """Test a token whose is_active claim is false is rejected."""
+    access = UserRefreshToken.for_user(default_user).access_token
+    access["is_active"] = False
+
+    response = bearer_client(access).get(reverse("users:user-list"))
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_token_without_claims_falls_back_to_database(
+    bearer_client, default_user, django_assert_num_queries
+):
+    """Test tokens issued before the claims existed still authenticate."""
+    client = bearer_client(RefreshToken.for_user(default_user).access_token)
+
+    with django_assert_num_queries(2):
+        response = client.get(reverse("users:user-list"))
+
+    assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,168 @@
+import itertools
+import os
+import time
+from io import StringIO
+from unittest import mock
+
+import jwt
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from apps.users.blacklist import blacklist_filter
+from apps.users.signing import JWTKeyRing, get_token_backend
+from tests.constants import UserTestData
+
+
+@pytest.fixture
+def key_dir(tmp_path):
+    """An empty directory holding the JWT signing keys of a test."""
+    with override_settings(JWT_KEYS_DIR=str(tmp_path)):
+        yield tmp_path
+
+
+@pytest.fixture(autouse=True)
+def reset_blacklist_filter():
+    blacklist_filter.reset()
+    yield
+    blacklist_filter.reset()
+
+
+def login(client):
+    response = client.post(
+        reverse("login"),
+        {
+            "email": UserTestData.DEFAULT_EMAIL.value,
+            "password": UserTestData.DEFAULT_PASSWORD.value,
+        },
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+def verify_locally(client, token):
+    """Verify a token with nothing but the published JWKS, like a sibling service."""
+    jwks = client.get(reverse("jwks")).json()
+    kid = jwt.get_unverified_header(token)["kid"]
+    jwk = next(key for key in jwks["keys"] if key["kid"] == kid)
+    return jwt.decode(token, jwt.PyJWK(jwk).key, algorithms=[jwk["alg"]])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_tokens_verify_with_published_keys(
+    api_client, default_user, key_dir, algorithm
+):
+    """Test tokens signed with an asymmetric key verify against the JWKS."""
+    call_command("generate_jwt_key", algorithm=algorithm, kid="k1", stdout=StringIO())
+
+    with override_settings(JWT_ALGORITHM=algorithm):
+        tokens = login(api_client)
+        claims = verify_locally(api_client, tokens["access"])
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        profile = api_client.get(reverse("users:user-list"))
+
+    assert jwt.get_unverified_header(tokens["access"])["alg"] == algorithm
+    assert claims["email"] == default_user.email
+    assert profile.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_rotation_keeps_old_tokens_valid(api_client, default_user, key_dir):
+    """Test tokens signed before a rotation stay valid until the key is dropped."""
+    call_command(
+        "generate_jwt_key", algorithm="RS256", kid="2026-01", stdout=StringIO()
+    )
+
+    with override_settings(JWT_ALGORITHM="RS256"):
+        old_tokens = login(api_client)
+        call_command(
+            "generate_jwt_key", algorithm="RS256", kid="2026-02", stdout=StringIO()
+        )
+        call_command("generate_jwt_key", retire="2026-01", stdout=StringIO())
+
+    with override_settings(JWT_ALGORITHM="RS256"):
+        new_tokens = login(api_client)
+        kids = [key["kid"] for key in api_client.get(reverse("jwks")).json()["keys"]]
+        verify = api_client.post(
+            reverse("token_verify"), {"token": old_tokens["access"]}, format="json"
+        )
+
+    assert jwt.get_unverified_header(new_tokens["access"])["kid"] == "2026-02"
+    assert sorted(kids) == ["2026-01", "2026-02"]
+    assert verify.status_code == status.HTTP_200_OK
+
+    (key_dir / "2026-01.pub.pem").unlink()
+    with override_settings(JWT_ALGORITHM="RS256"):
+        verify = api_client.post(
+            reverse("token_verify"), {"token": old_tokens["access"]}, format="json"
+        )
+    assert verify.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_new_key_signs_only_once_published(api_client, default_user, key_dir):
+    """Test a new key is published first and signs after the activation delay."""
+    for kid in ("2026-01", "2026-02"):
+        call_command("generate_jwt_key", algorithm="EdDSA", kid=kid, stdout=StringIO())
+    hour_ago = time.time() - 3600
+    os.utime(key_dir / "2026-01.pem", (hour_ago, hour_ago))
+
+    with override_settings(JWT_ALGORITHM="EdDSA"):
+        before = login(api_client)
+        kids = [key["kid"] for key in api_client.get(reverse("jwks")).json()["keys"]]
+        with mock.patch(
+            "apps.users.signing.time.time", return_value=time.time() + 3600
+        ):
+            after = login(api_client)
+        with override_settings(JWT_ACTIVE_KEY_ID="2026-01"):
+            pinned = login(api_client)
+
+    assert sorted(kids) == ["2026-01", "2026-02"]
+    assert jwt.get_unverified_header(before["access"])["kid"] == "2026-01"
+    assert jwt.get_unverified_header(after["access"])["kid"] == "2026-02"
+    assert jwt.get_unverified_header(pinned["access"])["kid"] == "2026-01"
+
+
+def test_token_is_signed_by_the_key_it_names(key_dir):
+    """Test a token issued as the signing key changes verifies with its kid."""
+    for kid in ("2026-01", "2026-02"):
+        call_command("generate_jwt_key", algorithm="EdDSA", kid=kid, stdout=StringIO())
+    # The activation delay ends between the first and any later read
+    signing_kid = mock.PropertyMock(
+        side_effect=itertools.chain(["2026-01"], itertools.repeat("2026-02"))
+    )
+
+    with override_settings(JWT_ALGORITHM="EdDSA"):
+        backend = get_token_backend()
+        with mock.patch.object(JWTKeyRing, "signing_kid", signing_kid):
+            token = backend.encode({"user_id": "1"})
+
+    assert jwt.get_unverified_header(token)["kid"] == "2026-01"
+    assert backend.decode(token)["user_id"] == "1"
+
+
+@pytest.mark.django_db
+def test_jwks_is_cacheable(api_client, key_dir):
+    """Test the JWKS response carries cache headers and honours If-None-Match."""
+    call_command("generate_jwt_key", algorithm="EdDSA", kid="k1", stdout=StringIO())
+
+    with override_settings(JWT_ALGORITHM="EdDSA"):
+        response = api_client.get(reverse("jwks"))
+        cached = api_client.get(reverse("jwks"), HTTP_IF_NONE_MATCH=response["ETag"])
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "public" in response["Cache-Control"]
+    assert "max-age=300" in response["Cache-Control"]
+    assert "d" not in response.json()["keys"][0]
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_hmac_keys_are_never_published(api_client):
+    """Test the shared HS256 secret is not exposed through the JWKS."""
+    response = api_client.get(reverse("jwks"))
+
+    assert response.json() == {"keys": []}
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import IntegrityError, transaction
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from apps.users.models import User
+from apps.users.views import AsyncLoginView
+from tests.constants import UserTestData
+
+ARGON2_FIRST = [
+    "apps.users.hashers.TunedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+]
+
+
+@pytest.fixture
+def async_login():
+    """Returns a function posting a JSON payload to the async login view."""
+
+    def post(payload):
+        request = RequestFactory().post(
+            reverse("login"), data=json.dumps(payload), content_type="application/json"
+        )
+        response = async_to_sync(AsyncLoginView.as_view())(request)
+        return response, json.loads(response.content)
+
+    return post
+
+
+@pytest.mark.django_db
+def test_login_email_is_case_insensitive(api_client, default_user):
+    """Test logging in with a differently cased email succeeds."""
+    payload = {
+        "email": default_user.email.upper(),
+        "password": UserTestData.DEFAULT_PASSWORD.value,
+    }
+
+    response = api_client.post(reverse("login"), payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_login_rehashes_outdated_password(api_client, default_user):
+    """Test a PBKDF2 hash is upgraded to the preferred hasher on login."""
+    assert default_user.password.startswith("pbkdf2_sha256$")
+    payload = {
+        "email": default_user.email,
+        "password": UserTestData.DEFAULT_PASSWORD.value,
+    }
+
+    with override_settings(PASSWORD_HASHERS=ARGON2_FIRST):
+        response = api_client.post(reverse("login"), payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    default_user.refresh_from_db()
+    assert default_user.password.startswith("argon2$")
+
+
+@pytest.mark.django_db
+def test_async_login_success(async_login, default_user):
+    """Test the async login view issues a token pair."""
+    response, data = async_login(
+        {
+            "email": default_user.email.upper(),
+            "password": UserTestData.DEFAULT_PASSWORD.value,
+        }
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "access" in data
+    assert "refresh" in data
+
+
+@pytest.mark.django_db
+def test_async_login_invalid_credentials(async_login, default_user):
+    """Test the async login view rejects a wrong password."""
+    response, data = async_login(
+        {"email": default_user.email, "password": UserTestData.WRONG_PASSWORD.value}
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert data["detail"] == "No active account found with the given credentials"
+
+
+@pytest.mark.django_db
+def test_async_login_missing_fields(async_login):
+    """Test the async login view validates fields like the sync view."""
+    response, data = async_login({"email": "", "password": ""})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert data["email"] == ["This field may not be blank."]
+    assert data["password"] == ["This field may not be blank."]
+
+
+@pytest.mark.django_db
+def test_async_login_rehashes_outdated_password(async_login, default_user):
+    """Test the async login view upgrades outdated hashes as well."""
+    with override_settings(PASSWORD_HASHERS=ARGON2_FIRST):
+        response, _ = async_login(
+            {
+                "email": default_user.email,
+                "password": UserTestData.DEFAULT_PASSWORD.value,
+            }
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    default_user.refresh_from_db()
+    assert default_user.password.startswith("argon2$")
+
+
+@pytest.mark.django_db
+def test_emails_unique_regardless_of_case():
+    """Test the database rejects an email differing only in case."""
+    user = User.objects.create_user(
+        username="mixed", email="Mixed.Case@Example.com", password="pass"
+    )
+    assert user.email == "mixed.case@example.com"
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        User.objects.bulk_create(
+            [User(username="other", email="MIXED.case@example.com")]
+        )
@@ -0,0 +1,148 @@
+from unittest import mock
+
+import pytest
+from django.db import DatabaseError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from apps.users import write_buffer
+from apps.users.blacklist import blacklist_filter
+from apps.users.models import User
+from apps.users.write_buffer import login_write_buffer
+from tests.constants import UserTestData
+
+buffered = override_settings(
+    TOKEN_WRITE_BUFFER_ENABLED=True,
+    TOKEN_WRITE_BUFFER_SIZE=100,
+    # No background thread, tests flush explicitly
+    TOKEN_WRITE_BUFFER_INTERVAL=0,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer(monkeypatch):
+    """Start and end every test with nothing pending and last_login updates on."""
+    # simplejwt rebinds api_settings on override_settings, so patch the instance
+    monkeypatch.setattr(write_buffer.api_settings, "UPDATE_LAST_LOGIN", True)
+    login_write_buffer.discard()
+    blacklist_filter.reset()
+    yield
+    login_write_buffer.discard()
+    blacklist_filter.reset()
+
+
+def login(client):
+    response = client.post(
+        reverse("login"),
+        {
+            "email": UserTestData.DEFAULT_EMAIL.value,
+            "password": UserTestData.DEFAULT_PASSWORD.value,
+        },
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+@pytest.mark.django_db
+@buffered
+def test_login_writes_are_deferred_until_flush(api_client, default_user):
+    """Test logins queue their rows and a flush writes them together."""
+    for _ in range(3):
+        login(api_client)
+
+    assert not OutstandingToken.objects.exists()
+    assert User.objects.get(pk=default_user.pk).last_login is None
+    # Three tokens, but a single coalesced last_login update
+    assert len(login_write_buffer) == 4
+
+    assert login_write_buffer.flush() == 4
+    assert OutstandingToken.objects.filter(user=default_user).count() == 3
+    assert User.objects.get(pk=default_user.pk).last_login is not None
+
+
+@pytest.mark.django_db
+@buffered
+def test_logout_revokes_unflushed_token(api_client, default_user):
+    """Test a token can be revoked at once even before its row is flushed."""
+    tokens = login(api_client)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    response = api_client.post(
+        reverse("logout"), {"refresh": tokens["refresh"]}, format="json"
+    )
+    assert response.status_code == status.HTTP_205_RESET_CONTENT
+    assert BlacklistedToken.objects.count() == 1
+
+    refresh = api_client.post(
+        reverse("token_refresh"), {"refresh": tokens["refresh"]}, format="json"
+    )
+    assert refresh.status_code == status.HTTP_401_UNAUTHORIZED
+
+    # The pending row conflicts with the one logout created and is skipped
+    login_write_buffer.flush()
+    assert OutstandingToken.objects.count() == 1
+    assert BlacklistedToken.objects.count() == 1
+
+
+@pytest.mark.django_db
+@buffered
+@override_settings(TOKEN_WRITE_BUFFER_SIZE=2)
+def test_buffer_flushes_when_full(api_client, default_user):
+    """Test reaching the size threshold writes the pending rows."""
+    login(api_client)
+
+    assert OutstandingToken.objects.count() == 1
+    assert len(login_write_buffer) == 0
+
+
+@pytest.mark.django_db
+@buffered
+def test_flush_tolerates_deleted_users(api_client, default_user):
+    """Test tokens of users deleted before the flush keep no user."""
+    login(api_client)
+    User.objects.filter(pk=default_user.pk).delete()
+
+    login_write_buffer.flush()
+
+    assert OutstandingToken.objects.get().user is None
+
+
+@pytest.mark.django_db
+@buffered
+def test_failed_flush_keeps_rows_for_retry(api_client, default_user):
+    """Test rows of a flush that failed are written by the next one."""
+    login(api_client)
+    login(api_client)
+
+    with mock.patch.object(
+        OutstandingToken.objects, "bulk_create", side_effect=DatabaseError("down")
+    ):
+        assert login_write_buffer.flush() == 0
+    assert len(login_write_buffer) == 3
+
+    assert login_write_buffer.flush() == 3
+    assert OutstandingToken.objects.count() == 2
+    assert User.objects.get(pk=default_user.pk).last_login is not None
+
+
+@pytest.mark.django_db
+@buffered
+@override_settings(TOKEN_WRITE_BUFFER_MAX_PENDING=3)
+def test_failed_flushes_keep_at_most_max_pending_rows(api_client, default_user):
+    """Test the oldest tokens are dropped once retries would exceed the cap."""
+    tokens = [login(api_client)["refresh"] for _ in range(4)]
+
+    with mock.patch.object(
+        OutstandingToken.objects, "bulk_create", side_effect=DatabaseError("down")
+    ):
+        login_write_buffer.flush()
+    login_write_buffer.flush()
+
+    kept = set(OutstandingToken.objects.values_list("token", flat=True))
+    assert kept == set(tokens[2:])
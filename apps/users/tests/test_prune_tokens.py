@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from apps.users.services import prune_expired_tokens
+from apps.users.tokens import UserRefreshToken
+
+
+@pytest.fixture
+def expired_tokens(default_user):
+    """Returns a function creating outstanding tokens that have expired."""
+
+    def create(count, blacklisted=False):
+        tokens = []
+        for _ in range(count):
+            refresh = UserRefreshToken.for_user(default_user)
+            if blacklisted:
+                refresh.blacklist()
+            tokens.append(refresh)
+        OutstandingToken.objects.filter(
+            jti__in=[token["jti"] for token in tokens]
+        ).update(expires_at=timezone.now() - timedelta(minutes=1))
+        return tokens
+
+    return create
+
+
+@pytest.mark.django_db
+def test_prune_tokens_deletes_only_expired_rows(default_user, expired_tokens):
+    """Test expired tokens and their blacklist rows are removed, live ones kept."""
+    expired_tokens(3)
+    expired_tokens(2, blacklisted=True)
+    live = UserRefreshToken.for_user(default_user)
+    live.blacklist()
+    out = StringIO()
+
+    call_command("prune_tokens", stdout=out)
+
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == [live["jti"]]
+    assert BlacklistedToken.objects.count() == 1
+    assert "Reclaimed 5 outstanding and 2 blacklisted tokens" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_prune_tokens_works_in_batches(expired_tokens):
+    """Test the command deletes in batches of the requested size."""
+    expired_tokens(5)
+    out = StringIO()
+
+    call_command("prune_tokens", "--batch-size", "2", stdout=out)
+
+    assert OutstandingToken.objects.count() == 0
+    assert "in 3 batches" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_prune_tokens_with_nothing_to_delete():
+    """Test the command reports zero rows when nothing has expired."""
+    out = StringIO()
+
+    call_command("prune_tokens", stdout=out)
+
+    assert "Reclaimed 0 outstanding and 0 blacklisted tokens in 0 batches" in (
+        out.getvalue()
+    )
+
+
+@pytest.mark.django_db
+def test_prune_tokens_retries_batch_after_lock_timeout(expired_tokens):
+    """Test a batch that gave up on a lock is retried rather than aborting."""
+    expired_tokens(3)
+    delete = QuerySet.delete
+    calls = []
+
+    def flaky_delete(queryset):
+        calls.append(queryset.model)
+        if len(calls) == 1:
+            raise OperationalError("canceling statement due to lock timeout")
+        return delete(queryset)
+
+    with (
+        mock.patch.object(QuerySet, "delete", flaky_delete),
+        mock.patch("apps.users.services.time.sleep"),
+    ):
+        result = prune_expired_tokens(batch_size=2)
+
+    assert OutstandingToken.objects.count() == 0
+    assert (result["batches"], result["retries"]) == (2, 1)
+
+
+@pytest.mark.django_db
+def test_prune_tokens_gives_up_after_retries(expired_tokens):
+    """Test a batch failing on every attempt raises once retries run out."""
+    expired_tokens(1)
+    error = OperationalError("canceling statement due to lock timeout")
+
+    with (
+        mock.patch.object(QuerySet, "delete", side_effect=error),
+        mock.patch("apps.users.services.time.sleep") as sleep,
+        pytest.raises(OperationalError),
+    ):
+        prune_expired_tokens(retries=2)
+
+    assert sleep.call_count == 2
@@ -0,0 +1,142 @@
+import uuid
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.users.blacklist import BloomFilter, blacklist_filter
+from apps.users.tokens import UserRefreshToken
+
+
+@pytest.fixture(autouse=True)
+def reset_blacklist_filter():
+    """Start every test with an empty per-worker filter."""
+    blacklist_filter.reset()
+    yield
+    blacklist_filter.reset()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test every added item is reported as possibly present."""
+    bloom = BloomFilter(capacity=1000)
+    items = [uuid.uuid4().hex for _ in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert not bloom.is_full
+
+
+def test_bloom_filter_false_positive_rate():
+    """Test the false positive rate stays close to the configured error rate."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for _ in range(1000):
+        bloom.add(uuid.uuid4().hex)
+
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+@pytest.mark.django_db
+def test_check_blacklist_skips_database_for_clean_tokens(
+    default_user, django_assert_num_queries
+):
+    """Test a token that is not blacklisted is accepted without a query."""
+    blacklist_filter.load()
+    refresh = UserRefreshToken.for_user(default_user)
+
+    with django_assert_num_queries(0):
+        UserRefreshToken(str(refresh))
+
+
+@pytest.mark.django_db
+def test_refresh_rejected_after_logout(api_client, default_user):
+    """Test a refresh token blacklisted on logout can no longer be used."""
+    blacklist_filter.load()
+    refresh = UserRefreshToken.for_user(default_user)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    logout_response = api_client.post(
+        reverse("logout"), {"refresh": str(refresh)}, format="json"
+    )
+    refresh_response = api_client.post(
+        reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+    )
+
+    assert logout_response.status_code == status.HTTP_205_RESET_CONTENT
+    assert refresh_response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert "blacklisted" in str(refresh_response.data["detail"])
+
+
+@pytest.mark.django_db
+@override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=0)
+def test_filter_picks_up_tokens_blacklisted_by_other_workers(api_client, default_user):
+    """Test rows written without this process's signal are found on sync."""
+    blacklist_filter.load()
+    refresh = UserRefreshToken.for_user(default_user)
+    # bulk_create sends no signals, like a blacklist written by another worker
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token=OutstandingToken.objects.get(jti=refresh["jti"]))]
+    )
+
+    response = api_client.post(
+        reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+@override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=60)
+def test_other_workers_blacklist_applies_within_sync_interval(default_user):
+    """Test a stale filter misses another worker's row until the next sync."""
+    with mock.patch("apps.users.blacklist.time.monotonic", return_value=1000.0):
+        blacklist_filter.load()
+    refresh = UserRefreshToken.for_user(default_user)
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token=OutstandingToken.objects.get(jti=refresh["jti"]))]
+    )
+
+    with mock.patch("apps.users.blacklist.time.monotonic", return_value=1059.0):
+        assert not blacklist_filter.is_blacklisted(refresh["jti"])
+    with mock.patch("apps.users.blacklist.time.monotonic", return_value=1060.0):
+        assert blacklist_filter.is_blacklisted(refresh["jti"])
+
+
+@pytest.mark.django_db
+@override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=3600)
+def test_local_blacklist_syncs_the_filter(default_user):
+    """Test blacklisting a token also pulls rows other workers added."""
+    blacklist_filter.load()
+    elsewhere = UserRefreshToken.for_user(default_user)
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token=OutstandingToken.objects.get(jti=elsewhere["jti"]))]
+    )
+    here = UserRefreshToken.for_user(default_user)
+
+    here.blacklist()
+
+    assert blacklist_filter.is_blacklisted(here["jti"])
+    assert blacklist_filter.is_blacklisted(elsewhere["jti"])
+
+
+@pytest.mark.django_db
+def test_refreshed_access_token_has_current_claims(api_client, default_user):
+    """Test the access token issued on refresh reflects the current user row."""
+    refresh = UserRefreshToken.for_user(default_user)
+    default_user.email = "changed@example.com"
+    default_user.save()
+
+    response = api_client.post(
+        reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert AccessToken(response.data["access"])["email"] == "changed@example.com"
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from apps.users.models import User
+from tests.constants import URLs
+
+
+@pytest.fixture
+def directory_users(user_factory):
+    """Creates five regular users who joined one day apart, oldest first."""
+    joined = timezone.now() - timedelta(days=10)
+    users = []
+    for i in range(5):
+        user = user_factory(
+            username=f"member{i}",
+            email=f"member{i}@example.com",
+            password="MemberPass123!",
+        )
+        User.objects.filter(pk=user.pk).update(date_joined=joined + timedelta(days=i))
+        users.append(user)
+    return users
+
+
+@pytest.mark.django_db
+class TestAdminUserDirectory:
+    """
+    Test suite for the admin user directory.
+    """
+
+    def test_regular_user_forbidden(self, authenticated_client_and_user):
+        """Ensure non-admin users cannot browse the directory."""
+        client, _ = authenticated_client_and_user
+
+        response = client.get(URLs.ADMIN_USER_LIST.value)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_cursor_pagination_walks_all_users(
+        self, admin_authenticated_client, directory_users
+    ):
+        """Ensure following the cursor returns every user once, newest first."""
+        usernames = []
+        url = f"{URLs.ADMIN_USER_LIST.value}?page_size=2"
+        while url:
+            response = admin_authenticated_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert "count" not in response.data
+            usernames.extend(user["username"] for user in response.data["results"])
+            url = response.data["next"]
+
+        expected = list(
+            User.objects.order_by("-date_joined", "-id").values_list(
+                "username", flat=True
+            )
+        )
+        assert usernames == expected
+        assert usernames[-5:] == [f"member{i}" for i in range(4, -1, -1)]
+
+    def test_prefix_search(self, admin_authenticated_client, directory_users):
+        """Ensure search matches the start of the email or username only."""
+        url = URLs.ADMIN_USER_LIST.value
+
+        by_email = admin_authenticated_client.get(url, {"search": "MEMBER3@"})
+        by_username = admin_authenticated_client.get(url, {"search": "member1"})
+        infix = admin_authenticated_client.get(url, {"search": "ember"})
+
+        assert [u["username"] for u in by_email.data["results"]] == ["member3"]
+        assert [u["username"] for u in by_username.data["results"]] == ["member1"]
+        assert infix.data["results"] == []
+
+    def test_filter_by_flags(self, admin_authenticated_client, directory_users):
+        """Ensure is_staff and is_active filters narrow the listing."""
+        User.objects.filter(username="member2").update(is_active=False)
+        url = URLs.ADMIN_USER_LIST.value
+
+        inactive = admin_authenticated_client.get(url, {"is_active": "false"})
+        staff = admin_authenticated_client.get(url, {"is_staff": "true"})
+
+        assert [u["username"] for u in inactive.data["results"]] == ["member2"]
+        assert all(u["is_staff"] for u in staff.data["results"])
+        assert "password" not in staff.data["results"][0]
@@ -46,3 +46,41 @@ def test_user_registration_duplicate_email(api_client, user_factory):
     assert "email" in response.data
     assert "user with this email already exists." in str(response.data["email"])
     assert get_user_model().objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_user_registration_email_differing_in_case(api_client, user_factory):
+    """
+    Test that an email differing from an existing one only in case is taken.
+    """
+    user_factory(username="existinguser", email="existing@example.com")
+
+    url = reverse("users:register")
+    payload = {
+        "username": "newuser",
+        "email": "Existing@Example.com",
+        "password": "testpassword",
+    }
+    response = api_client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "user with this email already exists." in str(response.data["email"])
+    assert get_user_model().objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_user_registration_lowercases_email(api_client):
+    """
+    Test that a registered email is stored lowercased.
+    """
+    url = reverse("users:register")
+    payload = {
+        "username": "newuser",
+        "email": "NewUser@Example.com",
+        "password": "strongpassword123",
+    }
+    response = api_client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["email"] == "newuser@example.com"
+    assert get_user_model().objects.get().email == "newuser@example.com"
@@ -0,0 +1,173 @@
+import json
+
+import pytest
+from django.contrib.auth.hashers import check_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework import status
+
+from apps.users.models import User
+from apps.users.services import hash_passwords, import_hasher_pool
+from tests.constants import URLs, UserTestData
+
+
+@pytest.mark.django_db
+class TestUserBulkImport:
+    """
+    Test suite for the bulk user import functionality.
+    """
+
+    @pytest.fixture
+    def bulk_import_url(self):
+        """Fixture for the bulk import URL."""
+        return URLs.USER_BULK_IMPORT.value
+
+    def create_csv_file(self, content):
+        """Helper to create an in-memory CSV file for uploading."""
+        return SimpleUploadedFile("users.csv", content.encode("utf-8"), "text/csv")
+
+    def create_json_file(self, rows):
+        """Helper to create an in-memory JSON file for uploading."""
+        return SimpleUploadedFile(
+            "users.json", json.dumps(rows).encode("utf-8"), "application/json"
+        )
+
+    def test_import_csv_as_admin_success(
+        self, admin_authenticated_client, bulk_import_url
+    ):
+        """
+        Ensure an admin can import users from a valid CSV with usable passwords.
+        """
+        csv_content = (
+            "email,username,password,first_name\n"
+            "ann@example.com,ann,AnnPass123!,Ann\n"
+            "bob@EXAMPLE.com,bob,BobPass123!,Bob"
+        )
+
+        response = admin_authenticated_client.post(
+            bulk_import_url,
+            {"file": self.create_csv_file(csv_content)},
+            format="multipart",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["status"] == "Import completed successfully."
+        assert response.data["success_count"] == 2
+        assert response.data["error_count"] == 0
+        ann = User.objects.get(username="ann")
+        assert ann.first_name == "Ann"
+        assert ann.is_active and not ann.is_staff
+        assert ann.check_password("AnnPass123!")
+        assert User.objects.filter(email="bob@example.com").exists()
+
+    def test_import_json_as_admin_success(
+        self, admin_authenticated_client, bulk_import_url
+    ):
+        """
+        Ensure a JSON list of users is accepted.
+        """
+        rows = [
+            {"email": "cat@example.com", "username": "cat", "password": "CatPass123!"}
+        ]
+
+        response = admin_authenticated_client.post(
+            bulk_import_url, {"file": self.create_json_file(rows)}, format="multipart"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert User.objects.filter(username="cat").exists()
+
+    def test_import_as_regular_user_forbidden(
+        self, authenticated_client_and_user, bulk_import_url
+    ):
+        """
+        Ensure a non-admin user receives a 403 Forbidden error.
+        """
+        client, _ = authenticated_client_and_user
+        csv_content = "email,username,password\nann@example.com,ann,AnnPass123!"
+
+        response = client.post(
+            bulk_import_url,
+            {"file": self.create_csv_file(csv_content)},
+            format="multipart",
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not User.objects.filter(username="ann").exists()
+
+    def test_import_partial_success(self, admin_authenticated_client, bulk_import_url):
+        """
+        Ensure invalid, existing and in-file duplicate rows are reported per row
+        with a 207 status, without echoing passwords back.
+        """
+        csv_content = (
+            "email,username,password\n"
+            "ann@example.com,ann,AnnPass123!\n"
+            "not-an-email,bad,BadPass123!\n"
+            f"{UserTestData.ADMIN_EMAIL.value.upper()},other,OtherPass123!\n"
+            "ANN@example.com,ann2,AnnPass123!\n"
+            "dan@example.com,ann,DanPass123!"
+        )
+
+        response = admin_authenticated_client.post(
+            bulk_import_url,
+            {"file": self.create_csv_file(csv_content)},
+            format="multipart",
+        )
+
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert response.data["success_count"] == 1
+        assert response.data["error_count"] == 4
+        errors = response.data["errors"]
+        assert [error["row_number"] for error in errors] == [3, 4, 5, 6]
+        assert "email" in errors[0]["errors"]
+        assert "email" in errors[1]["errors"]
+        assert "email" in errors[2]["errors"]
+        assert "username" in errors[3]["errors"]
+        assert all("password" not in error["data"] for error in errors)
+        assert list(User.objects.filter(email__iexact="ann@example.com")) == [
+            User.objects.get(username="ann")
+        ]
+
+    def test_import_missing_columns(self, admin_authenticated_client, bulk_import_url):
+        """
+        Ensure a file without the required columns is rejected.
+        """
+        csv_content = "email,username\nann@example.com,ann"
+
+        response = admin_authenticated_client.post(
+            bulk_import_url,
+            {"file": self.create_csv_file(csv_content)},
+            format="multipart",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "password" in response.data["errors"][0]["errors"]["headers"]
+
+    def test_import_no_file(self, admin_authenticated_client, bulk_import_url):
+        """
+        Ensure a request without a file is rejected.
+        """
+        response = admin_authenticated_client.post(
+            bulk_import_url, {}, format="multipart"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["error"] == "No file uploaded."
+
+
+@override_settings(USER_IMPORT_HASH_WORKERS=2)
+def test_hash_passwords_in_process_pool():
+    """
+    Ensure passwords hashed by the worker processes verify in this process.
+    """
+    hashed = hash_passwords(["first-pass", "second-pass", "third-pass"])
+
+    assert len(hashed) == 3
+    assert check_password("second-pass", hashed[1])
+    # One pool per worker, whose processes are not forks of the web worker
+    pool = import_hasher_pool()
+    assert (
+        hash_passwords(["fourth-pass", "fifth-pass"]) and import_hasher_pool() is pool
+    )
+    assert pool._mp_context.get_start_method() != "fork"
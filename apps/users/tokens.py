@@ -0,0 +1,93 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import (
+    AccessToken,
+    BlacklistMixin,
+    RefreshToken,
+    Token,
+    UntypedToken,
+)
+
+from .blacklist import blacklist_filter
+from .signing import get_token_backend
+from .write_buffer import login_write_buffer
+
+# User attributes embedded in every token so that authentication can trust
+# the signed claims instead of loading the user row on each request.
+USER_CLAIMS = ("email", "username", "is_staff", "is_active")
+
+
+class SigningKeyMixin(Token):
+    """Signs and verifies through the backend configured by ``JWT_ALGORITHM``."""
+
+    def get_token_backend(self):
+        return get_token_backend()
+
+
+class UserAccessToken(SigningKeyMixin, AccessToken):
+    pass
+
+
+class UserUntypedToken(SigningKeyMixin, UntypedToken):
+    pass
+
+
+class UserClaimsMixin(Token):
+    """Adds the ``USER_CLAIMS`` of the user to newly issued tokens."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class UserRefreshToken(SigningKeyMixin, RefreshToken, UserClaimsMixin):
+    """
+    Refresh token carrying the user claims. Access tokens created from it
+    copy the claims as well.
+
+    ``UserClaimsMixin`` sits after ``BlacklistMixin`` in the MRO, so the
+    claims are already present when the outstanding token row is written.
+    With ``TOKEN_WRITE_BUFFER_ENABLED`` that row goes through the login
+    write buffer instead.
+    """
+
+    access_token_class = UserAccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        if not login_write_buffer.enabled:
+            return super().for_user(user)
+        # Skip BlacklistMixin.for_user, which inserts the row immediately
+        token = super(BlacklistMixin, cls).for_user(user)
+        login_write_buffer.add_token(user, token)
+        return token
+
+    def blacklist(self):
+        """
+        Blacklist the token, then sync this worker's filter so that it also
+        holds what other workers blacklisted since its last sync.
+        """
+        token = OutstandingToken.objects.filter(
+            jti=self.payload[api_settings.JTI_CLAIM]
+        ).first()
+        if token is None:
+            # Still in the login write buffer; the parent writes the row
+            result = super().blacklist()
+        else:
+            # The parent also loads the user, which only a new row needs
+            result = BlacklistedToken.objects.get_or_create(token=token)
+        blacklist_filter.sync(force=True)
+        return result
+
+    def check_blacklist(self):
+        """Check the blacklist through the per-worker Bloom filter."""
+        if blacklist_filter.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
@@ -1,9 +1,11 @@
 from django.urls import path
 from rest_framework_nested import routers
 
-from .views import RegisterUserView, UserViewSet
+from .views import AdminUserViewSet, RegisterUserView, UserViewSet
 
 router = routers.DefaultRouter()
+# Registered before the empty prefix so "admin/" is not read as a user id
+router.register(prefix="admin", viewset=AdminUserViewSet, basename="admin-user")
 router.register(prefix="", viewset=UserViewSet, basename="user")
 
 app_name = "users"
@@ -1,13 +1,36 @@
+import json
 import logging
+import time
 
-from rest_framework import mixins, permissions, status, viewsets
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_GET
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, mixins, permissions, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import CreateAPIView
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.metrics import observe_bulk_upload
+from core.openapi import swagger_schema
 
 from .models import User
-from .serializers import UserSerializer
+from .paginations import UserDirectoryPagination
+from .serializers import (
+    AdminUserSerializer,
+    UserSerializer,
+    UserTokenObtainPairSerializer,
+)
+from .services import aauthenticate, issue_token_pair, process_user_import
+from .signing import get_jwks
+from .tokens import UserRefreshToken
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +40,7 @@ class RegisterUserView(CreateAPIView):
 
     def perform_create(self, serializer):
         user = serializer.save()
-        logger.info(f"New user registered: {user.email}")
+        logger.info("New user registered: %s", user.email)
 
 
 class UserViewSet(
@@ -32,9 +55,105 @@ class UserViewSet(
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        logger.info(f"User {self.request.user.email} fetching their profile.")
+        # drf_yasg introspects the view without a user while building the schema
+        if getattr(self, "swagger_fake_view", False):
+            return User.objects.none()
+        logger.info("User %s fetching their profile.", self.request.user.email)
         return self.queryset.filter(id=self.request.user.id)
 
+    def get_serializer_class(self):
+        """
+        Return an empty serializer for the 'bulk_import' action
+        to prevent drf-yasg from generating incorrect form fields.
+        """
+        if self.action == "bulk_import":
+            return serializers.Serializer
+        return super().get_serializer_class()
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-import",
+        parser_classes=[MultiPartParser],
+        permission_classes=[permissions.IsAdminUser],
+    )
+    @swagger_schema(
+        lambda openapi: {
+            "manual_parameters": [
+                openapi.Parameter(
+                    name="file",
+                    in_=openapi.IN_FORM,
+                    type=openapi.TYPE_FILE,
+                    required=True,
+                    description=(
+                        "CSV or JSON file with 'email', 'username' and 'password' "
+                        "columns, and optionally 'first_name' and 'last_name'."
+                    ),
+                )
+            ],
+            "responses": {
+                200: "All users created successfully.",
+                207: "Partial success: some users created, some failed.",
+                400: "Bad Request (e.g., no file uploaded or all rows failed).",
+            },
+        }
+    )
+    def bulk_import(self, request):
+        """
+        Bulk create users from a CSV or JSON file.
+        Results are reported per row, like the category bulk upload.
+        """
+        if "file" not in request.data:
+            return Response(
+                {"error": "No file uploaded."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_obj = request.data["file"]
+        logger.info(
+            "Starting bulk user import by user '%s' from file '%s'.",
+            request.user,
+            file_obj.name,
+        )
+
+        started = time.perf_counter()
+        result = process_user_import(file_obj)
+        observe_bulk_upload(
+            "users",
+            result["success_count"] + result["error_count"],
+            time.perf_counter() - started,
+        )
+
+        logger.info(
+            "Bulk user import finished. Success: %d, Errors: %d.",
+            result["success_count"],
+            result["error_count"],
+        )
+
+        if result["error_count"] > 0 and result["success_count"] == 0:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif result["error_count"] > 0 and result["success_count"] > 0:
+            response_status = status.HTTP_207_MULTI_STATUS  # Partial success
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(result, status=response_status)
+
+
+class AdminUserViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Admin-only directory of all accounts.
+    Supports prefix search on email and username, filtering by is_staff and
+    is_active, and cursor pagination ordered by join date.
+    """
+
+    queryset = User.objects.only(*AdminUserSerializer.Meta.fields)
+    serializer_class = AdminUserSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = UserDirectoryPagination
+    filterset_fields = ["is_staff", "is_active"]
+    # "^" makes these prefix matches, served by the UPPER(...) pattern indexes
+    search_fields = ["^email", "^username"]
+    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+
 
 class LogoutView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -49,9 +168,9 @@ class LogoutView(APIView):
             )
 
         try:
-            token = RefreshToken(refresh_token)
+            token = UserRefreshToken(refresh_token)
             token.blacklist()
-            logger.info(f"User {request.user.email} logged out successfully.")
+            logger.info("User %s logged out successfully.", request.user.email)
             return Response(
                 data={
                     "success": True,
@@ -61,7 +180,7 @@ class LogoutView(APIView):
                 status=status.HTTP_205_RESET_CONTENT,
             )
         except Exception as e:
-            logger.error(f"Error during logout for user {request.user.email}: {e}")
+            logger.error("Error during logout for user %s: %s", request.user.email, e)
             return Response(
                 data={
                     "success": False,
@@ -70,3 +189,58 @@ class LogoutView(APIView):
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+
+class AsyncLoginView(View):
+    """
+    Async counterpart of ``TokenObtainPairView`` served when ``ASYNC_LOGIN``
+    is enabled. Password verification runs in a bounded thread pool, so
+    under ASGI a login burst neither blocks the event loop nor queues behind
+    the single thread Django uses for sync code.
+    """
+
+    http_method_names = ["post"]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token endpoints authenticate with credentials, not cookies
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def post(self, request):
+        serializer = UserTokenObtainPairSerializer()
+        try:
+            if request.content_type == "application/json":
+                data = json.loads(request.body or b"{}")
+            else:
+                data = request.POST
+            attrs = serializer.to_internal_value(data)
+        except ValueError:
+            return JsonResponse(
+                {"detail": "JSON parse error."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        except ValidationError as e:
+            return JsonResponse(e.detail, status=status.HTTP_400_BAD_REQUEST)
+
+        user = await aauthenticate(attrs[serializer.username_field], attrs["password"])
+        if user is None:
+            return JsonResponse(
+                {
+                    "detail": str(serializer.error_messages["no_active_account"]),
+                    "code": "no_active_account",
+                },
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+        return JsonResponse(await sync_to_async(issue_token_pair)(user))
+
+
+@require_GET
+@condition(etag_func=lambda request: get_jwks()[1])
+def jwks(request):
+    """
+    Publish the public signing keys so other services can verify tokens
+    locally. The response is cacheable and revalidated with its ETag.
+    """
+    body, _ = get_jwks()
+    response = HttpResponse(body, content_type="application/json")
+    patch_cache_control(response, public=True, max_age=settings.JWKS_CACHE_SECONDS)
+    return response
@@ -0,0 +1,204 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import update_last_login
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+class LoginWriteBuffer:
+    """
+    Write-behind buffer for the rows every login writes: the
+    ``OutstandingToken`` of the new refresh token and ``User.last_login``.
+
+    Pending rows are written together with one ``bulk_create`` and one
+    ``bulk_update`` once ``TOKEN_WRITE_BUFFER_SIZE`` logins are queued, or
+    by a background thread every ``TOKEN_WRITE_BUFFER_INTERVAL`` seconds.
+    Repeated logins of the same user collapse into one ``last_login`` write.
+
+    Revocation does not depend on the buffer: blacklisting a token creates
+    its outstanding row if it has not been flushed yet, and the later flush
+    skips it. A worker that dies unexpectedly loses at most one interval of
+    rows, which only affects the outstanding token list.
+
+    Rows of a failed flush are queued again and retried after an interval.
+    While the database stays unavailable, outstanding token rows beyond
+    ``TOKEN_WRITE_BUFFER_MAX_PENDING`` pending rows are dropped, oldest
+    first.
+    """
+
+    def __init__(self):
+        self._tokens = {}
+        self._last_logins = {}
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    @property
+    def enabled(self):
+        return getattr(settings, "TOKEN_WRITE_BUFFER_ENABLED", False)
+
+    @property
+    def max_size(self):
+        return getattr(settings, "TOKEN_WRITE_BUFFER_SIZE", 500)
+
+    @property
+    def interval(self):
+        return getattr(settings, "TOKEN_WRITE_BUFFER_INTERVAL", 1.0)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, "TOKEN_WRITE_BUFFER_MAX_PENDING", 10_000)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tokens) + len(self._last_logins)
+
+    def add_token(self, user, token):
+        """Queue the outstanding token row for a newly issued refresh token."""
+        jti = token[api_settings.JTI_CLAIM]
+        row = OutstandingToken(
+            user_id=user.pk,
+            jti=jti,
+            token=str(token),
+            created_at=token.current_time,
+            expires_at=datetime_from_epoch(token["exp"]),
+        )
+        with self._lock:
+            self._tokens[jti] = row
+        self._after_add()
+
+    def add_last_login(self, user, when):
+        """Queue a ``last_login`` update, keeping only the latest per user."""
+        with self._lock:
+            current = self._last_logins.get(user.pk)
+            if current is None or when > current:
+                self._last_logins[user.pk] = when
+        self._after_add()
+
+    def _after_add(self):
+        self._ensure_worker()
+        # After a failed flush, leave the retry to the interval rather than
+        # failing again on every login
+        if len(self) >= self.max_size and time.monotonic() >= self._retry_at:
+            self.flush()
+
+    def flush(self):
+        """Write every pending row now. Returns the number of rows written."""
+        with self._lock:
+            tokens, self._tokens = list(self._tokens.values()), {}
+            last_logins, self._last_logins = self._last_logins, {}
+        if not tokens and not last_logins:
+            return 0
+
+        try:
+            with transaction.atomic():
+                # Users deleted since login lose their tokens' user, as SET_NULL would
+                user_ids = {row.user_id for row in tokens} | set(last_logins)
+                existing = set(
+                    User.objects.filter(pk__in=user_ids).values_list("pk", flat=True)
+                )
+                for row in tokens:
+                    if row.user_id not in existing:
+                        row.user_id = None
+                # Tokens blacklisted before the flush already have their row
+                OutstandingToken.objects.bulk_create(tokens, ignore_conflicts=True)
+                User.objects.bulk_update(
+                    [
+                        User(pk=pk, last_login=when)
+                        for pk, when in last_logins.items()
+                        if pk in existing
+                    ],
+                    ["last_login"],
+                )
+        except Exception as e:
+            logger.error(
+                "Failed to flush %d tokens and %d last logins, will retry: %s",
+                len(tokens),
+                len(last_logins),
+                e,
+            )
+            self._requeue(tokens, last_logins)
+            return 0
+        return len(tokens) + len(last_logins)
+
+    def _requeue(self, tokens, last_logins):
+        with self._lock:
+            self._retry_at = time.monotonic() + max(self.interval, 1.0)
+            # The failed rows are older than anything queued since
+            pending = {row.jti: row for row in tokens}
+            pending.update(self._tokens)
+            self._tokens = pending
+            for pk, when in last_logins.items():
+                current = self._last_logins.get(pk)
+                if current is None or when > current:
+                    self._last_logins[pk] = when
+            dropped = 0
+            while (
+                self._tokens
+                and len(self._tokens) + len(self._last_logins) > self.max_pending
+            ):
+                del self._tokens[next(iter(self._tokens))]
+                dropped += 1
+        if dropped:
+            logger.error(
+                "Login write buffer is full, dropped %d outstanding tokens.", dropped
+            )
+
+    def discard(self):
+        """Drop every pending row without writing it."""
+        with self._lock:
+            self._tokens.clear()
+            self._last_logins.clear()
+            self._retry_at = 0.0
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so each worker process starts its own
+        pid = os.getpid()
+        if self.interval <= 0 or (self._worker is not None and self._worker_pid == pid):
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == pid:
+                return
+            self._worker = threading.Thread(
+                target=self._run, name="login-write-buffer", daemon=True
+            )
+            self._worker_pid = pid
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            close_old_connections()
+            self.flush()
+
+
+login_write_buffer = LoginWriteBuffer()
+# Write what is left when a worker shuts down cleanly
+atexit.register(login_write_buffer.flush)
+
+
+def record_login(user):
+    """
+    Update ``last_login`` for a token login when ``UPDATE_LAST_LOGIN`` is
+    set, through the write buffer when it is enabled.
+    """
+    if not api_settings.UPDATE_LAST_LOGIN:
+        return
+    if not login_write_buffer.enabled:
+        update_last_login(None, user)
+        return
+    user.last_login = timezone.now()
+    login_write_buffer.add_last_login(user, user.last_login)
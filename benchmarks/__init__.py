@@ -0,0 +1,7 @@
+"""
+In-process performance benchmarks.
+
+Each module is runnable with ``python -m benchmarks.<name>`` and prints its
+results as JSON. Benchmarks run against the testing settings and build a
+throwaway test database, so they never touch development data.
+"""
@@ -0,0 +1,28 @@
+import os
+from contextlib import contextmanager
+
+
+def setup():
+    """Configure Django with the testing settings."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    os.environ.setdefault("ENVIRONMENT", "testing")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Create a migrated throwaway test database and drop it afterwards."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
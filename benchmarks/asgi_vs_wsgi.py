@@ -0,0 +1,245 @@
+"""
+ASGI versus WSGI deployment benchmark.
+
+Serves the product list from gunicorn twice, once with the current sync
+workers on ``core.wsgi`` and once with uvicorn workers on ``core.asgi`` and
+the async catalog views, and holds ``--concurrency`` client connections
+open against each. Reports requests per second, latency and the resident
+memory of the server processes per concurrent connection.
+
+    python -m benchmarks.asgi_vs_wsgi --concurrency 200 --duration 10
+    python -m benchmarks.asgi_vs_wsgi --deployment asgi --workers 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import _django
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PATH = "/api/catalog/products/?page_size=20"
+
+DEPLOYMENTS = {
+    "wsgi": ["core.wsgi:application", "--worker-class", "sync"],
+    "asgi": ["core.asgi:application", "--worker-class", "uvicorn_worker.UvicornWorker"],
+}
+
+
+def seed(products):
+    """Create ``products`` products spread over ten categories."""
+    from apps.catalog.models import Category, Product
+
+    categories = Category.objects.bulk_create(
+        Category(name=f"Bench category {i}") for i in range(10)
+    )
+    Product.objects.bulk_create(
+        Product(
+            name=f"Bench product {i}",
+            description="Benchmark product",
+            price=10 + i % 90,
+            stock_quantity=i % 50,
+            category=categories[i % len(categories)],
+        )
+        for i in range(products)
+    )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_rss(pid):
+    """Return the resident memory in bytes of ``pid`` and its children."""
+    children = {}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+
+    rss, pending = 0, [pid]
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    while pending:
+        current = pending.pop()
+        try:
+            rss += int(Path(f"/proc/{current}/statm").read_text().split()[1])
+        except OSError:
+            continue
+        pending.extend(children.get(current, []))
+    return rss * page_size
+
+
+def start_server(deployment, port, workers, env):
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        *DEPLOYMENTS[deployment],
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--workers",
+        str(workers),
+        "--backlog",
+        "4096",
+        "--log-level",
+        "warning",
+    ]
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            # Let the remaining workers finish booting
+            time.sleep(1)
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError(f"{deployment} server exited during startup")
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"{deployment} server did not start within 30s")
+
+
+def stop_server(server):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+async def load(port, concurrency, duration, server_pid):
+    """
+    Keep ``concurrency`` clients issuing requests until ``duration`` has
+    passed, sampling the server memory meanwhile.
+    """
+    request = (
+        f"GET {PATH} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n"
+    ).encode()
+    latencies, errors = [], 0
+    peak_rss = 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(request)
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+            except OSError:
+                errors += 1
+                continue
+            if response.startswith(b"HTTP/1.1 200"):
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    async def sample_memory():
+        nonlocal peak_rss
+        while time.perf_counter() < deadline:
+            peak_rss = max(peak_rss, process_tree_rss(server_pid))
+            await asyncio.sleep(0.25)
+
+    started = time.perf_counter()
+    await asyncio.gather(sample_memory(), *(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started, peak_rss
+
+
+def run(deployment, args, env):
+    port = free_port()
+    # The WSGI side is the current deployment, with the DRF viewsets
+    env = {**env, "ASYNC_CATALOG": "true" if deployment == "asgi" else "false"}
+    server = start_server(deployment, port, args.workers, env)
+    try:
+        idle_rss = process_tree_rss(server.pid)
+        latencies, errors, elapsed, peak_rss = asyncio.run(
+            load(port, args.concurrency, args.duration, server.pid)
+        )
+    finally:
+        stop_server(server)
+
+    latencies.sort()
+    return {
+        "deployment": deployment,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+            "p99": (
+                round(latencies[int(len(latencies) * 0.99)] * 1000, 2)
+                if latencies
+                else None
+            ),
+        },
+        "idle_rss_mb": round(idle_rss / 2**20, 1),
+        "peak_rss_mb": round(peak_rss / 2**20, 1),
+        "kb_per_connection": round(peak_rss / args.concurrency / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--deployment", choices=["both", *DEPLOYMENTS], default="both")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--products", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The servers run in their own processes, so the throwaway database
+        # is a file they can open rather than the test runner's database.
+        db_name = os.path.join(tmp, "benchmark")
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "core.settings",
+            "ENVIRONMENT": "testing",
+            "TEST_DB_NAME": db_name,
+        }
+        os.environ.update(env)
+        _django.setup()
+        from django.core.management import call_command
+
+        call_command("migrate", verbosity=0)
+        seed(args.products)
+
+        deployments = DEPLOYMENTS if args.deployment == "both" else [args.deployment]
+        results = [run(deployment, args, env) for deployment in deployments]
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "asgi_vs_wsgi",
+                "path": PATH,
+                "workers": args.workers,
+                "concurrency": args.concurrency,
+                "products": args.products,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
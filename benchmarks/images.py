@@ -0,0 +1,285 @@
+"""
+Product image pipeline benchmark.
+
+Generates a deterministic corpus of JPEG, PNG, WEBP, RGBA PNG and palette
+PNG images from thumbnail size up to the largest that fits the 5MB upload
+limit, then runs each through the upload path: ``validate_image`` of the
+product serializer and ``compress_image`` with the product view's bounds.
+Reports the best of ``--repeat`` runs of each, split into decode, resize
+and encode, together with the peak memory of a compression and the bytes
+it produced.
+
+    python -m benchmarks.images
+    python -m benchmarks.images --formats jpeg,png --sizes thumbnail,limit
+
+Images are a gradient with seeded noise, which compresses like a photo
+rather than like a flat test card. The stage split repeats the steps of
+``compress_image``; ``compress_ms`` times the function itself.
+"""
+
+import argparse
+import ctypes
+import json
+import os
+import random
+import sys
+import time
+import traceback
+from io import BytesIO
+
+from benchmarks import _django
+
+FORMATS = {
+    # name: (Pillow format, mode, save options)
+    "jpeg": ("JPEG", "RGB", {"quality": 90}),
+    "png": ("PNG", "RGB", {}),
+    "webp": ("WEBP", "RGB", {"quality": 90}),
+    "rgba": ("PNG", "RGBA", {}),
+    "palette": ("PNG", "P", {}),
+}
+SIZES = {
+    "thumbnail": (150, 150),
+    "small": (640, 480),
+    "hd": (1920, 1080),
+    # Largest 4:3 image under the upload limit, up to 6000x4500
+    "limit": (6000, 4500),
+}
+NOISE = 0.2
+
+
+def generate(format_name, size, seed=0):
+    """Return the encoded bytes of a deterministic image."""
+    from PIL import Image
+
+    pillow_format, mode, options = FORMATS[format_name]
+    width, height = size
+    gradient = Image.linear_gradient("L")
+    across = gradient.rotate(90).resize(size)
+    down = gradient.resize(size)
+    base = Image.merge("RGB", (across, down, gradient.rotate(180).resize(size)))
+    rng = random.Random(f"{seed}-{format_name}-{width}x{height}")
+    noise = Image.frombytes("RGB", size, rng.randbytes(width * height * 3))
+    image = Image.blend(base, noise, NOISE)
+    if mode == "RGBA":
+        image.putalpha(down)
+    elif mode == "P":
+        image = image.convert("P", palette=Image.Palette.ADAPTIVE, colors=256)
+
+    with BytesIO() as output:
+        image.save(output, format=pillow_format, **options)
+        return output.getvalue()
+
+
+def largest_under(format_name, limit, seed=0):
+    """
+    Return the largest 4:3 image, up to ``SIZES["limit"]``, whose encoding
+    fits in ``limit`` bytes, with its size. The noise makes the bytes per
+    pixel nearly constant, so one sample encoding predicts the size.
+    """
+    width, height = SIZES["limit"]
+    sample = generate(format_name, (800, 600), seed)
+    scale = min((limit * 0.97 / len(sample) * 800 * 600 / (width * height)) ** 0.5, 1)
+    while True:
+        size = (int(width * scale) // 4 * 4, int(height * scale) // 4 * 4)
+        data = generate(format_name, size, seed)
+        if len(data) <= limit:
+            return data, size
+        scale *= 0.95
+
+
+def best_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return round(min(times) * 1000, 3)
+
+
+def status_kb(field):
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    raise LookupError(field)
+
+
+def memory_unmeasurable():
+    """Return why ``peak_memory_mb`` cannot run here, or None if it can."""
+    if not os.access("/proc/self/clear_refs", os.W_OK):
+        return "needs Linux's /proc/self/clear_refs"
+    if not hasattr(ctypes.CDLL(None), "malloc_trim"):
+        return "needs glibc's malloc_trim"
+    return None
+
+
+def peak_memory_mb(func):
+    """
+    Run ``func`` in a forked child and return how far its resident memory
+    peaked above what it started with, or None where that cannot be
+    measured. Pillow allocates outside the Python heap, so this is measured
+    rather than traced.
+    """
+    if memory_unmeasurable():
+        return None
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # The child must never return into the parent's code
+        status = 1
+        try:
+            os.close(read_end)
+            # Memory the parent freed would be reused without growing the
+            # resident set; hand it back, then start the high-water mark afresh
+            ctypes.CDLL(None).malloc_trim(0)
+            with open("/proc/self/clear_refs", "w") as clear_refs:
+                clear_refs.write("5")
+            start_kb = status_kb("VmRSS")
+            func()
+            os.write(write_end, str(status_kb("VmHWM") - start_kb).encode())
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(status)
+    os.close(write_end)
+    with os.fdopen(read_end) as pipe:
+        grown_kb = pipe.read()
+    _, status = os.waitpid(pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0 or not grown_kb:
+        raise RuntimeError("Measuring peak memory failed in the child process")
+    return round(int(grown_kb) / 1024, 1)
+
+
+def measure(format_name, size_name, data, size, args):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from PIL import Image
+
+    from apps.catalog.images import compress_image
+    from apps.catalog.serializers import ProductSerializer
+    from apps.catalog.views import ProductViewSet
+
+    bounds = (ProductViewSet.IMAGE_MAX_WIDTH, ProductViewSet.IMAGE_MAX_HEIGHT)
+    pillow_format = FORMATS[format_name][0]
+    serializer = ProductSerializer()
+
+    def validate():
+        upload = SimpleUploadedFile(f"image.{format_name}", data)
+        serializer.validate_image(upload)
+
+    def decode():
+        image = Image.open(BytesIO(data))
+        image.load()
+        return image
+
+    decoded = decode()
+
+    def resize():
+        image = decoded.convert("RGB") if decoded.mode in ("RGBA", "P") else decoded
+        if image.size[0] > bounds[0] or image.size[1] > bounds[1]:
+            image = image.copy()
+            image.thumbnail(bounds, Image.Resampling.LANCZOS)
+        return image
+
+    resized = resize()
+
+    def encode():
+        with BytesIO() as output:
+            resized.save(output, format="JPEG", quality=85, optimize=True)
+
+    def compress():
+        return compress_image(BytesIO(data), *bounds)
+
+    output = compress()
+    compress_ms = best_ms(compress, args.repeat)
+    return {
+        "format": format_name,
+        "pillow_format": pillow_format,
+        "mode": decoded.mode,
+        "size": size_name,
+        "width": size[0],
+        "height": size[1],
+        "input_bytes": len(data),
+        "validate_ms": best_ms(validate, args.repeat),
+        "decode_ms": best_ms(decode, args.repeat),
+        "resize_ms": best_ms(resize, args.repeat),
+        "encode_ms": best_ms(encode, args.repeat),
+        "compress_ms": compress_ms,
+        "megapixels_per_sec": round(size[0] * size[1] / 1e6 / (compress_ms / 1000), 1),
+        "peak_memory_mb": peak_memory_mb(compress),
+        "output_bytes": len(output),
+        "output_width": resized.size[0],
+        "output_height": resized.size[1],
+    }
+
+
+def names(value, choices):
+    selected = value.split(",")
+    unknown = set(selected) - set(choices)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--formats",
+        type=lambda value: names(value, FORMATS),
+        default=list(FORMATS),
+        help=f"comma-separated, from {', '.join(FORMATS)}",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: names(value, SIZES),
+        default=list(SIZES),
+        help=f"comma-separated, from {', '.join(SIZES)}",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    _django.setup()
+    from apps.catalog.serializers import ProductSerializer
+
+    limit = ProductSerializer.MAX_IMAGE_SIZE
+    unmeasurable = memory_unmeasurable()
+    if unmeasurable:
+        print(f"Skipping peak_memory_mb: measuring it {unmeasurable}.", file=sys.stderr)
+    results = []
+    for format_name in args.formats:
+        for size_name in args.sizes:
+            if size_name == "limit":
+                data, size = largest_under(format_name, limit, args.seed)
+            else:
+                size = SIZES[size_name]
+                data = generate(format_name, size, args.seed)
+            if len(data) > limit:
+                # Uploads this large are rejected before any processing
+                results.append(
+                    {
+                        "format": format_name,
+                        "size": size_name,
+                        "input_bytes": len(data),
+                        "skipped": "over the upload limit",
+                    }
+                )
+                continue
+            results.append(measure(format_name, size_name, data, size, args))
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "images",
+                "max_upload_bytes": limit,
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Worker startup import-time report.
+
+Starts a fresh interpreter under ``python -X importtime`` that loads the
+application the way a server worker does (the WSGI or ASGI handler and the
+URLconf), and reports the wall time, the slowest modules and packages, and
+whether the lazily loaded dependencies stayed unloaded.
+
+    python -m benchmarks.import_time --top 20
+    python -m benchmarks.import_time --target asgi --raw > importtime.txt
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Only needed for image uploads and the API documentation
+LAZY_MODULES = ("PIL", "drf_yasg")
+
+STARTUP_CODE = (
+    "import core.{target}\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def run_startup(target="wsgi"):
+    """
+    Load the application in a new interpreter and return the wall time in
+    seconds and the ``-X importtime`` output.
+    """
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "core.settings",
+        "ENVIRONMENT": os.getenv("ENVIRONMENT", "testing"),
+    }
+    started = time.perf_counter()
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            STARTUP_CODE.format(target=target),
+        ],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - started, result.stderr
+
+
+def parse_importtime(output):
+    """Return ``(module, self_us, cumulative_us)`` for each imported module."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def report(target="wsgi", top=15):
+    seconds, output = run_startup(target)
+    modules = parse_importtime(output)
+    packages = Counter()
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    imported = {name for name, _, _ in modules}
+    return {
+        "benchmark": "import_time",
+        "target": target,
+        "startup_seconds": round(seconds, 3),
+        "import_seconds": round(sum(self_us for _, self_us, _ in modules) / 1e6, 3),
+        "modules": len(modules),
+        "lazy_modules_loaded": [
+            name
+            for name in LAZY_MODULES
+            if any(m == name or m.startswith(f"{name}.") for m in imported)
+        ],
+        "slowest_packages_ms": {
+            name: round(us / 1000, 1) for name, us in packages.most_common(top)
+        },
+        "slowest_modules_ms": {
+            name: round(self_us / 1000, 1)
+            for name, self_us, _ in sorted(modules, key=lambda m: -m[1])[:top]
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", choices=["wsgi", "asgi"], default="wsgi")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--raw", action="store_true", help="Print the -X importtime output as is."
+    )
+    args = parser.parse_args()
+
+    if args.raw:
+        print(run_startup(args.target)[1], end="")
+        return
+    print(json.dumps(report(args.target, args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
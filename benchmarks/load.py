@@ -0,0 +1,397 @@
+"""
+Load test against a locally started server.
+
+Seeds a throwaway database with the seed commands, starts gunicorn from
+``gunicorn.conf.py`` and keeps ``--concurrency`` clients issuing requests
+drawn from a weighted traffic mix for ``--duration`` seconds, after ``--warmup`` seconds whose
+requests are not counted. Reports requests per second, error rate and
+p50/p95/p99 latency per scenario and overall, tagged with the commit it ran
+on; ``--compare`` adds the change in percent from an earlier report.
+
+    python -m benchmarks.load --mix read --workers 4 --concurrency 50
+    python -m benchmarks.load --mix browse=50,detail=40,admin_write=10
+    python -m benchmarks.load --output before.json
+    python -m benchmarks.load --compare before.json
+
+The database is SQLite, so write-heavy mixes at high concurrency measure
+its locking as much as the application.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks import _django
+from benchmarks.asgi_vs_wsgi import BASE_DIR, free_port, stop_server
+
+PRODUCTS = "/api/catalog/products/"
+LOGIN = "/api/auth/login/"
+PASSWORD = os.getenv("BENCHMARK_PASSWORD", "Bench-Load-Pass-1")
+ADMIN_EMAIL = "bench-admin@example.com"
+# Admin tokens are re-issued well within ACCESS_TOKEN_LIFETIME
+TOKEN_MAX_AGE = 60
+
+MIXES = {
+    "default": {
+        "browse": 35,
+        "search": 15,
+        "category": 15,
+        "deep_page": 5,
+        "detail": 25,
+        "login": 3,
+        "admin_write": 2,
+    },
+    "read": {"browse": 40, "search": 20, "category": 20, "deep_page": 5, "detail": 15},
+    "write": {"browse": 30, "detail": 30, "login": 20, "admin_write": 20},
+}
+
+
+class Dataset:
+    """What the seeded database holds, for the scenarios to pick from."""
+
+    def __init__(self):
+        from apps.catalog.management.commands.seed_category_product_db import (
+            ADJECTIVES,
+            DEPARTMENTS,
+        )
+        from apps.catalog.models import Category, Product
+        from apps.catalog.paginations import ProductPagination
+        from apps.users.models import User
+
+        self.product_ids = [
+            str(pk) for pk in Product.objects.values_list("id", flat=True)
+        ]
+        self.category_ids = [
+            str(pk) for pk in Category.objects.values_list("id", flat=True)
+        ]
+        pages = len(self.product_ids) / ProductPagination.page_size
+        self.pages = max(math.ceil(pages), 1)
+        self.user_emails = list(
+            User.objects.filter(is_staff=False).values_list("email", flat=True)
+        )
+        self.search_terms = [
+            *ADJECTIVES,
+            *(noun for nouns in DEPARTMENTS.values() for noun in nouns),
+        ]
+        self.admin = User.objects.get(email=ADMIN_EMAIL)
+        self.written = 0
+        self._token = None
+        self._token_issued = 0.0
+
+    def admin_token(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        if time.monotonic() - self._token_issued > TOKEN_MAX_AGE:
+            self._token = str(AccessToken.for_user(self.admin))
+            self._token_issued = time.monotonic()
+        return self._token
+
+
+# Each scenario returns (method, path, JSON body or None, extra headers)
+def browse(data, rng):
+    return "GET", f"{PRODUCTS}?page={rng.randint(1, min(5, data.pages))}", None, {}
+
+
+def search(data, rng):
+    term = rng.choice(data.search_terms)
+    return "GET", f"{PRODUCTS}?search={term.replace(' ', '+')}", None, {}
+
+
+def category(data, rng):
+    category_id = rng.choice(data.category_ids)
+    return "GET", f"{PRODUCTS}?category__id={category_id}", None, {}
+
+
+def deep_page(data, rng):
+    page = rng.randint(max(data.pages - 10, 1), data.pages)
+    return "GET", f"{PRODUCTS}?page={page}", None, {}
+
+
+def detail(data, rng):
+    return "GET", f"{PRODUCTS}{rng.choice(data.product_ids)}/", None, {}
+
+
+def login(data, rng):
+    body = {"email": rng.choice(data.user_emails), "password": PASSWORD}
+    return "POST", LOGIN, body, {}
+
+
+def admin_write(data, rng):
+    data.written += 1
+    body = {
+        "name": f"Load product {data.written}",
+        "description": "Created by the load benchmark",
+        "price": f"{rng.uniform(1, 500):.2f}",
+        "stock_quantity": rng.randint(0, 100),
+        "category_id": rng.choice(data.category_ids),
+    }
+    headers = {"Authorization": f"Bearer {data.admin_token()}"}
+    return "POST", PRODUCTS, body, headers
+
+
+SCENARIOS = {
+    scenario.__name__: scenario
+    for scenario in (browse, search, category, deep_page, detail, login, admin_write)
+}
+
+
+def parse_mix(value):
+    """Return the weights of a preset name or "scenario=weight,..." list."""
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def seed(args):
+    """Seed the catalog and users with the seed commands, and an admin."""
+    from django.core.management import call_command
+
+    from apps.users.models import User
+
+    call_command(
+        "seed_category_product_db",
+        categories=args.categories,
+        products=args.products,
+        seed=args.seed,
+        stdout=io.StringIO(),
+    )
+    call_command(
+        "seed_users_db",
+        users=args.users,
+        seed=args.seed,
+        password=PASSWORD,
+        stdout=io.StringIO(),
+    )
+    User.objects.create_superuser(
+        email=ADMIN_EMAIL, username="bench-admin", password=PASSWORD
+    )
+
+
+def encode(method, path, body, headers):
+    lines = [f"{method} {path} HTTP/1.1", "Host: 127.0.0.1", "Connection: close"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    payload = b""
+    if body is not None:
+        payload = json.dumps(body).encode()
+        lines += ["Content-Type: application/json", f"Content-Length: {len(payload)}"]
+    return "\r\n".join([*lines, "", ""]).encode() + payload
+
+
+async def load(port, mix, data, args):
+    """
+    Keep ``args.concurrency`` clients issuing requests from ``mix``; return
+    the latencies of successful responses and the error count per scenario.
+    """
+    names, weights = list(mix), list(mix.values())
+    latencies = {name: [] for name in names}
+    errors = dict.fromkeys(names, 0)
+    measure_from = time.perf_counter() + args.warmup
+    deadline = measure_from + args.duration
+
+    async def client(index):
+        rng = random.Random(args.seed + index)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            request = encode(*SCENARIOS[name](data, rng))
+            started = time.perf_counter()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(request)
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                ok = response[9:10] == b"2"
+            except OSError:
+                ok = False
+            if started < measure_from:
+                continue
+            if ok:
+                latencies[name].append(time.perf_counter() - started)
+            else:
+                errors[name] += 1
+
+    await asyncio.gather(*(client(i) for i in range(args.concurrency)))
+    return latencies, errors
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list, in milliseconds."""
+    if not ordered:
+        return None
+    return round(ordered[max(math.ceil(len(ordered) * p / 100) - 1, 0)] * 1000, 2)
+
+
+def summarize(latencies, errors, seconds):
+    ordered = sorted(latencies)
+    total = len(ordered) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "requests_per_sec": round(total / seconds, 2),
+        "latency_ms": {f"p{p}": percentile(ordered, p) for p in (50, 95, 99)},
+    }
+
+
+def change(before, after):
+    if not before or after is None:
+        return None
+    return round((after - before) / before * 100, 1)
+
+
+def compare(report, baseline):
+    """Return the change in percent of each rate and latency since ``baseline``."""
+    comparison = {"baseline_commit": baseline.get("commit")}
+    pairs = {"total": (baseline["total"], report["total"])}
+    for name, stats in report["scenarios"].items():
+        if name in baseline["scenarios"]:
+            pairs[name] = (baseline["scenarios"][name], stats)
+    for name, (before, after) in pairs.items():
+        comparison[name] = {
+            "requests_per_sec_pct": change(
+                before["requests_per_sec"], after["requests_per_sec"]
+            ),
+            "error_rate_delta": round(after["error_rate"] - before["error_rate"], 4),
+            **{
+                f"{p}_pct": change(before["latency_ms"][p], after["latency_ms"][p])
+                for p in after["latency_ms"]
+            },
+        }
+    return comparison
+
+
+def start_server(port, args, env):
+    env = {
+        **env,
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": str(args.workers),
+        "GUNICORN_LOG_LEVEL": "warning",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=BASE_DIR,
+        env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}{PRODUCTS}").read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    stop_server(server)
+    raise RuntimeError("server did not start within 60s")
+
+
+def commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default="default",
+        help=f"preset ({', '.join(MIXES)}) or scenario=weight,... "
+        f"from {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "core.settings",
+            "ENVIRONMENT": "testing",
+            "TEST_DB_NAME": os.path.join(tmp, "benchmark"),
+            # Admin tokens are issued here and verified by the server
+            "SECRET_KEY": os.getenv("SECRET_KEY") or secrets.token_hex(32),
+            "QUERY_INSPECTION": "false",
+            "METRICS_DIR": os.path.join(tmp, "metrics"),
+        }
+        os.environ.update(env)
+        _django.setup()
+        from django.core.management import call_command
+
+        call_command("migrate", verbosity=0)
+        seed(args)
+        data = Dataset()
+
+        port = free_port()
+        server = start_server(port, args, env)
+        try:
+            latencies, errors = asyncio.run(load(port, args.mix, data, args))
+        finally:
+            stop_server(server)
+
+    report = {
+        "benchmark": "load",
+        "commit": commit(),
+        "mix": args.mix,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "categories": args.categories,
+        "products": args.products,
+        "users": args.users,
+        "seed": args.seed,
+        "total": summarize(
+            [latency for values in latencies.values() for latency in values],
+            sum(errors.values()),
+            args.duration,
+        ),
+        "scenarios": {
+            name: summarize(latencies[name], errors[name], args.duration)
+            for name in args.mix
+        },
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
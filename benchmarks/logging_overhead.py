@@ -0,0 +1,125 @@
+"""
+Per-request logging overhead benchmark.
+
+Serves the product list, which logs one INFO record per request, with
+logging below INFO disabled, with the JSON console handler writing on the
+request thread, and with records queued for the listener thread. The
+console stream can be slowed down to mimic a blocked stdout pipe.
+
+    python -m benchmarks.logging_overhead --requests 2000 --write-delay-ms 1
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import time
+
+from benchmarks import _django
+
+PATH = "/api/catalog/products/?page_size=20"
+MODES = {
+    "disabled": {"level": "WARNING", "queued": False},
+    "sync": {"level": "INFO", "queued": False},
+    "queued": {"level": "INFO", "queued": True},
+}
+
+
+class SlowStream:
+    """Discards output, taking ``delay`` seconds per write."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        if self.delay:
+            time.sleep(self.delay)
+
+    def flush(self):
+        pass
+
+
+def logging_settings(level, stream):
+    from django.conf import settings
+
+    logging = copy.deepcopy(settings.LOGGING)
+    # The testing settings silence the console handler with a NullHandler
+    logging["handlers"]["console"] = {
+        "class": "logging.StreamHandler",
+        "level": level,
+        "formatter": "json_formatter",
+        "stream": stream,
+    }
+    for logger in ("django", "apps"):
+        logging["loggers"][logger]["level"] = level
+    return logging
+
+
+def run(mode, args):
+    from django.test import Client, override_settings
+
+    from core.log_queue import configure_logging, stop_listener
+
+    stream = SlowStream(args.write_delay_ms / 1000)
+    with override_settings(LOG_QUEUE_ENABLED=MODES[mode]["queued"]):
+        configure_logging(logging_settings(MODES[mode]["level"], stream))
+        client = Client()
+        for _ in range(args.warmup):
+            client.get(PATH)
+        latencies = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            assert client.get(PATH).status_code == 200
+            latencies.append((time.perf_counter() - start) * 1000)
+        # Writing the backlog is not part of serving the requests
+        stop_listener()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+        "records_written": stream.writes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=["all", *MODES], default="all")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--write-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    _django.setup()
+    from django.conf import settings
+
+    from benchmarks.asgi_vs_wsgi import seed
+    from core.log_queue import configure_logging
+
+    settings.ALLOWED_HOSTS = ["testserver"]
+    with _django.test_database():
+        seed(args.products)
+        modes = MODES if args.mode == "all" else [args.mode]
+        results = [run(mode, args) for mode in modes]
+    configure_logging(settings.LOGGING)
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "logging_overhead",
+                "requests": args.requests,
+                "write_delay_ms": args.write_delay_ms,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Login throughput benchmark.
+
+Measures how many email/password authentications per second the login path
+sustains with the configured password hasher, and reports the rate per core.
+
+    python -m benchmarks.login --hasher argon2 --threads 4 --duration 10
+    python -m benchmarks.login --mode async
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+
+from benchmarks import _django
+
+HASHERS = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "argon2": "apps.users.hashers.TunedArgon2PasswordHasher",
+}
+EMAIL = "bench-login@example.com"
+PASSWORD = os.getenv("BENCHMARK_PASSWORD", "Bench-Login-Pass-1")
+
+
+def run_sync(threads, duration):
+    """Call ``authenticate()`` from ``threads`` threads, like sync workers."""
+    from django.contrib.auth import authenticate
+    from django.db import connection
+
+    counts = [0] * threads
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        while time.perf_counter() < deadline:
+            assert authenticate(email=EMAIL, password=PASSWORD) is not None
+            counts[index] += 1
+        connection.close()
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(counts)
+
+
+def run_async(concurrency, duration):
+    """Run ``aauthenticate()`` from ``concurrency`` tasks on one event loop."""
+    from apps.users.services import aauthenticate
+
+    async def worker(deadline):
+        count = 0
+        while time.perf_counter() < deadline:
+            assert await aauthenticate(EMAIL, PASSWORD) is not None
+            count += 1
+        return count
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        return sum(
+            await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+        )
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hasher", choices=sorted(HASHERS), default="pbkdf2")
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    _django.setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+
+    with (
+        _django.test_database(),
+        override_settings(
+            PASSWORD_HASHERS=[HASHERS[args.hasher]], LOGIN_HASH_WORKERS=args.threads
+        ),
+    ):
+        get_user_model().objects.create_user(
+            email=EMAIL, username="bench-login", password=PASSWORD
+        )
+        runner = run_sync if args.mode == "sync" else run_async
+        started = time.perf_counter()
+        logins = runner(args.threads, args.duration)
+        elapsed = time.perf_counter() - started
+
+    cores = min(args.threads, os.cpu_count() or 1)
+    rate = logins / elapsed
+    print(
+        json.dumps(
+            {
+                "benchmark": "login",
+                "mode": args.mode,
+                "hasher": args.hasher,
+                "hasher_settings": (
+                    {
+                        "time_cost": settings.ARGON2_TIME_COST,
+                        "memory_cost": settings.ARGON2_MEMORY_COST,
+                        "parallelism": settings.ARGON2_PARALLELISM,
+                    }
+                    if args.hasher == "argon2"
+                    else {}
+                ),
+                "threads": args.threads,
+                "cores": cores,
+                "logins": logins,
+                "seconds": round(elapsed, 3),
+                "logins_per_sec": round(rate, 2),
+                "logins_per_sec_per_core": round(rate / cores, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Serializer micro-benchmarks.
+
+Times ``to_representation`` of the product serializer for pages of 10, 100
+and 1000 products, and of the category and user serializers for a page of
+100; ``is_valid`` on create payloads; and JSON rendering of the product
+pages. Runs in process against the testing settings and reports the best
+of ``--repeat`` runs per case, in microseconds per call and relative to a
+fixed pure-Python workload timed alongside, which keeps results comparable
+across machines of different speeds.
+
+Each run is appended to ``--history`` to track results over time, and
+compared with the stored ``--baseline``: a case whose relative time grew
+by more than ``--tolerance`` is a regression and the exit status is 1. The
+default tolerance is meant to catch a serializer growing markedly slower,
+such as doubling its cost, rather than run-to-run noise.
+
+    python -m benchmarks.serializers
+    python -m benchmarks.serializers --tolerance 0.5 --repeat 10
+    python -m benchmarks.serializers --update-baseline
+"""
+
+import argparse
+import io
+import json
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from pathlib import Path
+
+from benchmarks import _django
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BASELINE = BENCHMARKS_DIR / "baselines" / "serializers.json"
+HISTORY = BENCHMARKS_DIR / "history" / "serializers.jsonl"
+PAGES = (10, 100, 1000)
+
+
+def calibration():
+    """Fixed workload of dict building and JSON encoding, like serializing."""
+    rows = [{"id": i, "name": f"item {i}", "price": i * 1.5} for i in range(200)]
+    json.dumps([{**row, "total": row["price"] * 2} for row in rows])
+
+
+def prepare():
+    """Seed the throwaway database; return the benchmark cases by name."""
+    from django.core.management import call_command
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from apps.catalog.models import Category, Product
+    from apps.catalog.serializers import CategorySerializer, ProductSerializer
+    from apps.users.models import User
+    from apps.users.serializers import UserSerializer
+    from core.timing import TimedJSONRenderer
+
+    call_command(
+        "seed_category_product_db",
+        categories=100,
+        products=max(PAGES),
+        stdout=io.StringIO(),
+    )
+    call_command("seed_users_db", users=100, stdout=io.StringIO())
+
+    products = list(Product.objects.select_related("category").order_by("id"))
+    # Half the products have an image, whose absolute URL is built per row
+    for product in products[::2]:
+        product.image.name = f"products/{product.id}.jpg"
+    categories = list(Category.objects.order_by("id"))
+    users = list(User.objects.order_by("id"))
+    context = {"request": Request(APIRequestFactory().get("/api/catalog/products/"))}
+    category_id = str(categories[0].id)
+    renderer = TimedJSONRenderer()
+
+    def represent(serializer, instances, **kwargs):
+        return lambda: serializer(instances, many=True, **kwargs).data
+
+    def validate(serializer, payload):
+        def run():
+            assert serializer(data=payload).is_valid(), payload
+
+        return run
+
+    cases = {}
+    for size in PAGES:
+        page = products[:size]
+        cases[f"product_representation[{size}]"] = represent(
+            ProductSerializer, page, context=context
+        )
+        data = ProductSerializer(page, many=True, context=context).data
+        cases[f"product_render[{size}]"] = lambda data=data: renderer.render(data)
+    cases["category_representation[100]"] = represent(CategorySerializer, categories)
+    cases["user_representation[100]"] = represent(UserSerializer, users)
+    cases["product_is_valid"] = validate(
+        ProductSerializer,
+        {
+            "name": "Benchmark product",
+            "description": "Validated, never saved",
+            "price": "19.99",
+            "stock_quantity": 5,
+            "category_id": category_id,
+        },
+    )
+    cases["category_is_valid"] = validate(
+        CategorySerializer, {"name": "Benchmark category", "description": "New"}
+    )
+    cases["user_is_valid"] = validate(
+        UserSerializer,
+        {
+            "username": "benchmark",
+            "email": "benchmark@example.com",
+            "password": "Benchmark-Pass-1",
+        },
+    )
+    return cases
+
+
+def best_of(func, repeat, min_time):
+    """Return the best time of ``repeat`` runs, in microseconds per call."""
+    timer = timeit.Timer(func)
+    loops = 1
+    while timer.timeit(loops) < min_time:
+        loops *= 2
+    return min(timer.repeat(repeat, loops)) / loops * 1e6
+
+
+def run(cases, repeat, min_time):
+    """
+    Time each case, and the calibration workload right before it so that
+    both see the same machine load. Returns the median calibration time and
+    the results by case.
+    """
+    units, results = [], {}
+    for name, func in cases.items():
+        unit = best_of(calibration, repeat, min_time)
+        us = best_of(func, repeat, min_time)
+        units.append(unit)
+        results[name] = {"us_per_call": round(us, 2), "relative": round(us / unit, 3)}
+    return round(statistics.median(units), 2), results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return the change in percent of each case's relative time since
+    ``baseline``, and the names of the cases slower than ``tolerance`` allows.
+    """
+    changes, regressions = {}, []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        change = result["relative"] / before["relative"] - 1
+        changes[name] = round(change * 100, 1)
+        if change > tolerance:
+            regressions.append(name)
+    return changes, regressions
+
+
+def commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--min-time", type=float, default=0.1, help="seconds per timed run"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--history", type=Path, default=HISTORY)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    _django.setup()
+    with _django.test_database():
+        unit, results = run(prepare(), args.repeat, args.min_time)
+
+    report = {
+        "benchmark": "serializers",
+        "commit": commit(),
+        "timestamp": int(time.time()),
+        "calibration_us": unit,
+        "results": results,
+    }
+    regressions = []
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        report["change_pct"], regressions = compare(results, baseline, args.tolerance)
+        report["regressions"] = regressions
+
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    with args.history.open("a") as history:
+        history.write(json.dumps(report) + "\n")
+
+    print(json.dumps(report, indent=2))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
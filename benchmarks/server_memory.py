@@ -0,0 +1,160 @@
+"""
+Gunicorn worker memory benchmark.
+
+Starts the server from ``gunicorn.conf.py`` without preloading, with
+preloading, and with preloading plus ``gc.freeze()``, sends each the same
+requests and reports how much memory every worker shares with the others
+and how much is private to it. Private memory is what an extra worker costs.
+
+    python -m benchmarks.server_memory --workers 4 --requests 500
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from benchmarks import _django
+from benchmarks.asgi_vs_wsgi import BASE_DIR, free_port, seed, stop_server
+
+PROFILES = {
+    "no_preload": {"GUNICORN_PRELOAD": "false"},
+    "preload": {"GUNICORN_PRELOAD": "true", "GUNICORN_GC_FREEZE": "false"},
+    "preload_gc_freeze": {"GUNICORN_PRELOAD": "true", "GUNICORN_GC_FREEZE": "true"},
+}
+PATHS = [
+    "/api/catalog/products/",
+    "/api/catalog/products/?ordering=-price&page=2",
+    "/api/catalog/categories/",
+    "/.well-known/jwks.json",
+]
+
+
+def smaps_rollup(pid):
+    fields = {}
+    lines = Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]
+    for line in lines:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0]) / 1024
+    return fields
+
+
+def worker_pids(master_pid):
+    pids = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == master_pid:
+            pids.append(int(stat.parent.name))
+    return pids
+
+
+def wait_for_workers(server, port, workers):
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}{PATHS[0]}").read()
+            if len(worker_pids(server.pid)) >= workers:
+                # Workers answer once warmed; give the last ones time to finish
+                time.sleep(2)
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start within 60s")
+
+
+def run(profile, args, env):
+    port = free_port()
+    env = {
+        **env,
+        **PROFILES[profile],
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": str(args.workers),
+        "GUNICORN_THREADS": "1",
+        # Recycling would replace the workers being measured
+        "GUNICORN_MAX_REQUESTS": "0",
+        "GUNICORN_LOG_LEVEL": "warning",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=BASE_DIR,
+        env=env,
+    )
+    try:
+        wait_for_workers(server, port, args.workers)
+        for i in range(args.requests):
+            path = PATHS[i % len(PATHS)]
+            urllib.request.urlopen(f"http://127.0.0.1:{port}{path}").read()
+        master = smaps_rollup(server.pid)
+        workers = [smaps_rollup(pid) for pid in worker_pids(server.pid)]
+    finally:
+        stop_server(server)
+
+    def average(*names):
+        total = sum(sum(worker.get(name, 0) for name in names) for worker in workers)
+        return round(total / len(workers), 1)
+
+    return {
+        "profile": profile,
+        "workers": len(workers),
+        "master_rss_mb": round(master["Rss"], 1),
+        "worker_rss_mb": average("Rss"),
+        "worker_pss_mb": average("Pss"),
+        "worker_shared_mb": average("Shared_Clean", "Shared_Dirty"),
+        "worker_private_mb": average("Private_Clean", "Private_Dirty"),
+        "total_pss_mb": round(
+            master["Pss"] + sum(worker["Pss"] for worker in workers), 1
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profile", choices=["all", *PROFILES], default="all")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--products", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "core.settings",
+            "ENVIRONMENT": "testing",
+            "TEST_DB_NAME": os.path.join(tmp, "benchmark"),
+        }
+        os.environ.update(env)
+        _django.setup()
+        from django.core.management import call_command
+
+        call_command("migrate", verbosity=0)
+        seed(args.products)
+
+        profiles = PROFILES if args.profile == "all" else [args.profile]
+        results = [run(profile, args, env) for profile in profiles]
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "server_memory",
+                "requests": args.requests,
+                "products": args.products,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -219,3 +219,18 @@ def invalid_file():
     return SimpleUploadedFile(
         name="test.txt", content=b"This is not an image", content_type="text/plain"
     )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def clean_metrics_dir():
+    """Remove the metrics files the test run recorded once it ends."""
+    yield
+    from django.conf import settings
+
+    from core import metrics
+
+    metrics.clear_directory()
+    try:
+        os.rmdir(settings.METRICS_DIR)
+    except OSError:
+        pass
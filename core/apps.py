@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = "core"
+
+    def ready(self):
+        # Hook into every connection, including those opened before the
+        # middleware is loaded
+        from . import query_inspection, timing  # noqa: F401
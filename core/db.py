@@ -0,0 +1,66 @@
+"""
+Helpers for the per-process psycopg connection pools.
+
+Django creates each pool lazily, on the first query of a process. A pool or
+connection that already exists when a server forks its workers is shared
+with the parent: using or closing it in a child would break the parent's
+sessions. ``close_pools()`` should run in the parent before forking, and the
+fork handler registered below makes children drop whatever was inherited.
+"""
+
+import os
+
+from django.db import connections
+
+# Inherited connections are kept referenced so that garbage collection never
+# closes them, which would send a terminate message on the parent's socket.
+_inherited = []
+
+
+def _pools():
+    try:
+        from django.db.backends.postgresql.base import DatabaseWrapper
+    except ImportError:
+        return {}
+    return DatabaseWrapper._connection_pools
+
+
+def pool_stats():
+    """
+    Return the statistics of each open pool in this process, keyed by alias.
+    ``requests_wait_ms`` and ``requests_waiting`` show how long requests
+    queue for a connection; ``avg_wait_ms`` is derived from them.
+    """
+    stats = {}
+    for alias, pool in list(_pools().items()):
+        pool_stats = pool.get_stats()
+        requests = pool_stats.get("requests_num", 0)
+        pool_stats["avg_wait_ms"] = (
+            round(pool_stats.get("requests_wait_ms", 0) / requests, 3)
+            if requests
+            else 0.0
+        )
+        stats[alias] = pool_stats
+    return stats
+
+
+def close_pools():
+    """Close this thread's connections and every pool of this process."""
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+    for pool in list(_pools().values()):
+        pool.close()
+    _pools().clear()
+
+
+def _drop_inherited_connections():
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is not None:
+            _inherited.append(conn.connection)
+            conn.connection = None
+    pools = _pools()
+    _inherited.extend(pools.values())
+    pools.clear()
+
+
+os.register_at_fork(after_in_child=_drop_inherited_connections)
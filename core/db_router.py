@@ -0,0 +1,166 @@
+"""
+Read-replica routing.
+
+Reads go to a healthy replica only while ``ReplicaRoutingMiddleware`` has
+allowed it for the current request, which it does for safe-method requests
+from clients that have not written recently. Everything else, including
+management commands and background threads, uses the primary.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def allow_replica_reads(allowed=True):
+    """
+    Allow or forbid replica reads in the current context. Returns a token
+    for ``reset_replica_reads()``.
+    """
+    return _replica_reads.set(allowed)
+
+
+def reset_replica_reads(token):
+    _replica_reads.reset(token)
+
+
+class ReplicaMonitor:
+    """
+    Tracks which of ``REPLICA_DATABASES`` are usable. Replication lag is
+    measured at most every ``REPLICA_LAG_CHECK_INTERVAL`` seconds, and a
+    replica that is unreachable or more than ``REPLICA_MAX_LAG_SECONDS``
+    behind is skipped until a later check finds it caught up.
+
+    Checks run in a background thread so that a slow or unreachable replica
+    never holds up a request: requests keep the previous answer meanwhile,
+    and the first ones of a process wait for it at most
+    ``REPLICA_LAG_CHECK_TIMEOUT`` seconds before reading from the primary.
+    """
+
+    def __init__(self):
+        self._healthy = []
+        self._checked_at = None
+        self._thread = None
+        self._thread_pid = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def healthy_replicas(self):
+        interval = settings.REPLICA_LAG_CHECK_INTERVAL
+        if self._checked_at is None or time.monotonic() - self._checked_at >= interval:
+            thread = self._start_check()
+            if self._checked_at is None:
+                thread.join(settings.REPLICA_LAG_CHECK_TIMEOUT)
+        return self._healthy
+
+    def _start_check(self):
+        # Threads do not survive fork(), so a child starts its own check
+        with self._lock:
+            if self._thread_pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run_check,
+                    args=[self._generation],
+                    name="replica-lag-check",
+                    daemon=True,
+                )
+                self._thread_pid = os.getpid()
+                self._thread.start()
+            return self._thread
+
+    def _run_check(self, generation):
+        try:
+            healthy = self._check()
+            with self._lock:
+                # A reset() during the check makes its answer stale
+                if generation == self._generation:
+                    self._healthy = healthy
+                    self._checked_at = time.monotonic()
+        finally:
+            # The thread's own connections would otherwise stay open
+            connections.close_all()
+
+    def _check(self):
+        healthy = []
+        for alias in settings.REPLICA_DATABASES:
+            lag = self.lag(alias)
+            if lag is None:
+                logger.warning(
+                    "Replica '%s' is unreachable, reading from primary.", alias
+                )
+            elif lag > settings.REPLICA_MAX_LAG_SECONDS:
+                logger.warning(
+                    "Replica '%s' is %.1fs behind, reading from primary.", alias, lag
+                )
+            else:
+                healthy.append(alias)
+        return healthy
+
+    def lag(self, alias):
+        """Return the replication lag of ``alias`` in seconds, or None if down."""
+        connection = connections[alias]
+        try:
+            if connection.vendor != "postgresql":
+                connection.ensure_connection()
+                return 0.0
+            with connection.cursor() as cursor:
+                # An idle replica that has replayed everything it received is current
+                cursor.execute(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = "
+                    "pg_last_wal_replay_lsn() THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM "
+                    "now() - pg_last_xact_replay_timestamp()), 0) END"
+                )
+                return float(cursor.fetchone()[0])
+        except DatabaseError as e:
+            logger.error("Replica '%s' lag check failed: %s", alias, e)
+            return None
+
+    def reset(self):
+        with self._lock:
+            self._generation += 1
+            self._thread = self._thread_pid = None
+            self._healthy = []
+            self._checked_at = None
+
+
+replica_monitor = ReplicaMonitor()
+
+
+class ReplicaRouter:
+    """Send allowed reads to a random healthy replica and writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        replicas = replica_monitor.healthy_replicas()
+        return random.choice(replicas) if replicas else None
+
+    def db_for_write(self, model, **hints):
+        # Later reads of this request must see the write
+        if _replica_reads.get():
+            _replica_reads.set(False)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        aliases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+@receiver(setting_changed)
+def reset_replica_monitor(setting, **kwargs):
+    if setting.startswith("REPLICA_") or setting == "DATABASES":
+        replica_monitor.reset()
@@ -0,0 +1,195 @@
+"""
+Filters thinning out high-volume log events.
+
+Attach them to loggers in ``LOGGING``. An event is a logger name, level and
+message template, e.g. ``("apps.catalog.views", INFO, "Product list
+viewed.")``, so events are told apart before their arguments are merged;
+``django.request`` logs a 401 and a 500 with the same template. ``messages``
+restricts a filter to some templates; by default it applies to every event of
+the loggers it is attached to. Errors and anything more severe always pass.
+
+Suppressed records are counted per event. ``summary_interval`` seconds after
+an event's first suppression a summary such as "Suppressed 120 similar events
+in the last 60s: Product list viewed." is logged, carrying the count as
+``suppressed``: before the event's next record, or from a background thread
+if the event has stopped. ``flush_summaries`` logs the pending summaries at
+once, as ``core.log_queue`` does before its listener stops.
+"""
+
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+
+# Seconds between the background checks for summaries due
+FLUSH_INTERVAL = 1.0
+
+_filters = weakref.WeakSet()
+_flusher = None
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def flush_summaries(force=True):
+    """
+    Log the pending summaries of every filter, or with ``force=False`` only
+    those due. Returns whether any are left pending.
+    """
+    pending = False
+    for event_filter in list(_filters):
+        pending = event_filter.flush(force) or pending
+    return pending
+
+
+def _flush_until_idle():
+    global _flusher
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        with _flusher_lock:
+            if not flush_summaries(force=False):
+                _flusher = None
+                return
+
+
+def _ensure_flusher():
+    # Started by a suppression and stopped once nothing is pending, so a
+    # process only runs the thread while events are being dropped
+    global _flusher, _flusher_pid
+    if _flusher is not None and _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher is not None and _flusher_pid == os.getpid():
+            return
+        _flusher = threading.Thread(
+            target=_flush_until_idle, name="log-summaries", daemon=True
+        )
+        _flusher_pid = os.getpid()
+        _flusher.start()
+
+
+def _forget_flusher():
+    # Threads do not survive fork(); the child starts its own when needed
+    global _flusher, _flusher_lock
+    _flusher = None
+    _flusher_lock = threading.Lock()
+
+
+class EventFilter(logging.Filter):
+    """Base class dropping the records ``allow`` rejects and summarizing them."""
+
+    def __init__(self, messages=(), summary_interval=60):
+        super().__init__()
+        self.messages = frozenset(messages)
+        self.summary_interval = summary_interval
+        self._suppressed = {}
+        self._since = {}
+        self._origins = {}
+        self._lock = threading.Lock()
+        _filters.add(self)
+
+    def allow(self, event, now):
+        """Return whether to keep a record of ``event``; called under a lock."""
+        raise NotImplementedError
+
+    def filter(self, record):
+        if hasattr(record, "suppressed") or record.levelno >= logging.ERROR:
+            return True
+        if self.messages and record.msg not in self.messages:
+            return True
+
+        event = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            keep = self.allow(event, now)
+            if not keep:
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+                if event not in self._since:
+                    self._since[event] = now
+                    self._origins[event] = (record.pathname, record.lineno)
+            summary = self._due_summary(event, now)
+        if summary:
+            self._log_summary(event, *summary)
+        if not keep:
+            _ensure_flusher()
+        return keep
+
+    def flush(self, force=True):
+        """
+        Log the summaries due, or all pending ones with ``force``. Returns
+        whether any are left pending.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                (event, self._due_summary(event, now, force))
+                for event in list(self._since)
+            ]
+            pending = len(self._since) > 0
+        for event, summary in due:
+            if summary:
+                self._log_summary(event, *summary)
+        return pending
+
+    def _due_summary(self, event, now, force=False):
+        since = self._since.get(event)
+        if since is None or (now - since < self.summary_interval and not force):
+            return None
+        del self._since[event]
+        return self._origins.pop(event), self._suppressed.pop(event), now - since
+
+    def _log_summary(self, event, origin, suppressed, seconds):
+        name, levelno, msg = event
+        summary = logging.LogRecord(
+            name,
+            levelno,
+            *origin,
+            "Suppressed %d similar events in the last %ds: %s",
+            (suppressed, seconds, msg),
+            None,
+        )
+        summary.suppressed = suppressed
+        # Goes through this logger's filters and handlers like the record did
+        logging.getLogger(name).handle(summary)
+
+
+class SamplingFilter(EventFilter):
+    """Keeps each record with probability ``rate`` (1 keeps everything)."""
+
+    def __init__(self, rate=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.rate = rate
+
+    def allow(self, event, now):
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class RateLimitFilter(EventFilter):
+    """
+    Keeps at most ``rate`` records per second of each event, allowing bursts
+    of up to ``burst`` records (default ``rate``). A token bucket per event;
+    a ``rate`` of 0 keeps everything.
+    """
+
+    def __init__(self, rate=0, burst=None, **kwargs):
+        super().__init__(**kwargs)
+        self.rate = rate
+        self.burst = max(1, burst if burst is not None else rate)
+        self._buckets = {}
+
+    def allow(self, event, now):
+        if not self.rate:
+            return True
+        tokens, last = self._buckets.get(event, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        keep = tokens >= 1
+        self._buckets[event] = (tokens - 1 if keep else tokens, now)
+        return keep
+
+
+# core.log_queue flushes before its listener stops; this covers logging
+# without the queue
+atexit.register(flush_summaries)
+os.register_at_fork(after_in_child=_forget_flusher)
@@ -0,0 +1,161 @@
+"""
+Queued logging.
+
+``configure_logging`` is the ``LOGGING_CONFIG`` callable. After the usual
+``dictConfig`` it replaces the handlers of each configured logger with a
+``QueuedHandler``, so a request thread only merges the message arguments
+and queues the record. A single listener thread formats and writes it with
+the original handlers. Nothing blocks on a slow stdout; when the queue is
+full records are dropped and the drop is reported once there is room.
+
+A forked child has no listener thread and writes its records directly,
+unless it starts its own with ``start_in_worker``, as gunicorn workers do.
+"""
+
+import atexit
+import copy
+import logging
+import logging.config
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+from django.conf import settings
+
+from . import log_filters
+
+
+class QueuedHandler(QueueHandler):
+    """Queues records for the listener to pass to ``handlers``."""
+
+    def __init__(self, log_queue, handlers):
+        super().__init__(log_queue)
+        self.handlers = handlers
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Other handlers of the logger may still see the original record
+        record = copy.copy(record)
+        # Arguments and tracebacks can reference request state, so they are
+        # resolved here; the formatting itself is left to the listener.
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue is None:
+            write(record, self.handlers)
+            return
+        if self.dropped:
+            self._report_dropped()
+        try:
+            self.queue.put_nowait((record, self.handlers))
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+    def _report_dropped(self):
+        with self._drop_lock:
+            dropped, self.dropped = self.dropped, 0
+        if not dropped:
+            return
+        record = logging.LogRecord(
+            __name__,
+            logging.WARNING,
+            __file__,
+            0,
+            f"Dropped {dropped} log records because the log queue was full.",
+            None,
+            None,
+        )
+        try:
+            self.queue.put_nowait((record, self.handlers))
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += dropped
+
+
+class HandlersListener(QueueListener):
+    """Writes each queued record with the handlers it was queued for."""
+
+    def handle(self, item):
+        write(*item)
+
+
+def write(record, handlers):
+    for handler in handlers:
+        if record.levelno >= handler.level:
+            handler.handle(record)
+
+
+_queued_handlers = []
+_listener = None
+
+
+def configure_logging(logging_settings):
+    """Apply ``LOGGING``, queueing records when ``LOG_QUEUE_ENABLED``."""
+    stop_listener()
+    _queued_handlers.clear()
+    logging.config.dictConfig(logging_settings)
+    if not settings.LOG_QUEUE_ENABLED:
+        return
+
+    names = list(logging_settings.get("loggers", {}))
+    if "root" in logging_settings:
+        names.append("")
+    for name in names:
+        logger = logging.getLogger(name)
+        if logger.handlers:
+            handler = QueuedHandler(None, tuple(logger.handlers))
+            logger.handlers = [handler]
+            _queued_handlers.append(handler)
+    _start_listener()
+
+
+def _start_listener():
+    global _listener
+    log_queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+    for handler in _queued_handlers:
+        handler.queue = log_queue
+    _listener = HandlersListener(log_queue)
+    _listener.start()
+
+
+def start_in_worker():
+    """Start this forked process's own listener, e.g. in a gunicorn worker."""
+    if _queued_handlers and _listener is None:
+        _start_listener()
+
+
+def stop_listener():
+    """
+    Log the pending suppression summaries, write the records still queued
+    and stop the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        log_filters.flush_summaries()
+        _listener.stop()
+        _listener = None
+
+
+def _detach_in_child():
+    # The parent's listener thread does not exist in a forked child, and its
+    # queue may have been locked mid-operation. Short-lived children, such as
+    # a process pool's, write directly rather than each starting a thread.
+    global _listener
+    _listener = None
+    for handler in _queued_handlers:
+        handler.queue = None
+        handler.dropped = 0
+        handler._drop_lock = threading.Lock()
+
+
+# Registered after logging's own exit hook, so it runs first
+atexit.register(stop_listener)
+os.register_at_fork(after_in_child=_detach_in_child)
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.openapi import build_schema, code_version
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema served to the documentation pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="File to write (default: OPENAPI_SCHEMA_PATH).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"] or settings.OPENAPI_SCHEMA_PATH
+        body = build_schema()
+
+        # Replaced in one step, so a running server never reads half a file
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote the OpenAPI schema for code version {code_version()} "
+                f"to {path} ({len(body)} bytes)."
+            )
+        )
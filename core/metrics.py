@@ -0,0 +1,434 @@
+"""
+Metrics shared by all worker processes, in the Prometheus text format.
+
+Each process records into its own file in ``METRICS_DIR``, mapped into its
+memory, so a sample costs a dict lookup and a write to memory, without
+system calls or locks shared between processes. ``render()`` reads the files
+of every process and adds them up; counters and histograms of workers that
+have exited keep counting towards the totals.
+
+Gauges describe a single process and are labelled with its ``pid``. Their
+file is removed when the process exits (``mark_process_dead``), and the
+directory should be emptied when the server starts (``clear_directory``).
+Servers that do neither, such as ``runserver``, leave the gauges of exited
+processes behind; ``render()`` removes those it finds.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .db import pool_stats
+
+# File layout: the number of bytes used, then entries made of the key length,
+# the UTF-8 key padded so that the value that follows is 8-byte aligned.
+_USED = struct.Struct("<Q")
+_KEY_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_SIZE = 64 * 1024
+
+
+def _entries(data, used):
+    offset = _USED.size
+    while offset < used:
+        (length,) = _KEY_LENGTH.unpack_from(data, offset)
+        key_offset = offset + _KEY_LENGTH.size
+        value_offset = key_offset + length + (-(length + _KEY_LENGTH.size) % 8)
+        key = bytes(data[key_offset : key_offset + length]).decode()
+        (value,) = _VALUE.unpack_from(data, value_offset)
+        yield key, value, value_offset
+        offset = value_offset + _VALUE.size
+
+
+class MappedValues:
+    """Float values by key in a memory-mapped file written by one process."""
+
+    def __init__(self, path):
+        self._file = open(path, "a+b")
+        try:
+            if os.fstat(self._file.fileno()).st_size < _INITIAL_SIZE:
+                self._file.truncate(_INITIAL_SIZE)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        except BaseException:
+            self._file.close()
+            raise
+        # A process reusing the pid of an exited one continues its file
+        self._used = _USED.unpack_from(self._map, 0)[0] or _USED.size
+        self._offsets = {
+            key: offset for key, _, offset in _entries(self._map, self._used)
+        }
+        self._lock = threading.Lock()
+
+    def add(self, *items):
+        """Add each ``(key, amount)`` to its value."""
+        with self._lock:
+            for key, amount in items:
+                offset = self._offsets.get(key) or self._append(key)
+                (value,) = _VALUE.unpack_from(self._map, offset)
+                _VALUE.pack_into(self._map, offset, value + amount)
+
+    def set(self, key, value):
+        with self._lock:
+            offset = self._offsets.get(key) or self._append(key)
+            _VALUE.pack_into(self._map, offset, value)
+
+    def _append(self, key):
+        encoded = key.encode()
+        padding = -(len(encoded) + _KEY_LENGTH.size) % 8
+        size = _KEY_LENGTH.size + len(encoded) + padding + _VALUE.size
+        if self._used + size > len(self._map):
+            self._grow(self._used + size)
+        offset = self._used
+        _KEY_LENGTH.pack_into(self._map, offset, len(encoded))
+        offset += _KEY_LENGTH.size
+        self._map[offset : offset + len(encoded)] = encoded
+        offset += len(encoded) + padding
+        _VALUE.pack_into(self._map, offset, 0.0)
+        # Readers only look up to the used length, so the entry is complete
+        # before it becomes visible
+        self._used += size
+        _USED.pack_into(self._map, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def _grow(self, needed):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def read_values(path):
+    """Yield the ``(key, value)`` pairs of a file written by ``MappedValues``."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _USED.size:
+        return
+    (used,) = _USED.unpack_from(data, 0)
+    for key, value, _ in _entries(data, min(used, len(data))):
+        yield key, value
+
+
+_files = {}
+_files_lock = threading.Lock()
+
+
+def _values(kind):
+    values = _files.get(kind)
+    if values is None:
+        with _files_lock:
+            values = _files.get(kind)
+            if values is None:
+                directory = Path(settings.METRICS_DIR)
+                directory.mkdir(parents=True, exist_ok=True)
+                values = MappedValues(directory / f"{kind}_{os.getpid()}.db")
+                _files[kind] = values
+    return values
+
+
+def _forget_files():
+    # Files inherited over a fork belong to the parent process
+    global _files_lock
+    _files.clear()
+    _files_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_files)
+
+
+@receiver(setting_changed)
+def reset_on_setting_changed(setting, **kwargs):
+    if setting == "METRICS_DIR":
+        with _files_lock:
+            for values in _files.values():
+                values.close()
+            _files.clear()
+
+
+REGISTRY = []
+
+
+class Metric:
+    type = None
+    kind = "values"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._keys = {}
+        REGISTRY.append(self)
+
+    def _key(self, sample, labels, le=""):
+        return json.dumps([self.name, sample, labels, le])
+
+    def _labels(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        values = self._labels(labels)
+        key = self._keys.get(values)
+        if key is None:
+            key = self._keys[values] = self._key(self.name, values)
+        _values(self.kind).add((key, amount))
+
+
+class Gauge(Metric):
+    type = "gauge"
+    kind = "gauges"
+
+    def set(self, value, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        values = self._labels(labels)
+        key = self._keys.get(values)
+        if key is None:
+            key = self._keys[values] = self._key(self.name, values)
+        _values(self.kind).set(key, value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = (*sorted(buckets), float("inf"))
+
+    def observe(self, value, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        values = self._labels(labels)
+        keys = self._keys.get(values)
+        if keys is None:
+            keys = self._keys[values] = (
+                [self._key("bucket", values, le) for le in self.buckets],
+                self._key("sum", values),
+                self._key("count", values),
+            )
+        buckets, sum_key, count_key = keys
+        # Buckets are stored individually and made cumulative by render()
+        bucket = buckets[bisect.bisect_left(self.buckets, value)]
+        _values(self.kind).add((bucket, 1), (sum_key, value), (count_key, 1))
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds the ``with`` block takes."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests served.",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time taken to serve HTTP requests.",
+    ["method", "route", "status"],
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time HTTP requests spent in database queries.",
+    ["route"],
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "Database queries run by HTTP requests.",
+    ["route"],
+)
+IMAGE_PROCESSING = Histogram(
+    "image_processing_duration_seconds",
+    "Time taken to validate or compress an uploaded image.",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+BULK_UPLOAD_ROWS = Counter(
+    "bulk_upload_rows_total",
+    "Rows processed by bulk uploads.",
+    ["kind"],
+)
+BULK_UPLOAD_DURATION = Counter(
+    "bulk_upload_duration_seconds_total",
+    "Time spent processing bulk uploads; rows per second is the rate of "
+    "bulk_upload_rows_total divided by the rate of this counter.",
+    ["kind"],
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Connections opened by the pool of a worker.",
+    ["alias"],
+)
+DB_POOL_AVAILABLE = Gauge(
+    "db_pool_available",
+    "Idle connections in the pool of a worker.",
+    ["alias"],
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_requests_waiting",
+    "Requests of a worker waiting for a pooled connection.",
+    ["alias"],
+)
+
+# Seconds between updates of a worker's pool gauges
+POOL_STATS_INTERVAL = 5
+_pool_stats_updated = 0.0
+
+
+def observe_request(method, route, status, seconds, db_seconds, queries):
+    """Record one served request, and now and then the worker's pool usage."""
+    global _pool_stats_updated
+    if not settings.METRICS_ENABLED:
+        return
+    REQUESTS.inc(method=method, route=route, status=status)
+    REQUEST_DURATION.observe(seconds, method=method, route=route, status=status)
+    REQUEST_DB_DURATION.observe(db_seconds, route=route)
+    DB_QUERIES.inc(queries, route=route)
+
+    now = time.monotonic()
+    if now - _pool_stats_updated >= POOL_STATS_INTERVAL:
+        _pool_stats_updated = now
+        for alias, stats in pool_stats().items():
+            DB_POOL_SIZE.set(stats.get("pool_size", 0), alias=alias)
+            DB_POOL_AVAILABLE.set(stats.get("pool_available", 0), alias=alias)
+            DB_POOL_WAITING.set(stats.get("requests_waiting", 0), alias=alias)
+
+
+def observe_bulk_upload(kind, rows, seconds):
+    BULK_UPLOAD_ROWS.inc(rows, kind=kind)
+    BULK_UPLOAD_DURATION.inc(seconds, kind=kind)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = (
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"),
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def _collect():
+    """Sum the values of every process, keeping gauges apart by pid."""
+    totals = {}
+    gauges = {}
+    directory = Path(settings.METRICS_DIR)
+    if not directory.is_dir():
+        return totals, gauges
+    for path in sorted(directory.glob("*.db")):
+        kind, _, pid = path.stem.rpartition("_")
+        if kind == Gauge.kind and not _is_running(int(pid)):
+            mark_process_dead(pid)
+            continue
+        try:
+            for key, value in read_values(path):
+                name, sample, labels, le = json.loads(key)
+                if kind == Gauge.kind:
+                    gauges.setdefault(name, []).append((labels, pid, value))
+                else:
+                    sample_key = (sample, tuple(labels), le)
+                    samples = totals.setdefault(name, {})
+                    samples[sample_key] = samples.get(sample_key, 0) + value
+        except FileNotFoundError:
+            # Removed by mark_process_dead while being read
+            continue
+    return totals, gauges
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def render():
+    """Return the metrics of all processes in the Prometheus text format."""
+    totals, gauges = _collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        names = metric.labelnames
+        if isinstance(metric, Gauge):
+            for labels, pid, value in sorted(gauges.get(metric.name, [])):
+                label_text = _format_labels((*names, "pid"), (*labels, pid))
+                lines.append(f"{metric.name}{label_text} {_format_value(value)}")
+            continue
+
+        samples = totals.get(metric.name, {})
+        if isinstance(metric, Histogram):
+            for labels in sorted({labels for _, labels, _ in samples}):
+                cumulative = 0
+                for le in metric.buckets:
+                    cumulative += samples.get(("bucket", labels, le), 0)
+                    label_text = _format_labels(
+                        (*names, "le"), (*labels, _format_value(le))
+                    )
+                    lines.append(
+                        f"{metric.name}_bucket{label_text} {_format_value(cumulative)}"
+                    )
+                label_text = _format_labels(names, labels)
+                for suffix in ("sum", "count"):
+                    value = samples.get((suffix, labels, ""), 0)
+                    lines.append(
+                        f"{metric.name}_{suffix}{label_text} {_format_value(value)}"
+                    )
+        else:
+            for (_, labels, _), value in sorted(samples.items()):
+                label_text = _format_labels(names, labels)
+                lines.append(f"{metric.name}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def mark_process_dead(pid):
+    """Drop the gauges of an exited process; its counters keep counting."""
+    path = Path(settings.METRICS_DIR) / f"{Gauge.kind}_{pid}.db"
+    path.unlink(missing_ok=True)
+
+
+def clear_directory():
+    """Remove the files of a previous server run."""
+    directory = Path(settings.METRICS_DIR)
+    if directory.is_dir():
+        for path in directory.glob("*.db"):
+            path.unlink(missing_ok=True)
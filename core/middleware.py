@@ -0,0 +1,266 @@
+import logging
+import time
+
+import jwt
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import metrics, query_inspection, timing
+from .db_router import allow_replica_reads, reset_replica_reads
+
+access_logger = logging.getLogger("core.access")
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Cache backends another worker process cannot see
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets safe-method requests read from the replicas in ``REPLICA_DATABASES``.
+
+    An authenticated request with any other method pins its user to the
+    primary for ``REPLICA_PIN_SECONDS``, through an entry in the
+    ``REPLICA_PIN_CACHE`` cache, so that the user reads their own writes
+    even from a replica that is a few seconds behind. Keep the window at
+    least as long as ``REPLICA_MAX_LAG_SECONDS``. The cache must be shared
+    by every worker, or the next request may land on a worker that never
+    saw the pin, so an in-memory cache is refused at startup.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        backend = settings.CACHES[settings.REPLICA_PIN_CACHE]["BACKEND"]
+        if backend in PROCESS_LOCAL_CACHES:
+            raise ImproperlyConfigured(
+                f"Read replicas need a REPLICA_PIN_CACHE shared by the workers, "
+                f"e.g. Redis through REDIS_URL; the {settings.REPLICA_PIN_CACHE!r} "
+                f"cache uses {backend}."
+            )
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @property
+    def cache(self):
+        return caches[settings.REPLICA_PIN_CACHE]
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user_id = self.user_id(request, request.user)
+        token = allow_replica_reads(
+            request.method in SAFE_METHODS
+            and not (user_id and self.cache.get(self.pin_key(user_id)))
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_replica_reads(token)
+        if request.method not in SAFE_METHODS:
+            if user_id := self.user_id(request, request.user):
+                self.cache.set(self.pin_key(user_id), 1, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        user_id = self.user_id(request, await request.auser())
+        token = allow_replica_reads(
+            request.method in SAFE_METHODS
+            and not (user_id and await self.cache.aget(self.pin_key(user_id)))
+        )
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_replica_reads(token)
+        if request.method not in SAFE_METHODS:
+            if user_id := self.user_id(request, await request.auser()):
+                await self.cache.aset(
+                    self.pin_key(user_id), 1, settings.REPLICA_PIN_SECONDS
+                )
+        return response
+
+    def user_id(self, request, user):
+        """
+        Return the id of the requesting user: the one authenticated by the
+        session or, once the view has run, by DRF, or else the one a bearer
+        token names. The token is not verified here; it only decides
+        whether the request may read a replica, and reads from the primary
+        are always correct.
+        """
+        if user.is_authenticated:
+            return str(user.pk)
+        scheme, _, raw_token = request.headers.get("Authorization", "").partition(" ")
+        if scheme not in jwt_settings.AUTH_HEADER_TYPES or not raw_token:
+            return None
+        try:
+            claims = jwt.decode(raw_token, options={"verify_signature": False})
+        except jwt.InvalidTokenError:
+            return None
+        user_id = claims.get(jwt_settings.USER_ID_CLAIM)
+        return str(user_id) if user_id else None
+
+    def pin_key(self, user_id):
+        return f"replica-pin:{user_id}"
+
+
+class RequestTimingMiddleware:
+    """
+    Measures where each request spends its time: in total, in database
+    queries (with their count), serializing and rendering, and the rest
+    ("app"). The durations are sent in a ``Server-Timing`` header when
+    ``SERVER_TIMING_HEADER`` is set (in development), logged to ``core.access``, whose
+    records carry them as fields for the JSON formatter, and recorded in
+    ``core.metrics``. Keep it first in ``MIDDLEWARE`` so the total covers the
+    other middleware.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        timings, token = timing.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing.finish(token)
+        return self.process_response(request, response, timings, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        timings, token = timing.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing.finish(token)
+        return self.process_response(request, response, timings, started)
+
+    def process_response(self, request, response, timings, started):
+        total = (time.perf_counter() - started) * 1000
+        db = timings.db * 1000
+        serialize = timings.serialize * 1000
+        render = timings.render * 1000
+        app = max(total - db - serialize - render, 0.0)
+
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = (
+                f"total;dur={total:.1f}, "
+                f'db;dur={db:.1f};desc="{timings.queries} queries", '
+                f"serialize;dur={serialize:.1f}, "
+                f"render;dur={render:.1f}, "
+                f"app;dur={app:.1f}"
+            )
+
+        match = request.resolver_match
+        route = match.view_name if match else ""
+        metrics.observe_request(
+            request.method,
+            route or "unmatched",
+            response.status_code,
+            total / 1000,
+            timings.db,
+            timings.queries,
+        )
+
+        if access_logger.isEnabledFor(logging.INFO):
+            access_logger.info(
+                "%s %s %s %.1fms",
+                request.method,
+                request.path,
+                response.status_code,
+                total,
+                extra={
+                    "method": request.method,
+                    "path": request.path,
+                    "route": route,
+                    "status": response.status_code,
+                    "duration_ms": round(total, 2),
+                    "db_ms": round(db, 2),
+                    "db_queries": timings.queries,
+                    "serialize_ms": round(serialize, 2),
+                    "render_ms": round(render, 2),
+                    "app_ms": round(app, 2),
+                },
+            )
+        return response
+
+
+class QueryInspectionMiddleware:
+    """
+    Reports the N+1 queries of each request once it has been served, and
+    logs slow queries as they run (see ``core.query_inspection``). Only used
+    while ``QUERY_INSPECTION`` is set.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSPECTION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries, token = query_inspection.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            query_inspection.finish(token)
+        self.report(request, queries)
+        return response
+
+    async def __acall__(self, request):
+        queries, token = query_inspection.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            query_inspection.finish(token)
+        self.report(request, queries)
+        return response
+
+    def report(self, request, queries):
+        repeated = queries.repeated()
+        if not repeated:
+            return
+        if settings.N_PLUS_ONE_ACTION == "raise":
+            raise query_inspection.NPlusOneError(
+                "\n".join(
+                    f"{request.method} {request.path} ran {count} similar "
+                    f"queries from {origin}: {shape}"
+                    for count, origin, shape in repeated
+                )
+            )
+        for count, origin, shape in repeated:
+            logger.warning(
+                "N+1 queries: %s %s ran %d similar queries from %s: %s",
+                request.method,
+                request.path,
+                count,
+                origin,
+                shape,
+            )
@@ -0,0 +1,144 @@
+"""
+Deferred OpenAPI documentation for views, and the served API schema.
+
+drf_yasg and the schema objects describing an endpoint are only needed when
+the API schema is generated, which few workers ever do. ``swagger_schema``
+records a view method together with a function building its
+``swagger_auto_schema`` arguments, and the recorded decorators are applied
+when ``core.schema.SchemaGenerator`` first generates a schema.
+
+The schema itself is normally built once per release by
+``manage.py generate_openapi_schema`` and only read here.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "x-code-version"
+
+_pending = []
+_pending_lock = threading.Lock()
+
+
+def swagger_schema(build):
+    """
+    Decorate a view method like ``@swagger_auto_schema(**build(openapi))``,
+    deferring the call and the drf_yasg imports until schema generation.
+    """
+
+    def decorator(view_method):
+        with _pending_lock:
+            _pending.append((view_method, build))
+        return view_method
+
+    return decorator
+
+
+def apply_pending():
+    """
+    Apply every recorded ``swagger_auto_schema`` decorator. Threads generating
+    a schema at the same time wait until all of them are applied.
+    """
+    from drf_yasg import openapi
+    from drf_yasg.utils import swagger_auto_schema
+
+    with _pending_lock:
+        while _pending:
+            view_method, build = _pending.pop(0)
+            swagger_auto_schema(**build(openapi))(view_method)
+
+
+_code_version = None
+_documents = {}
+_lock = threading.Lock()
+
+
+def code_version():
+    """
+    Return ``APP_VERSION``, or else a fingerprint of the project's Python
+    files, which changes whenever the code describing the API may have.
+    """
+    global _code_version
+    if settings.APP_VERSION:
+        return settings.APP_VERSION
+    if _code_version is None:
+        digest = hashlib.sha256()
+        root = Path(settings.BASE_DIR).parent
+        for package in ("apps", "core"):
+            for path in sorted((root / package).rglob("*.py")):
+                stat = path.stat()
+                digest.update(
+                    f"{path.relative_to(root)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode()
+                )
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def build_schema():
+    """Generate the OpenAPI document of the API as JSON bytes."""
+    from .schema import generate_schema
+
+    schema = generate_schema()
+    schema[VERSION_KEY] = code_version()
+    return json.dumps(schema, separators=(",", ":")).encode()
+
+
+def get_schema():
+    """
+    Return the OpenAPI document and its ETag. The file at
+    ``OPENAPI_SCHEMA_PATH`` is served when it was built from the running
+    code; otherwise the schema is generated once per code version.
+    """
+    version = code_version()
+    document = _documents.get(version)
+    if document is None:
+        with _lock:
+            document = _documents.get(version)
+            if document is None:
+                body = _read_prebuilt(version) or build_schema()
+                document = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+                _documents[version] = document
+    return document
+
+
+def _read_prebuilt(version):
+    path = settings.OPENAPI_SCHEMA_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        body = f.read()
+    built_for = json.loads(body).get(VERSION_KEY)
+    if built_for != version:
+        logger.warning(
+            "Ignoring %s: built for code version %s, running %s. "
+            "Regenerating the API schema in memory.",
+            path,
+            built_for,
+            version,
+        )
+        return None
+    return body
+
+
+def reset():
+    """Forget the loaded schema, e.g. after a new file was generated."""
+    global _code_version
+    with _lock:
+        _code_version = None
+        _documents.clear()
+
+
+@receiver(setting_changed)
+def reset_on_setting_changed(setting, **kwargs):
+    if setting in ("APP_VERSION", "OPENAPI_SCHEMA_PATH", "SWAGGER_SETTINGS"):
+        reset()
@@ -0,0 +1,129 @@
+"""
+N+1 query detection and slow query logging, for development and tests.
+
+While ``QUERY_INSPECTION`` is on, ``QueryInspectionMiddleware`` collects the
+queries of each request. SELECTs of the same shape, i.e. the same SQL up to
+their parameters and the length of ``IN`` lists, are counted, and a shape
+run ``N_PLUS_ONE_THRESHOLD`` times or more is reported with the line of
+project code that ran it: a warning, or ``NPlusOneError`` when
+``N_PLUS_ONE_ACTION`` is "raise". Any query taking ``SLOW_QUERY_MS`` or
+longer is logged with its origin as it happens.
+
+Code that repeats a query per row on purpose, such as a bulk upload
+validating each row, can run inside ``allow_repeated_queries()``.
+"""
+
+import logging
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import timing
+
+logger = logging.getLogger(__name__)
+
+_queries = ContextVar("request_queries", default=None)
+
+_IN_LIST = re.compile(r"IN \(%s(?:, %s)*\)")
+_PROJECT_ROOT = f"{Path(__file__).resolve().parent.parent}/"
+_SOURCE_DIRS = tuple(f"{_PROJECT_ROOT}{package}/" for package in ("apps", "core"))
+# Frames of the query and request plumbing say nothing about the origin
+_SKIPPED_FILES = {
+    __file__,
+    timing.__file__,
+    str(Path(__file__).with_name("middleware.py")),
+}
+
+
+class NPlusOneError(Exception):
+    """A request ran the same query once per row."""
+
+
+class RequestQueries:
+    """Counts of the SELECT shapes run by one request."""
+
+    def __init__(self):
+        self.counts = {}
+        self.origins = {}
+        self.allowed = False
+
+    def record(self, sql, seconds):
+        if seconds * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(
+                "Slow query (%.1fms) from %s: %s", seconds * 1000, origin(), sql
+            )
+        if self.allowed or not sql.startswith("SELECT"):
+            return
+        shape = _IN_LIST.sub("IN (...)", sql)
+        count = self.counts.get(shape, 0) + 1
+        self.counts[shape] = count
+        if count == settings.N_PLUS_ONE_THRESHOLD:
+            self.origins[shape] = origin()
+
+    def repeated(self):
+        """Return ``(count, origin, shape)`` for each shape past the threshold."""
+        return [
+            (self.counts[shape], origin, shape)
+            for shape, origin in self.origins.items()
+        ]
+
+
+def origin():
+    """Return "path:line in function" of the innermost frame in apps/ or core/."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_SOURCE_DIRS) and filename not in _SKIPPED_FILES:
+            path = filename[len(_PROJECT_ROOT) :]
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def start():
+    """Begin collecting the current request's queries."""
+    queries = RequestQueries()
+    return queries, _queries.set(queries)
+
+
+def finish(token):
+    _queries.reset(token)
+
+
+@contextmanager
+def allow_repeated_queries():
+    """Leave the queries run in the block out of N+1 detection."""
+    queries = _queries.get()
+    if queries is None or queries.allowed:
+        yield
+        return
+    queries.allowed = True
+    try:
+        yield
+    finally:
+        queries.allowed = False
+
+
+def inspect_query(execute, sql, params, many, context):
+    """Execute wrapper recording each query of the current request."""
+    queries = _queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.record(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def install_query_inspection(connection, **kwargs):
+    if settings.QUERY_INSPECTION and inspect_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(inspect_query)
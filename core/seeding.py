@@ -0,0 +1,95 @@
+"""
+Helpers for the seed commands, which load large generated datasets.
+
+Rows are written in batches, each in its own transaction: through ``COPY``
+on PostgreSQL, and ``bulk_create`` elsewhere. Rows conflicting with existing
+ones are skipped. Generated data is drawn from a ``random.Random`` the
+command seeds, so the same seed yields the same rows, primary keys included,
+and running a command again with the same seed adds nothing.
+"""
+
+import itertools
+import uuid
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+
+def seeded_uuid(rng):
+    """Return a version 4 UUID drawn from ``rng`` rather than the OS."""
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+
+def insert_rows(model, rows, batch_size=10_000, progress=None, committed=None):
+    """
+    Insert ``rows``, dicts of field attnames to values, in batches of
+    ``batch_size``, skipping those that conflict with existing rows. Fields
+    a row leaves out take their defaults, called per row when callable, and
+    ``auto_now``/``auto_now_add`` fields the current time. ``progress`` is
+    called with the running total after each batch, and ``committed`` with
+    the rows of each batch once they are committed. Returns the number of
+    rows inserted.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    fields = model._meta.concrete_fields
+    now = timezone.now()
+    defaults, per_row = {}, []
+    for field in fields:
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+            defaults[field.attname] = now
+        elif field.has_default() and callable(field.default):
+            per_row.append(field)
+        else:
+            defaults[field.attname] = field.get_default()
+
+    def complete(row):
+        for field in per_row:
+            if field.attname not in row:
+                row[field.attname] = field.get_default()
+        return {**defaults, **row}
+
+    total = inserted = 0
+    for batch in batched(map(complete, rows), batch_size):
+        with transaction.atomic(using=using):
+            if connection.vendor == "postgresql":
+                inserted += _copy(connection, model, fields, batch)
+            else:
+                existing = model.objects.using(using).count()
+                model.objects.using(using).bulk_create(
+                    [model(**row) for row in batch], ignore_conflicts=True
+                )
+                inserted += model.objects.using(using).count() - existing
+        total += len(batch)
+        if committed:
+            committed(batch)
+        if progress:
+            progress(total)
+    return inserted
+
+
+def _copy(connection, model, fields, batch):
+    # COPY has no ON CONFLICT; stage the batch in a table dropped on commit
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    staging = quote(f"seed_{model._meta.db_table}")
+    columns = ", ".join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) "
+            "ON COMMIT DROP"
+        )
+        with cursor.copy(f"COPY {staging} ({columns}) FROM STDIN") as copy:
+            for row in batch:
+                copy.write_row([row[field.attname] for field in fields])
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+            "ON CONFLICT DO NOTHING"
+        )
+        return cursor.rowcount
@@ -19,8 +19,13 @@ if ENV == "production":
 elif ENV == "testing":
     from .testing import DATABASES as DATABASES
     from .testing import LOGGING as LOGGING
+    from .testing import METRICS_DIR as METRICS_DIR
+    from .testing import N_PLUS_ONE_ACTION as N_PLUS_ONE_ACTION
+    from .testing import QUERY_INSPECTION as QUERY_INSPECTION
 else:
     # Default to development
     from .development import CORS_ALLOW_ALL_ORIGINS as CORS_ALLOW_ALL_ORIGINS
     from .development import DEBUG as DEBUG
     from .development import LOGGING as LOGGING
+    from .development import QUERY_INSPECTION as QUERY_INSPECTION
+    from .development import SERVER_TIMING_HEADER as SERVER_TIMING_HEADER
@@ -1,4 +1,6 @@
+import copy
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -10,17 +12,87 @@ ALLOWED_HOSTS = hosts.split(",") if hosts else []
 
 DEBUG = True
 
+DB_ENGINE = os.getenv("DB_ENGINE", "django.db.backends.postgresql")
+# psycopg3 connection pool per worker process (PostgreSQL only). Size it so that
+# workers * DB_POOL_MAX_SIZE stays below the server's max_connections.
+DB_POOL = (
+    os.getenv("DB_POOL", "true").lower() == "true"
+    and DB_ENGINE == "django.db.backends.postgresql"
+)
+DB_POOL_OPTIONS = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+    # Seconds a request waits for a free connection before failing
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    # Seconds before idle connections above min_size are closed
+    "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+    # Seconds before a connection is replaced, spreading server-side memory growth
+    "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+}
+if DB_POOL:
+    from psycopg_pool import ConnectionPool
+
+    # Test each connection as it leaves the pool, replacing ones the server
+    # or a proxy closed while they sat idle
+    DB_POOL_OPTIONS["check"] = ConnectionPool.check_connection
+
 DATABASES = {
     "default": {
-        "ENGINE": os.getenv("DB_ENGINE", "django.db.backends.postgresql"),
+        "ENGINE": DB_ENGINE,
         "NAME": os.getenv("DB_NAME", "ecommerce_db"),
         "USER": os.getenv("DB_USER", "postgres"),
         "PASSWORD": os.getenv("DB_PASSWORD", ""),
         "HOST": os.getenv("DB_HOST", "localhost"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        # Pooled connections are reused by the pool, not by CONN_MAX_AGE
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        # Persistent connections are checked before reuse; the pool checks its own
+        "CONN_HEALTH_CHECKS": not DB_POOL,
+        "OPTIONS": {"pool": DB_POOL_OPTIONS} if DB_POOL else {},
     }
 }
 
+# Read replicas as comma-separated host[:port] entries, e.g. "replica1,replica2:5433".
+# They share the primary's name and credentials and are exposed as replica_<n>.
+REPLICA_DATABASES = []
+for _index, _replica in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    _host, _, _port = _replica.strip().partition(":")
+    DATABASES[f"replica_{_index}"] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": _host,
+        "PORT": _port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(f"replica_{_index}")
+
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+# Seconds a user's reads stay on the primary after they write, recorded in
+# the REPLICA_PIN_CACHE cache, which must be shared by the workers (REDIS_URL)
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "10"))
+REPLICA_PIN_CACHE = "default"
+# Replicas further behind than this are skipped until they catch up. Lag is
+# measured in the background; a worker's first request waits for it at most
+# REPLICA_LAG_CHECK_TIMEOUT seconds, reading the primary meanwhile.
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
+REPLICA_LAG_CHECK_TIMEOUT = float(os.getenv("REPLICA_LAG_CHECK_TIMEOUT", "0.5"))
+
+# Redis (REDIS_URL, needs the redis package) shares the cache between
+# workers and hosts; the default in-memory cache is per worker process.
+REDIS_URL = os.getenv("REDIS_URL", "")
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+        if REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+
 INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
@@ -35,11 +107,14 @@ INSTALLED_APPS = [
     "drf_yasg",
     "corsheaders",
     # local apps
+    "core",
     "apps.users",
     "apps.catalog",
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestTimingMiddleware",
+    "core.middleware.QueryInspectionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -48,6 +123,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -84,6 +160,41 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Set PASSWORD_HASHER=argon2 to hash new passwords with Argon2 (requires
+# argon2-cffi). Existing PBKDF2 hashes are upgraded on each user's next login.
+_pbkdf2_hashers = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+if os.getenv("PASSWORD_HASHER", "pbkdf2").lower() == "argon2":
+    PASSWORD_HASHERS = [
+        "apps.users.hashers.TunedArgon2PasswordHasher",
+        *_pbkdf2_hashers,
+    ]
+else:
+    PASSWORD_HASHERS = [
+        *_pbkdf2_hashers,
+        "apps.users.hashers.TunedArgon2PasswordHasher",
+    ]
+
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "19456"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
+# Threads verifying passwords for the async login view
+LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Serve /api/auth/login/ from the async view (use under ASGI)
+ASYNC_LOGIN = os.getenv("ASYNC_LOGIN", "false").lower() == "true"
+# Serve catalog list/retrieve from native async views (use under ASGI)
+ASYNC_CATALOG = os.getenv("ASYNC_CATALOG", "false").lower() == "true"
+
+# Processes hashing passwords during a bulk user import
+USER_IMPORT_HASH_WORKERS = int(
+    os.getenv("USER_IMPORT_HASH_WORKERS", str(os.cpu_count() or 1))
+)
+# Rows per uniqueness lookup and per bulk_create during a user import
+USER_IMPORT_BATCH_SIZE = int(os.getenv("USER_IMPORT_BATCH_SIZE", "500"))
+
 LANGUAGE_CODE = "en-us"
 
 TIME_ZONE = "UTC"
@@ -101,7 +212,11 @@ AUTH_USER_MODEL = "users.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.ClaimsJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.timing.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
 }
 
@@ -110,7 +225,71 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "SIGNING_KEY": SECRET_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),  # "Bearer <Token>"
+    "TOKEN_OBTAIN_SERIALIZER": "apps.users.serializers.UserTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.users.serializers.UserTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "apps.users.serializers.UserTokenVerifySerializer",
+    "AUTH_TOKEN_CLASSES": ("apps.users.tokens.UserAccessToken",),
 }
+# Token signing: HS256 with SIGNING_KEY, or RS256/EdDSA with the private keys
+# in JWT_KEYS_DIR, whose public halves are published at /.well-known/jwks.json
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", str(BASE_DIR / "keys"))
+# kid of the key signing new tokens (defaults to the last kid in sort order
+# among the keys older than JWT_KEY_ACTIVATION_SECONDS)
+JWT_ACTIVE_KEY_ID = os.getenv("JWT_ACTIVE_KEY_ID", "")
+# Seconds other services may cache the JWKS response
+JWKS_CACHE_SECONDS = int(os.getenv("JWKS_CACHE_SECONDS", "300"))
+# Seconds a new key is only published before it signs, so cached key sets
+# have picked it up
+JWT_KEY_ACTIVATION_SECONDS = int(
+    os.getenv("JWT_KEY_ACTIVATION_SECONDS", str(JWKS_CACHE_SECONDS))
+)
+# Seconds a user row loaded by ClaimsJWTAuthentication is reused (0 disables)
+JWT_USER_CACHE_TTL = int(os.getenv("JWT_USER_CACHE_TTL", "0"))
+# Max seconds before a worker sees tokens blacklisted by other workers
+TOKEN_BLACKLIST_SYNC_INTERVAL = float(os.getenv("TOKEN_BLACKLIST_SYNC_INTERVAL", "2"))
+# Batch the outstanding token and last_login writes of logins
+TOKEN_WRITE_BUFFER_ENABLED = (
+    os.getenv("TOKEN_WRITE_BUFFER_ENABLED", "false").lower() == "true"
+)
+# Pending rows that trigger a flush, and seconds between background flushes
+TOKEN_WRITE_BUFFER_SIZE = int(os.getenv("TOKEN_WRITE_BUFFER_SIZE", "500"))
+TOKEN_WRITE_BUFFER_INTERVAL = float(os.getenv("TOKEN_WRITE_BUFFER_INTERVAL", "1"))
+# Rows kept for retry while flushes fail; older tokens are dropped beyond it
+TOKEN_WRITE_BUFFER_MAX_PENDING = int(
+    os.getenv("TOKEN_WRITE_BUFFER_MAX_PENDING", "10000")
+)
+# Time each request's database queries, serialization and rendering, and log
+# them to core.access
+REQUEST_TIMING = os.getenv("REQUEST_TIMING", "true").lower() == "true"
+# Also send the timings to clients in a Server-Timing header. They tell anyone
+# how long queries take, so this is only on by default in development.
+SERVER_TIMING_HEADER = False
+# Report SELECTs a request repeats N_PLUS_ONE_THRESHOLD times or more ("warn"
+# or "raise"), and log queries slower than SLOW_QUERY_MS. Enabled by the
+# development and testing settings.
+QUERY_INSPECTION = False
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+N_PLUS_ONE_ACTION = "warn"
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "100"))
+# Request, database, image and bulk upload metrics, shared by the workers
+# through files in METRICS_DIR (best on a tmpfs such as /dev/shm)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_DIR = os.getenv(
+    "METRICS_DIR",
+    (
+        "/dev/shm/ecommerce-metrics"
+        if os.path.isdir("/dev/shm")
+        else os.path.join(tempfile.gettempdir(), "ecommerce-metrics")
+    ),
+)
+# Bearer token required by /internal/metrics/ (unset disables the endpoint)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Loggers hand records to a background thread that formats and writes them
+LOGGING_CONFIG = "core.log_queue.configure_logging"
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "true").lower() == "true"
+# Records waiting to be written; further records are dropped and counted
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 # Swagger / drf-yasg settings
 SWAGGER_USE_COMPAT_RENDERERS = False
 SWAGGER_SETTINGS = {
@@ -121,7 +300,19 @@ SWAGGER_SETTINGS = {
             "in": "header",
         }
     },
+    # Applies the view documentation deferred by core.openapi.swagger_schema
+    "DEFAULT_GENERATOR_CLASS": "core.schema.SchemaGenerator",
+    "DEFAULT_INFO": "core.schema.API_INFO",
+    # The pages load the prebuilt schema instead of generating it
+    "SPEC_URL": "openapi-schema",
 }
+REDOC_SETTINGS = {"SPEC_URL": "openapi-schema"}
+# Schema written by `manage.py generate_openapi_schema`, served while it
+# matches APP_VERSION; otherwise the schema is generated once in memory
+OPENAPI_SCHEMA_PATH = os.getenv("OPENAPI_SCHEMA_PATH", str(BASE_DIR / "openapi.json"))
+OPENAPI_CACHE_SECONDS = int(os.getenv("OPENAPI_CACHE_SECONDS", "300"))
+# Release identifier such as the git commit (defaults to a source fingerprint)
+APP_VERSION = os.getenv("APP_VERSION", "")
 
 # Media files (Uploaded files)
 MEDIA_URL = "/media/"
@@ -131,6 +322,9 @@ MEDIA_ROOT = BASE_DIR / "media"
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 
+# Orphaned media files are removed in batches by a background thread
+FILE_DELETION_BATCH_SIZE = int(os.getenv("FILE_DELETION_BATCH_SIZE", 100))
+
 # CORS configuration
 _cors_env = os.getenv("CORS_ALLOWED_ORIGINS", "")
 CORS_ALLOWED_ORIGINS = [o.strip() for o in _cors_env.split(",") if o.strip()]
@@ -10,3 +10,9 @@ if os.getenv("DEBUG_LOGGING", "false").lower() == "true":
     LOGGING["handlers"]["console"]["formatter"] = "detailed"
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Warn about N+1 queries and slow queries (see core.query_inspection)
+QUERY_INSPECTION = os.getenv("QUERY_INSPECTION", "true").lower() == "true"
+
+# Show the request timings in the browser's network panel
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "true").lower() == "true"
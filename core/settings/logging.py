@@ -21,9 +21,34 @@ def get_apps_log_level():
     return os.getenv("APPS_LOG_LEVEL", get_log_level()).upper()
 
 
+# Share of per-request INFO events kept, e.g. 0.01 keeps one in a hundred
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+# Failed-request records (django.request) kept per second (0 keeps all)
+LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "10"))
+LOG_RATE_BURST = int(os.getenv("LOG_RATE_BURST", "50"))
+# Seconds between "Suppressed N similar events" summaries of an event
+LOG_SUMMARY_INTERVAL = int(os.getenv("LOG_SUMMARY_INTERVAL", "60"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "filters": {
+        "sample_per_request_events": {
+            "()": "core.log_filters.SamplingFilter",
+            "rate": LOG_SAMPLE_RATE,
+            "messages": [
+                "Product list viewed.",
+                "User %s fetching their profile.",
+            ],
+            "summary_interval": LOG_SUMMARY_INTERVAL,
+        },
+        "rate_limit_client_errors": {
+            "()": "core.log_filters.RateLimitFilter",
+            "rate": LOG_RATE_LIMIT,
+            "burst": LOG_RATE_BURST,
+            "summary_interval": LOG_SUMMARY_INTERVAL,
+        },
+    },
     "formatters": {
         "json_formatter": {
             "class": "pythonjsonlogger.json.JsonFormatter",
@@ -55,6 +80,17 @@ LOGGING = {
             "level": get_apps_log_level(),
             "propagate": True,
         },
+        "core": {
+            "handlers": ["console"],
+            "level": get_apps_log_level(),
+            "propagate": True,
+        },
+        # Filters apply to records logged on these loggers themselves, which
+        # then propagate to the handlers above
+        "apps.catalog.views": {"filters": ["sample_per_request_events"]},
+        "apps.users.views": {"filters": ["sample_per_request_events"]},
+        # One warning per 4xx and one error per 5xx response
+        "django.request": {"filters": ["rate_limit_client_errors"]},
         # logger for third-party packages
         "urllib3": {
             "handlers": ["console"],
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from .base import BASE_DIR
 from .logging import LOGGING
@@ -9,9 +10,28 @@ DATABASES = {
         "NAME": os.path.join(
             BASE_DIR, f"{os.getenv('TEST_DB_NAME', 'test_db')}.sqlite3"
         ),
-    }
+    },
+    # Separate database standing in for a read replica. Routing to it is off
+    # unless a test sets REPLICA_DATABASES.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(
+            BASE_DIR, f"{os.getenv('TEST_DB_NAME', 'test_db')}_replica.sqlite3"
+        ),
+    },
 }
 
+# Each test run records metrics into its own directory, away from a server's
+METRICS_DIR = os.getenv(
+    "METRICS_DIR",
+    os.path.join(tempfile.gettempdir(), f"ecommerce-metrics-{os.getpid()}"),
+)
+
+# A request repeating a query per row fails the test that made it. Servers
+# started by the load benchmarks turn it off to measure production code paths.
+QUERY_INSPECTION = os.getenv("QUERY_INSPECTION", "true").lower() == "true"
+N_PLUS_ONE_ACTION = "raise"
+
 if os.getenv("ENABLE_TEST_LOGGING", "false").lower() == "false":
     LOGGING["handlers"]["console"]["class"] = "logging.NullHandler"
 else:
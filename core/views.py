@@ -1,5 +1,80 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from . import metrics
+from .db import pool_stats
+from .openapi import get_schema
 
 
 def landing_page(request):
     return render(request, "core/landing_page.html")
+
+
+@require_GET
+@condition(etag_func=lambda request: get_schema()[1])
+def openapi_schema(request):
+    """
+    Serve the OpenAPI document loaded by the documentation pages. It is
+    built once per release, and the response is cacheable and revalidated
+    with its ETag.
+    """
+    body, _ = get_schema()
+    response = HttpResponse(body, content_type="application/json")
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_CACHE_SECONDS)
+    return response
+
+
+# The documentation pages load drf_yasg, so it is imported on first use. Old
+# links asking a page for ?format=openapi get the prebuilt document.
+def swagger_ui(request, *args, **kwargs):
+    if request.GET.get("format") == "openapi":
+        return openapi_schema(request)
+    from .schema import swagger_ui
+
+    return swagger_ui(request, *args, **kwargs)
+
+
+def redoc_ui(request, *args, **kwargs):
+    if request.GET.get("format") == "openapi":
+        return openapi_schema(request)
+    from .schema import redoc_ui
+
+    return redoc_ui(request, *args, **kwargs)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def db_pool_stats(request):
+    """
+    Connection pool statistics of the worker process serving the request,
+    including how many requests waited for a connection and for how long.
+    """
+    return Response({"pid": os.getpid(), "pools": pool_stats()})
+
+
+@require_GET
+def prometheus_metrics(request):
+    """
+    Metrics of all worker processes in the Prometheus text format, for
+    scrapers sending ``Authorization: Bearer <METRICS_TOKEN>``. Without a
+    configured token the endpoint does not exist.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    expected = f"Bearer {token}".encode()
+    supplied = request.headers.get("Authorization", "").encode()
+    if not hmac.compare_digest(supplied, expected):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+    return HttpResponse(
+        metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,226 @@
+"""
+Gunicorn configuration for the production server.
+
+    gunicorn -c gunicorn.conf.py
+
+The application is imported once in the master and shared with the workers
+copy-on-write, along with the token blacklist filter the master keeps
+current. Garbage collection stays off while the application loads and
+everything allocated is frozen before each fork, so that collections in
+the workers never write to (and thereby copy) the shared pages. Each worker
+then opens its database connection and fills its caches before it accepts
+requests.
+Worker and thread counts follow from the CPUs and memory available to the
+container unless set explicitly.
+"""
+
+import gc
+import math
+import os
+import time
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def available_cpus():
+    """Return the CPUs this process may use, honouring a cgroup CPU quota."""
+    cpus = len(os.sched_getaffinity(0))
+    quota = (_read("/sys/fs/cgroup/cpu.max") or "max").split()
+    if quota[0] != "max":
+        cpus = min(cpus, math.ceil(int(quota[0]) / int(quota[1])))
+    return max(cpus, 1)
+
+
+def available_memory():
+    """Return the bytes of memory available to the container."""
+    memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    for path in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        limit = _read(path)
+        if limit and limit.isdigit():
+            memory = min(memory, int(limit))
+    return memory
+
+
+def size_workers(cpus, memory, worker_memory, asgi):
+    """
+    Return ``(workers, threads)`` for the given CPUs and memory in bytes.
+
+    Sync deployments aim for 2 x CPUs + 1 workers, and event-loop (ASGI)
+    workers for one per CPU, but never more than fit in memory with
+    ``worker_memory`` bytes each. Threads make up for workers that did not
+    fit, so a sync deployment still serves about four requests per CPU.
+    """
+    wanted = cpus if asgi else 2 * cpus + 1
+    workers = max(min(wanted, memory // worker_memory), 1)
+    threads = 1 if asgi else max(math.ceil(4 * cpus / workers), 1)
+    return workers, threads
+
+
+def process_memory(pid="self"):
+    """
+    Return the resident, shared and private memory of a process in MiB.
+    Private memory is what each additional worker really costs.
+    """
+    rollup = _read(f"/proc/{pid}/smaps_rollup") or ""
+    fields = {}
+    for line in rollup.splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0]) / 1024
+    return {
+        "rss_mb": round(fields.get("Rss", 0), 1),
+        "pss_mb": round(fields.get("Pss", 0), 1),
+        "shared_mb": round(
+            fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0), 1
+        ),
+        "private_mb": round(
+            fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0), 1
+        ),
+    }
+
+
+# Use uvicorn workers on core.asgi instead of sync workers on core.wsgi
+asgi = os.getenv("ASGI_SERVER", "false").lower() == "true"
+# Memory budgeted per worker when sizing from the container's memory
+worker_memory = int(os.getenv("GUNICORN_WORKER_MEMORY_MB", "200")) * 2**20
+default_workers, default_threads = size_workers(
+    available_cpus(), available_memory(), worker_memory, asgi
+)
+
+wsgi_app = "core.asgi:application" if asgi else "core.wsgi:application"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", str(default_workers)))
+threads = int(os.getenv("GUNICORN_THREADS", str(default_threads)))
+if asgi:
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    worker_class = "gthread" if threads > 1 else "sync"
+
+# Load the application in the master so workers share its memory
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+# Freeze the preloaded objects out of the workers' garbage collections
+gc_freeze = preload_app and os.getenv("GUNICORN_GC_FREEZE", "true").lower() == "true"
+
+# Restart each worker after this many requests, staggered by the jitter so
+# that the workers do not all restart at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(
+    os.getenv("GUNICORN_MAX_REQUESTS_JITTER", str(max_requests // 10))
+)
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Heartbeat files on tmpfs, so a slow disk cannot get workers killed
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+if gc_freeze:
+    # Collections during the preload would free objects in pages the
+    # workers go on to share; collection restarts in each worker.
+    gc.disable()
+
+
+def on_starting(server):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import core.metrics
+
+    # Workers of a previous run may have left files with the same pids
+    core.metrics.clear_directory()
+
+
+def when_ready(server):
+    if gc_freeze:
+        # The preload is done; pre_fork freezes what the master allocates later
+        gc.enable()
+    memory = process_memory()
+    server.log.info(
+        f"Serving {wsgi_app} with {workers} {worker_class} workers x {threads} "
+        f"threads (preload={preload_app}, gc_freeze={gc_freeze}); "
+        f"master rss={memory['rss_mb']}MiB"
+    )
+
+
+def pre_fork(server, worker):
+    if not preload_app:
+        return
+    import core.db
+    from apps.users.blacklist import blacklist_filter
+
+    # Loaded once here rather than by every worker, including those that
+    # replace workers recycled after max_requests
+    blacklist_filter.sync()
+    # Pools and connections opened in the master stay with the master
+    core.db.close_pools()
+    if gc_freeze:
+        gc.collect()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if gc_freeze:
+        gc.enable()
+    if preload_app:
+        import core.log_queue
+
+        # The master's log listener thread does not survive the fork
+        core.log_queue.start_in_worker()
+
+
+def post_worker_init(worker):
+    """Warm the worker before it accepts its first request."""
+    started = time.perf_counter()
+    try:
+        warm_up()
+    except Exception:
+        # A cold worker still serves; it pays these costs on first use
+        worker.log.exception("Worker warm-up failed")
+    memory = process_memory()
+    worker.log.info(
+        f"Worker {worker.pid} ready in {time.perf_counter() - started:.2f}s: "
+        f"rss={memory['rss_mb']}MiB shared={memory['shared_mb']}MiB "
+        f"private={memory['private_mb']}MiB"
+    )
+
+
+def warm_up():
+    from django.db import connection
+    from django.urls import get_resolver
+
+    from apps.users import signing
+    from apps.users.blacklist import blacklist_filter
+
+    # Imports every view module
+    get_resolver().url_patterns  # noqa: B018
+    # Opens the connection, or this process's pool
+    connection.ensure_connection()
+    # Pulls what was blacklisted since the fork, or loads it all without preload
+    blacklist_filter.sync(force=True)
+    # Loads the signing keys and the JWKS document
+    signing.get_jwks()
+    if worker_class != "sync":
+        # Requests run on other threads; only the pool stays warm
+        connection.close()
+
+
+def worker_exit(server, worker):
+    from apps.users.write_buffer import login_write_buffer
+
+    login_write_buffer.flush()
+
+
+def child_exit(server, worker):
+    import core.metrics
+
+    core.metrics.mark_process_dead(worker.pid)
@@ -83,6 +83,8 @@ class URLs(Enum):
 
     USER_LIST = reverse("users:user-list")
     USER_DETAIL = "/api/users/{user_id}/"
+    USER_BULK_IMPORT = reverse("users:user-list") + "bulk-import/"
+    ADMIN_USER_LIST = reverse("users:admin-user-list")
 
     PRODUCT_LIST = reverse("catalog:product-list")
     PRODUCT_DETAIL = "/api/catalog/products/{product_id}/"
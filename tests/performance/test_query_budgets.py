@@ -0,0 +1,275 @@
+"""
+Query budgets of the API endpoints.
+
+Each case below makes one request and counts the database queries it runs.
+The count must equal the budget recorded for the case in
+``query_budgets.json``: more queries is a regression, fewer means the budget
+should be lowered so that it keeps guarding the improvement. After an
+intended change, rewrite the file and review its diff with the change:
+
+    UPDATE_QUERY_BUDGETS=1 pytest tests/performance
+"""
+
+import itertools
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Category
+from apps.users.blacklist import blacklist_filter
+from apps.users.services import issue_token_pair
+from tests.constants import URLs, UserTestData
+
+BASELINE = Path(__file__).with_name("query_budgets.json")
+UPDATE = os.getenv("UPDATE_QUERY_BUDGETS", "false").lower() in ("1", "true")
+
+CASES = {}
+
+
+def case(name):
+    """Register a function preparing a request; it returns the request to count."""
+
+    def register(prepare):
+        CASES[name] = prepare
+        return prepare
+
+    return register
+
+
+def bearer_client(user):
+    client = APIClient()
+    access = issue_token_pair(user)["access"]
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+def csv_file(name, header, rows):
+    content = "\n".join([header, *rows]).encode()
+    return SimpleUploadedFile(name, content, "text/csv")
+
+
+# Product list: every combination of category filter, ordering and search
+ORDERINGS = ["", "price", "-price", "name", "-name", "created_at", "-created_at"]
+for with_category, ordering, with_search in itertools.product(
+    (False, True), ORDERINGS, (False, True)
+):
+    query = {
+        "category": with_category and "category__id",
+        "ordering": ordering and f"ordering={ordering}",
+        "search": with_search and "search=Product 1",
+    }
+    name = "product-list" + "".join(f"[{part}]" for part in query.values() if part)
+
+    @case(name)
+    def product_list(env, with_category=with_category, query=query):
+        params = [query["ordering"], query["search"]]
+        if with_category:
+            params.append(f"category__id={env.products[0].category_id}")
+        path = "?".join([URLs.PRODUCT_LIST.value, "&".join(p for p in params if p)])
+        return lambda: env.anonymous.get(path.rstrip("?"))
+
+
+@case("product-list[page=2]")
+def product_list_page(env):
+    return lambda: env.anonymous.get(URLs.PRODUCT_LIST.value, {"page": 2})
+
+
+@case("product-detail")
+def product_detail(env):
+    path = URLs.PRODUCT_DETAIL.value.format(product_id=env.products[0].id)
+    return lambda: env.anonymous.get(path)
+
+
+def product_data(env, **extra):
+    return {
+        "name": "Budget product",
+        "description": "Counted",
+        "price": "9.99",
+        "stock_quantity": 3,
+        "category_id": str(env.products[0].category_id),
+        **extra,
+    }
+
+
+@case("product-create")
+def product_create(env):
+    return lambda: env.admin.post(URLs.PRODUCT_LIST.value, product_data(env))
+
+
+@case("product-create[image]")
+def product_create_image(env):
+    data = product_data(env, image=env.image())
+    return lambda: env.admin.post(URLs.PRODUCT_LIST.value, data, format="multipart")
+
+
+@case("product-update")
+def product_update(env):
+    path = URLs.PRODUCT_DETAIL.value.format(product_id=env.products[0].id)
+    return lambda: env.admin.patch(path, {"price": "12.50"})
+
+
+@case("product-update[image]")
+def product_update_image(env):
+    path = URLs.PRODUCT_DETAIL.value.format(product_id=env.products[0].id)
+    data = {"image": env.image()}
+    return lambda: env.admin.patch(path, data, format="multipart")
+
+
+@case("product-delete")
+def product_delete(env):
+    path = URLs.PRODUCT_DETAIL.value.format(product_id=env.products[0].id)
+    return lambda: env.admin.delete(path)
+
+
+@case("category-list")
+def category_list(env):
+    return lambda: env.anonymous.get(URLs.CATEGORY_LIST.value)
+
+
+@case("category-detail")
+def category_detail(env):
+    path = URLs.CATEGORY_DETAIL.value.format(category_id=env.products[0].category_id)
+    return lambda: env.anonymous.get(path)
+
+
+@case("category-create")
+def category_create(env):
+    data = {"name": "Budget category", "description": "Counted"}
+    return lambda: env.admin.post(URLs.CATEGORY_LIST.value, data)
+
+
+@case("category-update")
+def category_update(env):
+    path = URLs.CATEGORY_DETAIL.value.format(category_id=env.products[0].category_id)
+    return lambda: env.admin.patch(path, {"description": "Updated"})
+
+
+@case("category-delete")
+def category_delete(env):
+    # Categories still holding products cannot be deleted
+    category = Category.objects.create(name="Empty category")
+    path = URLs.CATEGORY_DETAIL.value.format(category_id=category.id)
+    return lambda: env.admin.delete(path)
+
+
+for rows in (1, 10, 50):
+
+    @case(f"category-bulk-upload[{rows}]")
+    def category_bulk_upload(env, rows=rows):
+        upload = csv_file(
+            "categories.csv",
+            "name,description",
+            [f"Uploaded {i},Row {i}" for i in range(rows)],
+        )
+        return lambda: env.admin.post(
+            URLs.CATEGORY_BULK_UPLOAD_URL.value, {"file": upload}, format="multipart"
+        )
+
+    @case(f"user-bulk-import[{rows}]")
+    def user_bulk_import(env, rows=rows):
+        upload = csv_file(
+            "users.csv",
+            "email,username,password",
+            [f"import{i}@example.com,import{i},ImportPass{i}!" for i in range(rows)],
+        )
+        return lambda: env.admin.post(
+            URLs.USER_BULK_IMPORT.value, {"file": upload}, format="multipart"
+        )
+
+
+@case("register")
+def register(env):
+    data = {
+        "username": "budget",
+        "email": "budget@example.com",
+        "password": "BudgetPass123!",
+    }
+    return lambda: env.anonymous.post(reverse("users:register"), data)
+
+
+@case("login")
+def login(env):
+    data = {
+        "email": UserTestData.DEFAULT_EMAIL.value,
+        "password": UserTestData.DEFAULT_PASSWORD.value,
+    }
+    return lambda: env.anonymous.post(reverse("login"), data)
+
+
+@case("logout")
+def logout(env):
+    refresh = issue_token_pair(env.user)["refresh"]
+    return lambda: env.user_client.post(reverse("logout"), {"refresh": refresh})
+
+
+@pytest.fixture(scope="module")
+def observed():
+    """Collects the counts, and rewrites the baseline with them when updating."""
+    counts = {}
+    yield counts
+    if UPDATE and counts:
+        budgets = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        budgets.update(counts)
+        BASELINE.write_text(json.dumps(dict(sorted(budgets.items())), indent=2) + "\n")
+
+
+@pytest.fixture(autouse=True)
+def fast_password_hashing(settings):
+    """Hashing cost does not change the queries; keep the user imports quick."""
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+@pytest.fixture
+def env(
+    settings,
+    api_client,
+    admin_user,
+    default_user,
+    create_products,
+    test_image,
+    temp_media_root,
+):
+    # Count requests against a loaded token blacklist filter, as in a warm
+    # worker, rather than its one-off load or periodic sync
+    settings.TOKEN_BLACKLIST_SYNC_INTERVAL = 3600
+    blacklist_filter.reset()
+    blacklist_filter.sync()
+    yield SimpleNamespace(
+        anonymous=api_client,
+        admin=bearer_client(admin_user),
+        user=default_user,
+        user_client=bearer_client(default_user),
+        products=create_products(20),
+        image=test_image,
+    )
+    blacklist_filter.reset()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", CASES)
+def test_query_budget(name, env, observed):
+    """Test the request runs exactly the queries budgeted for it."""
+    request = CASES[name](env)
+    with CaptureQueriesContext(connection) as queries:
+        response = request()
+    assert response.status_code < 400, response.content
+
+    count = len(queries)
+    observed[name] = count
+    if UPDATE:
+        return
+    budgets = json.loads(BASELINE.read_text())
+    assert name in budgets, f"No budget for {name}; run with UPDATE_QUERY_BUDGETS=1"
+    sql = "\n".join(query["sql"] for query in queries.captured_queries)
+    assert count == budgets[name], (
+        f"{name} ran {count} queries, budget is {budgets[name]}. If intended, "
+        f"run with UPDATE_QUERY_BUDGETS=1 and review the diff.\n{sql}"
+    )
@@ -0,0 +1,131 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from django.db import connection, connections
+from django.db.backends.postgresql.base import DatabaseWrapper
+from django.urls import reverse
+from rest_framework import status
+
+from core import db
+
+
+class FakePool:
+    """Stands in for a psycopg pool opened before a fork."""
+
+    closed = False
+
+    def get_stats(self):
+        return {"requests_num": 4, "requests_wait_ms": 10, "requests_waiting": 0}
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_pool():
+    pool = FakePool()
+    DatabaseWrapper._connection_pools["fake"] = pool
+    yield pool
+    DatabaseWrapper._connection_pools.pop("fake", None)
+
+
+def test_pool_stats_reports_average_wait(fake_pool):
+    """Test pool statistics include the average time spent waiting."""
+    stats = db.pool_stats()
+
+    assert stats["fake"]["avg_wait_ms"] == 2.5
+
+
+def test_forked_child_drops_inherited_pools(fake_pool):
+    """Test a forked child forgets the parent's pools without closing them."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        dropped = "fake" not in db._pools() and fake_pool in db._inherited
+        os.write(write_fd, b"1" if dropped and not fake_pool.closed else b"0")
+        os._exit(0)
+
+    os.close(write_fd)
+    result = os.read(read_fd, 1)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert result == b"1"
+    assert db._pools()["fake"] is fake_pool
+
+
+def test_close_pools_closes_every_pool(fake_pool):
+    """Test close_pools closes and forgets the pools of this process."""
+    db.close_pools()
+
+    assert fake_pool.closed
+    assert "fake" not in db._pools()
+
+
+@pytest.mark.django_db
+def test_pool_stats_endpoint_is_admin_only(
+    admin_authenticated_client, authenticated_client_and_user
+):
+    """Test only admins can read the pool statistics."""
+    client, _ = authenticated_client_and_user
+
+    assert client.get(reverse("db-pool-stats")).status_code == status.HTTP_403_FORBIDDEN
+    response = admin_authenticated_client.get(reverse("db-pool-stats"))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["pid"] == os.getpid()
+
+
+def test_pool_checks_connections_before_use():
+    """Test pooled connections are checked by the pool instead of Django."""
+    code = (
+        "from core.settings import base\n"
+        "print(base.DB_POOL_OPTIONS['check'].__qualname__,"
+        " base.DATABASES['default']['CONN_HEALTH_CHECKS'])"
+    )
+    env = {
+        **os.environ,
+        "DB_ENGINE": "django.db.backends.postgresql",
+        "DB_POOL": "true",
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.split() == ["ConnectionPool.check_connection", "False"]
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql"
+    or "pool" not in connection.settings_dict["OPTIONS"],
+    reason="needs a pooled PostgreSQL database",
+)
+@pytest.mark.django_db(transaction=True)
+def test_killed_connection_is_replaced():
+    """Test a pooled connection closed by the server is not handed out again."""
+
+    def backend_pid():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def terminate(pid):
+        # Another thread takes a different connection from the pool
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+        connections["default"].close()
+
+    killed = backend_pid()
+    thread = threading.Thread(target=terminate, args=[killed])
+    thread.start()
+    thread.join()
+    # Hand the dead connection back, as a request finishing would
+    connection.close()
+
+    assert backend_pid() != killed
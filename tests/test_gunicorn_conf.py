@@ -0,0 +1,127 @@
+import gc
+import importlib.util
+import logging
+from pathlib import Path
+
+import pytest
+
+from apps.users.blacklist import blacklist_filter
+from apps.users.write_buffer import login_write_buffer
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+GIB = 2**30
+
+
+@pytest.fixture
+def load_config(monkeypatch):
+    """Return a loader executing gunicorn.conf.py with the given environment."""
+
+    def load(**env):
+        # Loading with the default gc.freeze profile would disable collection
+        monkeypatch.setenv("GUNICORN_GC_FREEZE", "false")
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        spec = importlib.util.spec_from_file_location("gunicorn_conf", CONFIG_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
+
+
+class FakeWorker:
+    pid = 1234
+    log = logging.getLogger("gunicorn.error")
+
+
+class FakeServer:
+    log = logging.getLogger("gunicorn.error")
+
+
+@pytest.mark.parametrize(
+    "cpus, memory, asgi, expected",
+    [
+        (4, 16 * GIB, False, (9, 2)),
+        (4, GIB // 2, False, (2, 8)),
+        (4, 16 * GIB, True, (4, 1)),
+        (2, 100 * 2**20, False, (1, 8)),
+    ],
+    ids=["cpu-bound", "memory-bound", "asgi", "tiny"],
+)
+def test_size_workers(load_config, cpus, memory, asgi, expected):
+    """Test workers follow the CPUs unless memory is short, then threads do."""
+    config = load_config()
+
+    assert config.size_workers(cpus, memory, 200 * 2**20, asgi) == expected
+
+
+def test_environment_overrides_sizing(load_config):
+    """Test explicit settings win and pick the matching worker class."""
+    config = load_config(GUNICORN_WORKERS="3", GUNICORN_THREADS="1")
+    assert (config.workers, config.threads) == (3, 1)
+    assert config.worker_class == "sync"
+    assert config.wsgi_app == "core.wsgi:application"
+    assert config.preload_app is True
+
+    config = load_config(ASGI_SERVER="true")
+    assert config.worker_class == "uvicorn_worker.UvicornWorker"
+    assert config.wsgi_app == "core.asgi:application"
+
+
+def test_max_requests_jitter_defaults_to_a_tenth(load_config):
+    """Test workers are recycled with jitter so they do not restart together."""
+    config = load_config(GUNICORN_MAX_REQUESTS="500")
+
+    assert (config.max_requests, config.max_requests_jitter) == (500, 50)
+
+
+@pytest.mark.django_db
+def test_pre_fork_freezes_preloaded_objects(load_config):
+    """Test the master freezes its heap and re-enables collection in workers."""
+    config = load_config(GUNICORN_GC_FREEZE="true")
+    blacklist_filter.reset()
+    config.pre_fork(None, None)
+    try:
+        assert gc.get_freeze_count() > 0
+        # Workers inherit the filter the master loaded
+        assert blacklist_filter._bloom is not None
+        config.post_fork(None, None)
+        assert gc.isenabled()
+    finally:
+        gc.unfreeze()
+        gc.enable()
+        blacklist_filter.reset()
+
+
+def test_master_collects_again_once_ready(load_config):
+    """Test collection is only off in the master while it preloads."""
+    config = load_config(GUNICORN_GC_FREEZE="true")
+    try:
+        assert not gc.isenabled()
+        config.when_ready(FakeServer())
+        assert gc.isenabled()
+    finally:
+        gc.enable()
+
+
+@pytest.mark.django_db
+def test_post_worker_init_warms_caches(load_config):
+    """Test a worker loads the blacklist filter before taking traffic."""
+    config = load_config(GUNICORN_THREADS="1")
+    blacklist_filter.reset()
+
+    config.post_worker_init(FakeWorker())
+
+    assert blacklist_filter._bloom is not None
+    blacklist_filter.reset()
+
+
+def test_worker_exit_flushes_login_writes(load_config, monkeypatch):
+    """Test buffered login writes are not lost when a worker is recycled."""
+    config = load_config()
+    flushed = []
+    monkeypatch.setattr(login_write_buffer, "flush", lambda: flushed.append(True))
+
+    config.worker_exit(None, FakeWorker())
+
+    assert flushed == [True]
@@ -0,0 +1,45 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from benchmarks.images import (
+    FORMATS,
+    generate,
+    largest_under,
+    memory_unmeasurable,
+    peak_memory_mb,
+)
+
+
+@pytest.mark.parametrize("format_name", FORMATS)
+def test_corpus_is_deterministic(format_name):
+    """Test each corpus image decodes as its format and mode, the same every run."""
+    data = generate(format_name, (64, 48))
+    image = Image.open(BytesIO(data))
+
+    assert data == generate(format_name, (64, 48))
+    assert data != generate(format_name, (64, 48), seed=1)
+    assert (image.format, image.mode) == FORMATS[format_name][:2]
+    assert image.size == (64, 48)
+
+
+def test_largest_image_fits_the_limit():
+    """Test the limit-sized image is close to, and within, the byte limit."""
+    data, (width, height) = largest_under("png", 200_000)
+
+    assert 0.8 * 200_000 < len(data) <= 200_000
+    assert width * 3 == pytest.approx(height * 4, abs=8)
+
+
+@pytest.mark.skipif(bool(memory_unmeasurable()), reason="needs /proc and glibc")
+def test_peak_memory_of_a_failing_child():
+    """Test a measurement that raises fails in the parent, not past the fork."""
+
+    def allocate_then_fail():
+        bytearray(64 * 1024 * 1024)
+        raise MemoryError
+
+    assert peak_memory_mb(lambda: bytearray(64 * 1024 * 1024)) >= 60
+    with pytest.raises(RuntimeError):
+        peak_memory_mb(allocate_then_fail)
@@ -0,0 +1,181 @@
+import logging
+import time
+from logging.handlers import BufferingHandler
+from unittest import mock
+
+import pytest
+
+from core import log_filters
+from core.log_filters import RateLimitFilter, SamplingFilter, flush_summaries
+
+LOGGER = "tests.log_filters"
+
+
+class Clock:
+    """Stands in for time.monotonic, advanced by the test."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with mock.patch("core.log_filters.time.monotonic", clock):
+        yield clock
+
+
+@pytest.fixture
+def log():
+    """Yields a logger writing to a buffer; attach the filter under test."""
+    logger = logging.getLogger(LOGGER)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = BufferingHandler(1000)
+    logger.addHandler(handler)
+    yield logger
+    logger.removeHandler(handler)
+    logger.filters.clear()
+
+
+def messages(logger):
+    return [record.getMessage() for record in logger.handlers[0].buffer]
+
+
+class TestSamplingFilter:
+    """Test records are kept with the configured probability."""
+
+    def test_rate_one_keeps_everything(self, log):
+        """Test the default rate keeps every record."""
+        log.addFilter(SamplingFilter())
+        for i in range(5):
+            log.info("Viewed %s", i)
+        assert len(messages(log)) == 5
+
+    def test_records_are_sampled(self, log):
+        """Test a record is kept when the random draw is below the rate."""
+        log.addFilter(SamplingFilter(rate=0.5))
+        with mock.patch("core.log_filters.random.random", side_effect=[0.2, 0.7]):
+            log.info("Viewed %s", 1)
+            log.info("Viewed %s", 2)
+        assert messages(log) == ["Viewed 1"]
+
+    def test_other_messages_pass(self, log):
+        """Test templates outside ``messages`` are never sampled."""
+        log.addFilter(SamplingFilter(rate=0, messages=["Product list viewed."]))
+        log.info("Product list viewed.")
+        log.info("Product created: %s", "Lamp")
+        assert messages(log) == ["Product created: Lamp"]
+
+
+class TestRateLimitFilter:
+    """Test each event is limited by its own token bucket."""
+
+    def test_burst_then_rate(self, log, clock):
+        """Test a burst is kept, then one record per 1/rate seconds."""
+        log.addFilter(RateLimitFilter(rate=2, burst=3))
+        for _ in range(5):
+            log.warning("Not found: %s", "/a")
+        assert len(messages(log)) == 3
+
+        clock.now += 0.5
+        log.warning("Not found: %s", "/a")
+        log.warning("Not found: %s", "/a")
+        assert len(messages(log)) == 4
+
+    def test_events_are_limited_separately(self, log, clock):
+        """Test exhausting one template's bucket does not affect another."""
+        log.addFilter(RateLimitFilter(rate=1))
+        log.warning("First %s", 1)
+        log.warning("First %s", 2)
+        log.warning("Second %s", 1)
+        assert messages(log) == ["First 1", "Second 1"]
+
+    def test_server_errors_pass_a_client_error_flood(self, log, clock):
+        """Test a 500 is logged while the 401s sharing its template are limited."""
+        log.addFilter(RateLimitFilter(rate=1))
+        for _ in range(3):
+            log.warning("%s: %s", "Unauthorized", "/api/users/me/")
+        log.error("%s: %s", "Internal Server Error", "/api/users/me/")
+        log.info("%s: %s", "Slow request", "/api/users/me/")
+
+        assert messages(log) == [
+            "Unauthorized: /api/users/me/",
+            "Internal Server Error: /api/users/me/",
+            "Slow request: /api/users/me/",
+        ]
+
+    def test_zero_rate_keeps_everything(self, log, clock):
+        """Test a rate of 0 disables limiting."""
+        log.addFilter(RateLimitFilter(rate=0))
+        for _ in range(5):
+            log.warning("Not found")
+        assert len(messages(log)) == 5
+
+
+def test_suppressed_events_are_summarized(log, clock):
+    """Test the count of dropped records is logged once the interval passed."""
+    log.addFilter(RateLimitFilter(rate=1, summary_interval=60))
+    for _ in range(4):
+        log.warning("Not found: %s", "/a")
+
+    clock.now += 30
+    log.warning("Not found: %s", "/a")
+    assert messages(log) == ["Not found: /a", "Not found: /a"]
+
+    clock.now += 31
+    log.warning("Not found: %s", "/a")
+    summary = log.handlers[0].buffer[2]
+    assert summary.getMessage() == (
+        "Suppressed 3 similar events in the last 61s: Not found: %s"
+    )
+    assert summary.suppressed == 3
+    assert summary.levelno == logging.WARNING
+    assert messages(log)[3:] == ["Not found: /a"]
+
+
+def test_stopped_event_is_summarized(log, clock):
+    """Test drops are reported once due even if the event is never logged again."""
+    log.addFilter(RateLimitFilter(rate=1, summary_interval=60))
+    for _ in range(4):
+        log.warning("Not found: %s", "/a")
+
+    clock.now += 30
+    assert flush_summaries(force=False)
+    assert len(messages(log)) == 1
+
+    clock.now += 30
+    assert not flush_summaries(force=False)
+    assert messages(log)[1:] == [
+        "Suppressed 3 similar events in the last 60s: Not found: %s"
+    ]
+
+
+def test_summaries_are_flushed_in_the_background(log, clock, monkeypatch):
+    """Test a background thread logs summaries that come due."""
+    monkeypatch.setattr(log_filters, "FLUSH_INTERVAL", 0.01)
+    log.addFilter(RateLimitFilter(rate=1, summary_interval=60))
+    log.warning("Not found: %s", "/a")
+    log.warning("Not found: %s", "/a")
+    clock.now += 60
+
+    for _ in range(300):
+        if len(messages(log)) == 2:
+            break
+        time.sleep(0.01)
+    assert messages(log)[1].startswith("Suppressed 1 similar events")
+
+
+def test_pending_summaries_are_flushed_when_forced(log, clock):
+    """Test a forced flush, as at exit, reports drops before they are due."""
+    log.addFilter(RateLimitFilter(rate=1, summary_interval=60))
+    log.warning("Not found: %s", "/a")
+    log.warning("Not found: %s", "/a")
+
+    flush_summaries()
+    assert messages(log)[1:] == [
+        "Suppressed 1 similar events in the last 0s: Not found: %s"
+    ]
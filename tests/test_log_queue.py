@@ -0,0 +1,172 @@
+import logging
+import os
+import queue
+import threading
+from logging.handlers import BufferingHandler
+
+import pytest
+from django.conf import settings as django_settings
+
+from core import log_queue as log_queue_module
+from core.log_filters import RateLimitFilter
+from core.log_queue import (
+    QueuedHandler,
+    configure_logging,
+    start_in_worker,
+    stop_listener,
+)
+
+LOGGER = "tests.log_queue"
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "buffer": {"class": "logging.handlers.BufferingHandler", "capacity": 100},
+    },
+    "loggers": {
+        LOGGER: {"handlers": ["buffer"], "level": "INFO", "propagate": False},
+    },
+}
+
+
+class ThreadRecordingArg:
+    """Remembers the thread that rendered it into a message."""
+
+    def __str__(self):
+        self.thread = threading.get_ident()
+        return "arg"
+
+
+@pytest.fixture
+def log(settings):
+    """Configures queued logging for a test logger and restores LOGGING after."""
+    settings.LOG_QUEUE_ENABLED = True
+    configure_logging(LOGGING)
+    yield logging.getLogger(LOGGER)
+    configure_logging(django_settings.LOGGING)
+
+
+def written(logger):
+    """Stop the listener, so every queued record is written, and return them."""
+    stop_listener()
+    (handler,) = logger.handlers[0].handlers
+    return handler.buffer
+
+
+class TestQueuedLogging:
+    """Test log records are queued and written by the listener thread."""
+
+    def test_handlers_are_wrapped(self, log):
+        """Test the configured handlers are replaced by one queued handler."""
+        (handler,) = log.handlers
+        assert isinstance(handler, QueuedHandler)
+        assert isinstance(handler.handlers[0], BufferingHandler)
+
+    def test_records_reach_handlers(self, log):
+        """Test a queued record is written by the original handler."""
+        log.info("Product %s created.", 7)
+
+        (record,) = written(log)
+        assert record.getMessage() == "Product 7 created."
+        assert record.name == LOGGER
+
+    def test_message_is_merged_on_caller_thread(self, log):
+        """Test arguments are rendered before the record is queued."""
+        arg = ThreadRecordingArg()
+        log.info("Value %s", arg)
+
+        (record,) = written(log)
+        assert arg.thread == threading.get_ident()
+        assert (record.msg, record.args) == ("Value arg", None)
+
+    def test_traceback_is_rendered(self, log):
+        """Test the traceback is queued as text rather than as live frames."""
+        try:
+            raise ValueError("bad image")
+        except ValueError:
+            log.exception("Upload failed.")
+
+        (record,) = written(log)
+        assert record.exc_info is None
+        assert "ValueError: bad image" in record.exc_text
+
+    def test_handler_level_is_respected(self, log):
+        """Test the listener skips handlers whose level the record is below."""
+        log.handlers[0].handlers[0].setLevel(logging.WARNING)
+        log.info("Hidden.")
+        log.warning("Shown.")
+
+        assert [r.getMessage() for r in written(log)] == ["Shown."]
+
+    def test_stopping_writes_pending_summaries(self, log):
+        """Test drops not yet summarized are reported before the listener stops."""
+        log.addFilter(RateLimitFilter(rate=1))
+        try:
+            log.info("Viewed %s", 1)
+            log.info("Viewed %s", 2)
+            records = written(log)
+        finally:
+            log.filters.clear()
+
+        assert [r.getMessage() for r in records] == [
+            "Viewed 1",
+            "Suppressed 1 similar events in the last 0s: Viewed %s",
+        ]
+
+    def test_forked_child_writes_directly(self, log):
+        """Test a forked child writes its records without starting a listener."""
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                log.info("From the child.")
+                (handler,) = log.handlers[0].handlers
+                direct = [r.getMessage() for r in handler.buffer]
+                start_in_worker()
+                log.info("Queued.")
+                if (
+                    direct == ["From the child."]
+                    and log_queue_module._listener is not None
+                ):
+                    status = 0
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert written(log) == []
+
+    def test_disabled_keeps_handlers(self, settings):
+        """Test LOG_QUEUE_ENABLED=False leaves logging unchanged."""
+        settings.LOG_QUEUE_ENABLED = False
+        try:
+            configure_logging(LOGGING)
+            (handler,) = logging.getLogger(LOGGER).handlers
+            assert isinstance(handler, BufferingHandler)
+        finally:
+            configure_logging(django_settings.LOGGING)
+
+
+def test_full_queue_drops_and_reports():
+    """Test records are dropped rather than blocking, and the drop is reported."""
+    log_queue = queue.Queue(2)
+    handler = QueuedHandler(log_queue, ())
+    logger = logging.getLogger(f"{LOGGER}.full")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(3):
+            logger.warning("Record %s", i)
+        assert handler.dropped == 1
+
+        log_queue.get_nowait(), log_queue.get_nowait()
+        logger.warning("After drain")
+
+        messages = [log_queue.get_nowait()[0].getMessage() for _ in range(2)]
+        assert messages == [
+            "Dropped 1 log records because the log queue was full.",
+            "After drain",
+        ]
+        assert handler.dropped == 0
+    finally:
+        logger.removeHandler(handler)
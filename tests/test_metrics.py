@@ -0,0 +1,151 @@
+import os
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from core import metrics
+from tests.constants import URLs
+
+TOKEN = "scrape-token"
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    """Records metrics into an empty directory for the test."""
+    settings.METRICS_DIR = str(tmp_path / "metrics")
+    settings.METRICS_TOKEN = TOKEN
+    return tmp_path / "metrics"
+
+
+def scrape(client):
+    response = client.get(reverse("metrics"), HTTP_AUTHORIZATION=f"Bearer {TOKEN}")
+    assert response.status_code == status.HTTP_200_OK
+    return response.content.decode()
+
+
+def sample_value(text, sample):
+    """Return the value of the exposition line starting with ``sample``."""
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{sample} not found")
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    """Test the endpoint exposes request metrics to authorized scrapers."""
+
+    def test_requests_are_counted(self, api_client, metrics_dir):
+        """Test request counters and latency histograms per route and status."""
+        api_client.get(URLs.CATEGORY_LIST.value)
+        api_client.get(URLs.CATEGORY_LIST.value)
+        text = scrape(api_client)
+
+        labels = 'method="GET",route="catalog:category-list",status="200"'
+        assert sample_value(text, f"http_requests_total{{{labels}}}") == 2
+        assert (
+            sample_value(text, f"http_request_duration_seconds_count{{{labels}}}") == 2
+        )
+        assert (
+            sample_value(
+                text, f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'
+            )
+            == 2
+        )
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert (
+            sample_value(text, 'db_queries_total{route="catalog:category-list"}') >= 2
+        )
+
+    def test_wrong_token_is_rejected(self, api_client, metrics_dir):
+        """Test scrapes without the configured bearer token are refused."""
+        response = api_client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer x")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_missing_token_setting_disables_endpoint(self, api_client, settings):
+        """Test the endpoint is not served when no token is configured."""
+        settings.METRICS_TOKEN = ""
+        response = api_client.get(reverse("metrics"))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_processes_are_aggregated(metrics_dir):
+    """Test counts recorded by a forked worker add to the parent's."""
+    metrics.BULK_UPLOAD_ROWS.inc(5, kind="users")
+    recorded, exit_now = os.pipe(), os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        metrics.BULK_UPLOAD_ROWS.inc(7, kind="users")
+        metrics.DB_POOL_SIZE.set(3, alias="default")
+        os.write(recorded[1], b"x")
+        os.read(exit_now[0], 1)
+        os._exit(0)
+    os.read(recorded[0], 1)
+    try:
+        text = metrics.render()
+        assert sample_value(text, 'bulk_upload_rows_total{kind="users"}') == 12
+        gauge = f'db_pool_size{{alias="default",pid="{pid}"}}'
+        assert sample_value(text, gauge) == 3
+
+        metrics.mark_process_dead(pid)
+        assert "db_pool_size{" not in metrics.render()
+    finally:
+        os.write(exit_now[1], b"x")
+        os.waitpid(pid, 0)
+        for fd in (*recorded, *exit_now):
+            os.close(fd)
+
+
+def test_gauges_of_exited_processes_are_dropped(metrics_dir):
+    """Test gauges left by a process nobody marked dead, as under runserver."""
+    pid = os.fork()
+    if pid == 0:
+        metrics.DB_POOL_SIZE.set(3, alias="default")
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert "db_pool_size{" not in metrics.render()
+    assert not (metrics_dir / f"gauges_{pid}.db").exists()
+
+
+def test_histogram_buckets_are_cumulative(metrics_dir):
+    """Test each bucket counts the observations up to its bound."""
+    for seconds in (0.02, 0.3, 0.3, 20):
+        metrics.IMAGE_PROCESSING.observe(seconds, operation="compress")
+    text = metrics.render()
+
+    def bucket(le):
+        return sample_value(
+            text,
+            f'image_processing_duration_seconds_bucket{{operation="compress",le="{le}"}}',
+        )
+
+    assert [bucket("0.01"), bucket("0.025"), bucket("0.5"), bucket("+Inf")] == [
+        0,
+        1,
+        3,
+        4,
+    ]
+    assert sample_value(
+        text, 'image_processing_duration_seconds_sum{operation="compress"}'
+    ) == pytest.approx(20.62)
+
+
+def test_file_grows_and_is_reopened(tmp_path):
+    """Test values outgrow the initial mapping and survive reopening."""
+    path = tmp_path / "values_1.db"
+    values = metrics.MappedValues(path)
+    for i in range(5000):
+        values.add((f"key-{i}", i))
+    values.add(("key-1", 1))
+    values.close()
+
+    reopened = metrics.MappedValues(path)
+    reopened.add(("key-4999", 1))
+    reopened.close()
+
+    read = dict(metrics.read_values(path))
+    assert len(read) == 5000
+    assert read["key-1"] == 2
+    assert read["key-4999"] == 5000
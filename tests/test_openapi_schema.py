@@ -0,0 +1,91 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from core import openapi
+
+
+@pytest.fixture
+def schema_path(tmp_path):
+    path = tmp_path / "openapi.json"
+    with override_settings(OPENAPI_SCHEMA_PATH=str(path), APP_VERSION="release-1"):
+        yield path
+
+
+@pytest.fixture
+def count_builds(monkeypatch):
+    """Count the schema generations, which the prebuilt file should avoid."""
+    builds = []
+    build_schema = openapi.build_schema
+
+    def counting_build_schema():
+        builds.append(True)
+        return build_schema()
+
+    monkeypatch.setattr(openapi, "build_schema", counting_build_schema)
+    return builds
+
+
+def test_command_writes_versioned_schema(schema_path):
+    """Test the command writes the schema tagged with the code version."""
+    out = StringIO()
+    call_command("generate_openapi_schema", stdout=out)
+
+    schema = json.loads(schema_path.read_bytes())
+    assert schema[openapi.VERSION_KEY] == "release-1"
+    assert "/catalog/products/" in schema["paths"]
+    assert "release-1" in out.getvalue()
+
+
+def test_schema_generation_skips_user_lookups(schema_path, caplog):
+    """Test the views build the schema without a requesting user."""
+    call_command("generate_openapi_schema", stdout=StringIO())
+
+    # drf_yasg logs, rather than raises, the views that fail without one
+    assert not [r for r in caplog.records if r.name.startswith("drf_yasg")]
+
+
+def test_prebuilt_schema_is_served_with_etag(api_client, schema_path, count_builds):
+    """Test the prebuilt file is served as is and revalidated by its ETag."""
+    call_command("generate_openapi_schema", stdout=StringIO())
+    count_builds.clear()
+    url = reverse("openapi-schema")
+
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == schema_path.read_bytes()
+    assert "public" in response["Cache-Control"]
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert count_builds == []
+
+
+def test_stale_schema_is_regenerated_once(api_client, schema_path, count_builds):
+    """Test a file built from other code is ignored and generation is cached."""
+    call_command("generate_openapi_schema", stdout=StringIO())
+    count_builds.clear()
+
+    with override_settings(APP_VERSION="release-2"):
+        first = api_client.get(reverse("openapi-schema"))
+        second = api_client.get(reverse("openapi-schema"))
+
+    assert first.json()[openapi.VERSION_KEY] == "release-2"
+    assert second.content == first.content
+    assert len(count_builds) == 1
+
+
+@pytest.mark.parametrize("page", ["schema-swagger-ui", "schema-redoc"])
+def test_documentation_pages_load_the_served_schema(api_client, schema_path, page):
+    """Test the UI pages point at the schema endpoint and old spec links work."""
+    response = api_client.get(reverse(page))
+    assert response.status_code == status.HTTP_200_OK
+    assert reverse("openapi-schema") in response.content.decode()
+
+    response = api_client.get(reverse(page), {"format": "openapi"})
+    assert response.content == api_client.get(reverse("openapi-schema")).content
@@ -0,0 +1,90 @@
+import logging
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+
+from apps.catalog.models import Product
+from apps.catalog.views import ProductViewSet
+from core.query_inspection import NPlusOneError, RequestQueries
+from tests.constants import URLs
+
+
+@pytest.fixture
+def without_select_related(monkeypatch):
+    """Drops select_related("category") from the product list, as a regression."""
+    monkeypatch.setattr(ProductViewSet, "queryset", Product.objects.order_by("id"))
+
+
+@pytest.mark.django_db
+class TestQueryInspection:
+    """Test requests repeating a query per row are reported."""
+
+    def test_n_plus_one_raises(
+        self, api_client, create_products, without_select_related
+    ):
+        """Test the testing settings fail a request loading relations per row."""
+        create_products(10)
+        with pytest.raises(NPlusOneError, match="similar queries from apps/catalog"):
+            api_client.get(URLs.PRODUCT_LIST.value)
+
+    def test_select_related_list_passes(self, api_client, create_products):
+        """Test the product list as shipped runs no repeated queries."""
+        create_products(10)
+        response = api_client.get(URLs.PRODUCT_LIST.value)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_warn_action_logs(
+        self, api_client, create_products, without_select_related, settings, caplog
+    ):
+        """Test the "warn" action logs the repeated query with its origin."""
+        settings.N_PLUS_ONE_ACTION = "warn"
+        create_products(10)
+        with caplog.at_level(logging.WARNING, logger="core.middleware"):
+            response = api_client.get(URLs.PRODUCT_LIST.value)
+
+        assert response.status_code == status.HTTP_200_OK
+        (record,) = caplog.records
+        assert record.getMessage().startswith(
+            f"N+1 queries: GET {URLs.PRODUCT_LIST.value} ran 10 similar queries "
+            "from apps/catalog/"
+        )
+        assert '"catalog_category"' in record.getMessage()
+
+    def test_slow_queries_are_logged(self, api_client, settings, caplog):
+        """Test queries over SLOW_QUERY_MS are logged with their origin."""
+        settings.SLOW_QUERY_MS = 0
+        with caplog.at_level(logging.WARNING, logger="core.query_inspection"):
+            api_client.get(URLs.PRODUCT_LIST.value)
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert messages
+        assert all(message.startswith("Slow query (") for message in messages)
+        assert any("from apps/catalog/views.py" in message for message in messages)
+
+    def test_bulk_upload_is_allowed(self, admin_authenticated_client):
+        """Test the category upload may validate each row with a query."""
+        client = admin_authenticated_client
+        rows = "\n".join(f"Category {i},Row {i}" for i in range(10))
+        upload = SimpleUploadedFile(
+            "categories.csv", f"name,description\n{rows}".encode(), "text/csv"
+        )
+        response = client.post(
+            URLs.CATEGORY_BULK_UPLOAD_URL.value, {"file": upload}, format="multipart"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["success_count"] == 10
+
+
+def test_in_lists_share_a_shape(settings):
+    """Test queries differing only in the length of an IN list are one shape."""
+    settings.N_PLUS_ONE_THRESHOLD = 2
+    queries = RequestQueries()
+    queries.record('SELECT "id" FROM "t" WHERE "id" IN (%s, %s)', 0)
+    queries.record('SELECT "id" FROM "t" WHERE "id" IN (%s)', 0)
+    queries.record('INSERT INTO "t" VALUES (%s)', 0)
+    queries.record('INSERT INTO "t" VALUES (%s)', 0)
+
+    ((count, _, shape),) = queries.repeated()
+    assert count == 2
+    assert shape == 'SELECT "id" FROM "t" WHERE "id" IN (...)'
@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Category
+from apps.users.services import issue_token_pair
+from core.db_router import replica_monitor
+from core.middleware import ReplicaRoutingMiddleware
+from tests.constants import URLs
+
+# Pins must be visible to every worker; a file cache is, unlike the default
+PIN_CACHE_DIR = os.path.join(tempfile.gettempdir(), f"replica-pins-{os.getpid()}")
+replica_routing = override_settings(
+    REPLICA_DATABASES=["replica"],
+    REPLICA_PIN_CACHE="replica_pins",
+    CACHES={
+        **settings.CACHES,
+        "replica_pins": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": PIN_CACHE_DIR,
+        },
+    },
+)
+
+
+@pytest.fixture
+def split_categories():
+    """Gives the primary and the replica a category the other lacks."""
+    Category.objects.using("default").create(name="On primary")
+    Category.objects.using("replica").create(name="On replica")
+
+
+@pytest.fixture
+def bearer_client():
+    """Returns a function giving a new client with a token for ``user``."""
+
+    def create(user):
+        client = APIClient()
+        access = issue_token_pair(user)["access"]
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return client
+
+    return create
+
+
+@pytest.fixture(autouse=True)
+def clear_pins():
+    yield
+    shutil.rmtree(PIN_CACHE_DIR, ignore_errors=True)
+
+
+def category_names(client):
+    response = client.get(URLs.CATEGORY_LIST.value)
+    assert response.status_code == status.HTTP_200_OK
+    return [category["name"] for category in response.data]
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+class TestReplicaRouting:
+    """Test safe-method requests are served from the replica."""
+
+    def test_reads_use_primary_without_replicas(self, api_client, split_categories):
+        """Test routing stays on the primary when no replica is configured."""
+        assert category_names(api_client) == ["On primary"]
+
+    @replica_routing
+    def test_safe_requests_read_from_replica(self, api_client, split_categories):
+        """Test a GET from a client that has not written reads the replica."""
+        assert category_names(api_client) == ["On replica"]
+
+    @replica_routing
+    def test_writes_go_to_primary_and_pin_the_user(
+        self, bearer_client, admin_user, split_categories
+    ):
+        """Test a user reads their own write from the primary right after it."""
+        client = bearer_client(admin_user)
+        response = client.post(URLs.CATEGORY_LIST.value, {"name": "New"}, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Category.objects.using("default").filter(name="New").exists()
+        assert not Category.objects.using("replica").filter(name="New").exists()
+        # Pinned by the user the token names, wherever the token is sent from
+        assert sorted(category_names(bearer_client(admin_user))) == [
+            "New",
+            "On primary",
+        ]
+
+    @replica_routing
+    def test_pin_is_per_user(
+        self, bearer_client, admin_user, default_user, split_categories
+    ):
+        """Test a write pins only its own user to the primary."""
+        bearer_client(admin_user).post(
+            URLs.CATEGORY_LIST.value, {"name": "New"}, format="json"
+        )
+
+        assert category_names(bearer_client(default_user)) == ["On replica"]
+
+    @replica_routing
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_expired_pin_reads_replica_again(
+        self, bearer_client, admin_user, split_categories
+    ):
+        """Test a pin no longer forces the primary once it has expired."""
+        client = bearer_client(admin_user)
+        client.post(URLs.CATEGORY_LIST.value, {"name": "New"}, format="json")
+
+        assert category_names(client) == ["On replica"]
+
+    @replica_routing
+    def test_lagging_replica_is_skipped(self, api_client, split_categories):
+        """Test reads fall back to the primary while the replica lags."""
+        with mock.patch.object(replica_monitor, "lag", return_value=60.0):
+            assert category_names(api_client) == ["On primary"]
+
+        replica_monitor.reset()
+        assert category_names(api_client) == ["On replica"]
+
+    @replica_routing
+    @override_settings(REPLICA_LAG_CHECK_TIMEOUT=0.05)
+    def test_slow_lag_check_does_not_hold_requests(self, api_client, split_categories):
+        """Test requests read the primary rather than wait on a slow lag check."""
+        checked = threading.Event()
+
+        def slow_lag(alias):
+            checked.wait(5)
+            return 0.0
+
+        with mock.patch.object(replica_monitor, "lag", side_effect=slow_lag):
+            started = time.monotonic()
+            assert category_names(api_client) == ["On primary"]
+            assert time.monotonic() - started < 1
+            checked.set()
+            replica_monitor._thread.join()
+
+        assert category_names(api_client) == ["On replica"]
+
+
+def test_process_local_pin_cache_is_refused(settings):
+    """Test replicas with a per-worker pin cache fail at startup."""
+    settings.REPLICA_DATABASES = ["replica"]
+    settings.REPLICA_PIN_CACHE = "default"
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    with pytest.raises(ImproperlyConfigured, match="REPLICA_PIN_CACHE"):
+        ReplicaRoutingMiddleware(lambda request: None)
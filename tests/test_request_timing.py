@@ -0,0 +1,90 @@
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.catalog.models import Category
+from core.middleware import RequestTimingMiddleware
+from tests.constants import URLs
+
+
+def server_timing(response):
+    """Parse a Server-Timing header into {metric: (duration, description)}."""
+    metrics = {}
+    for metric in response["Server-Timing"].split(", "):
+        name, *params = metric.split(";")
+        params = dict(param.split("=", 1) for param in params)
+        metrics[name] = (float(params["dur"]), params.get("desc", "").strip('"'))
+    return metrics
+
+
+def access_records(caplog):
+    return [record for record in caplog.records if record.name == "core.access"]
+
+
+@pytest.mark.django_db
+class TestRequestTimingMiddleware:
+    """Test requests report their phase timings in a header and the access log."""
+
+    def test_server_timing_header(self, api_client, create_products, settings):
+        """Test the header lists each phase and the number of queries."""
+        settings.SERVER_TIMING_HEADER = True
+        create_products(10)
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(URLs.PRODUCT_LIST.value)
+
+        assert response.status_code == status.HTTP_200_OK
+        metrics = server_timing(response)
+        assert set(metrics) == {"total", "db", "serialize", "render", "app"}
+        assert metrics["db"][1] == f"{len(queries)} queries"
+        assert metrics["total"][0] >= metrics["db"][0]
+
+    def test_access_log_fields(self, api_client, create_products, caplog):
+        """Test one access record per request carries the timings as fields."""
+        create_products(10)
+        with caplog.at_level(logging.INFO, logger="core.access"):
+            api_client.get(URLs.PRODUCT_LIST.value)
+
+        (record,) = access_records(caplog)
+        assert record.method == "GET"
+        assert record.route == "catalog:product-list"
+        assert record.status == status.HTTP_200_OK
+        assert record.db_queries > 0
+        assert record.serialize_ms > 0
+        assert record.render_ms > 0
+        assert record.duration_ms >= record.db_ms + record.serialize_ms
+        assert re.fullmatch(
+            rf"GET {URLs.PRODUCT_LIST.value} 200 [\d.]+ms", record.getMessage()
+        )
+
+    def test_header_is_opt_in(self, api_client):
+        """Test the timings stay out of responses outside development."""
+        response = api_client.get(URLs.CATEGORY_LIST.value)
+        assert "Server-Timing" not in response
+
+    def test_disabled(self, api_client, settings, caplog):
+        """Test REQUEST_TIMING=False removes the middleware."""
+        settings.REQUEST_TIMING = False
+        with caplog.at_level(logging.INFO, logger="core.access"):
+            response = api_client.get(URLs.CATEGORY_LIST.value)
+        assert "Server-Timing" not in response
+        assert access_records(caplog) == []
+
+    def test_async_counts_queries_from_threads(self, settings):
+        """Test queries an async view runs through sync_to_async are counted."""
+        settings.SERVER_TIMING_HEADER = True
+
+        async def view(request):
+            await sync_to_async(Category.objects.count)()
+            await Category.objects.acount()
+            return HttpResponse()
+
+        middleware = RequestTimingMiddleware(view)
+        response = async_to_sync(middleware)(RequestFactory().get("/"))
+        assert server_timing(response)["db"][1] == "2 queries"
@@ -0,0 +1,114 @@
+from io import StringIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from apps.catalog.models import Category, Product
+from apps.users.models import User
+from core.seeding import insert_rows
+
+
+def seed(command, **options):
+    out = StringIO()
+    call_command(command, stdout=out, **options)
+    return out.getvalue()
+
+
+def catalog():
+    return list(
+        Product.objects.order_by("id").values_list(
+            "id", "name", "price", "stock_quantity", "category__name"
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestSeedCatalog:
+    """Test the catalog seed command generates large, reproducible datasets."""
+
+    def test_same_seed_same_rows(self):
+        """Test a seed generates the same rows, ids included, every time."""
+        seed("seed_category_product_db", categories=12, products=300, seed=7)
+        first = catalog()
+        Product.objects.all().delete()
+        Category.objects.all().delete()
+        seed("seed_category_product_db", categories=12, products=300, seed=7)
+
+        assert len(first) == 300
+        assert catalog() == first
+        assert Category.objects.count() == 12
+        assert Category.objects.filter(name="Electronics 2").exists()
+
+    def test_distributions(self):
+        """Test prices end in .99, some products are sold out and categories skew."""
+        seed("seed_category_product_db", products=2000, batch_size=500)
+        prices = Product.objects.values_list("price", flat=True)
+
+        assert all(str(price).endswith(".99") for price in prices)
+        assert Product.objects.filter(stock_quantity=0).exists()
+        counts = sorted(
+            (
+                Product.objects.filter(category=category).count()
+                for category in Category.objects.all()
+            ),
+            reverse=True,
+        )
+        assert counts[0] > 3 * counts[-1]
+
+    def test_generated_images(self, temp_media_root):
+        """Test each product asked to have an image gets its own file."""
+        seed("seed_category_product_db", products=5, images=1)
+        names = [product.image.name for product in Product.objects.all()]
+
+        assert len(set(names)) == 5
+        assert all(default_storage.exists(name) for name in names)
+
+    def test_rerun_adds_nothing(self, temp_media_root):
+        """Test running the command again with the same seed skips every row."""
+        seed("seed_category_product_db", products=50, images=0.5, seed=4)
+        first = catalog()
+        files = sorted(default_storage.listdir("products")[1])
+        out = seed("seed_category_product_db", products=50, images=0.5, seed=4)
+
+        assert "0 categories seeded." in out
+        assert "0 products seeded." in out
+        assert catalog() == first
+        assert sorted(default_storage.listdir("products")[1]) == files
+
+    def test_samples_without_counts(self):
+        """Test the command still seeds the sample data by default."""
+        seed("seed_category_product_db")
+        assert sorted(Product.objects.values_list("name", flat=True)) == [
+            "Novel",
+            "Smartphone",
+            "T-Shirt",
+        ]
+
+
+@pytest.mark.django_db
+def test_seed_users(settings):
+    """Test generated users can log in with the shared password."""
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    seed("seed_users_db", users=25, password="Seeded-Pass-1", seed=3)
+    emails = list(User.objects.order_by("id").values_list("email", flat=True))
+    User.objects.all().delete()
+    seed("seed_users_db", users=25, password="Seeded-Pass-1", seed=3)
+
+    assert list(User.objects.order_by("id").values_list("email", flat=True)) == emails
+    assert User.objects.count() == 25
+    assert User.objects.first().check_password("Seeded-Pass-1")
+
+    out = seed("seed_users_db", users=25, password="Seeded-Pass-1", seed=3)
+    assert "0 users seeded" in out
+    assert User.objects.count() == 25
+
+
+@pytest.mark.django_db
+def test_insert_rows_in_batches():
+    """Test rows are written in batches, reporting the running total."""
+    totals = []
+    rows = ({"name": f"Batch {i}"} for i in range(5))
+    assert insert_rows(Category, rows, batch_size=2, progress=totals.append) == 5
+    assert totals == [2, 4, 5]
+    assert Category.objects.filter(name__startswith="Batch").count() == 5
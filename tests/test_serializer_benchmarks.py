@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from benchmarks.serializers import BASELINE, compare, prepare, run
+
+
+@pytest.mark.django_db
+def test_every_baseline_case_runs():
+    """Test each case runs against the seeded data and has a stored baseline."""
+    _, results = run(prepare(), repeat=1, min_time=0)
+
+    assert set(results) == set(json.loads(BASELINE.read_text()))
+    assert all(result["relative"] > 0 for result in results.values())
+
+
+def test_regressions_beyond_tolerance():
+    """Test only cases slower than the tolerance allows are regressions."""
+    baseline = {"fast": {"relative": 1.0}, "slow": {"relative": 1.0}}
+    results = {
+        "fast": {"relative": 1.1},
+        "slow": {"relative": 2.0},
+        "new": {"relative": 5.0},
+    }
+
+    changes, regressions = compare(results, baseline, tolerance=0.25)
+    assert changes == {"fast": 10.0, "slow": 100.0}
+    assert regressions == ["slow"]
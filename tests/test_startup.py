@@ -0,0 +1,41 @@
+import os
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from benchmarks.import_time import report
+
+# Generous enough for a loaded CI runner; a worker starts in about a second
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "5"))
+
+
+@pytest.fixture(scope="module")
+def startup():
+    return report("wsgi")
+
+
+def test_startup_within_budget(startup):
+    """Test a worker imports the application within the startup budget."""
+    assert startup["startup_seconds"] < STARTUP_BUDGET_SECONDS
+
+
+def test_heavy_dependencies_are_not_imported_at_startup(startup):
+    """Test Pillow and drf_yasg are left for the requests that need them."""
+    assert startup["lazy_modules_loaded"] == []
+
+
+def test_schema_includes_deferred_view_documentation(api_client):
+    """Test the API schema still carries the lazily applied view overrides."""
+    response = api_client.get(reverse("schema-swagger-ui"), {"format": "openapi"})
+
+    assert response.status_code == status.HTTP_200_OK
+    schema = response.json()
+    bulk_upload = schema["paths"]["/catalog/categories/bulk-upload/"]["post"]
+    assert "207" in bulk_upload["responses"]
+    ordering = next(
+        parameter
+        for parameter in schema["paths"]["/catalog/products/"]["get"]["parameters"]
+        if parameter["name"] == "ordering"
+    )
+    assert "-price" in ordering["enum"]